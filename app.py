@@ -7,7 +7,6 @@ import yaml
 import os
 import aws_cdk as cdk
 from pipeline.pipeline_stack import PipelineStack
-from app.s3_artifact_deployment import S3ArtifactDeployment
 
 # Get data from config file and convert to dict
 config_file_path = "./configs/deploy-config.yaml"
@@ -26,12 +25,4 @@ PipelineStack(
     config=config,
 )
 
-S3ArtifactDeployment(
-    app,
-    config["appInfrastructure"]["productName"] + "-s3-artifact-deployment",
-    env=cdk.Environment(
-        account=os.getenv("CDK_DEFAULT_ACCOUNT"), region=os.getenv("CDK_DEFAULT_REGION")
-    )
-)
-
 app.synth()
@@ -7,30 +7,68 @@ from aws_cdk import (
     Stack,
     Tags,
     Aspects,
-    CfnOutput
+    aws_lambda as _lambda
 )
 from cdk_nag import AwsSolutionsChecks
-from app.dynamodb_helper import create_dynamodb
-from app.cognito_helper import CognitoUserPool
-from app.cloudfront_helper import CreateCloudFrontFrontEnd
-from app.lambda_streaming import BedrockStreamingFunction
+from app.performance_checks import PerformanceChecks
+
+
+def get_deployment_regions(config: dict, primary_region: str) -> list:
+    """
+    Get the regions the application is deployed to, primary region first.
+
+    Args:
+        config (dict): Application configuration.
+        primary_region (str): The region of the pipeline and of the primary stacks.
+
+    Returns:
+        list: The configured regions, or only the primary region when none are configured.
+
+    Raises:
+        ValueError: If the first configured region is not the primary region.
+    """
+    regions = config["appInfrastructure"].get("regions") or [primary_region]
+    if regions[0] != primary_region:
+        raise ValueError(
+            f"The first region in appInfrastructure.regions must be the pipeline region {primary_region}, "
+            f"found {regions[0]}"
+        )
+    return list(dict.fromkeys(regions))
+
+
+def get_lambda_tracing(config: dict) -> _lambda.Tracing:
+    """
+    Get the X-Ray tracing mode of the Lambda functions.
+
+    Args:
+        config (dict): Application configuration.
+
+    Returns:
+        _lambda.Tracing: ACTIVE when tracing is enabled, DISABLED otherwise.
+    """
+    enabled = config["appInfrastructure"].get("tracing", {}).get("enabled", False)
+    return _lambda.Tracing.ACTIVE if enabled else _lambda.Tracing.DISABLED
 
 
 class ApplicationStack(Stack):
     """
-    Application stack for Gen AI Trivia.
+    Base stack for the Gen AI Trivia application.
+
+    The application is split into independently deployable stacks, so a change
+    to one layer only updates the stack that owns it:
+    - DataStack: DynamoDB table
+    - AuthStack: Cognito user pool and identity pool
+    - ComputeStack: Lambda functions for question generation and the leaderboard
+    - EdgeStack: CloudFront distribution for frontend hosting
 
-    This stack creates the core application infrastructure, including:
-    - DynamoDB table
-    - Cognito user pool and identity pool
-    - CloudFront distribution for frontend hosting 
-    - Lambda function for streaming question generation
+    In a multi-region deployment, every secondary region only gets a
+    ComputeStack, next to its replica of the high score table.
+
+    Every application stack is tagged and checked by the cdk-nag AwsSolutions
+    and performance rule packs.
 
     Attributes:
-        table (dynamodb.ITable): The DynamoDB table.
-        user_pool (CognitoUserPool): The Cognito user pool.
-        frontend (CreateCloudFrontFrontEnd): The CloudFront distribution for frontend hosting.
-        streaming_lambda (BedrockStreamingFunction): The Lambda function for streaming question generation.
+        config (dict): Application configuration.
     """
 
     def __init__(self, scope: Construct, construct_id: str, config: dict, **kwargs) -> None:
@@ -39,7 +77,7 @@ class ApplicationStack(Stack):
 
         Args:
             scope (Construct): The parent of this stack, usually an App or a Stage, but could be any construct.
-            construct_id (str): The identifier of this stack. Must be unique within this scope.  
+            construct_id (str): The identifier of this stack. Must be unique within this scope.
             config (dict): Application configuration.
             **kwargs: Other parameters passed to the base class.
 
@@ -47,48 +85,7 @@ class ApplicationStack(Stack):
             Tags: Tags applied to all resources in the stack.
         """
         super().__init__(scope, construct_id, **kwargs)
-        # DynamoDB Tables
-        create_dynamodb(
-            scope=self,
-            table_name=config["appInfrastructure"]["dynamoDb"]["tableName"]
-        )
-
-        # Cognito
-        cognito = CognitoUserPool(
-            self,
-            "rCreateCognitoUserPool",
-            table_name=config["appInfrastructure"]['dynamoDb']['tableName']
-        )
-
-        cog_identity_pool_id = cognito.get_identity_pool_id()
-
-        CfnOutput(
-            self,
-            "oGenAiTriviaCognitoPoolIdOutput", 
-            value=cog_identity_pool_id,
-            description="Cognito Identity Pool ID"
-        )
-
-        # CloudFront
-        cloudfront = CreateCloudFrontFrontEnd(
-            self,
-            "rCreateCloudFrontFrontEnd"
-        )
-
-        cf_distribution_domain_name = cloudfront.get_distribution_domain_name()
-
-        CfnOutput(
-            self,
-            "oGenAiTriviaCloudFrontDistributionDomainName",
-            value=cf_distribution_domain_name,
-            description="CloudFront Distribution Domain Name"
-        )
-
-        # BedRock
-        BedrockStreamingFunction(
-            self,
-            "rBedrockStreamingFunction"
-        )
+        self.config = config
 
         # Add tags to all resources created
         tags = json.loads(json.dumps(config["tags"]))
@@ -96,3 +93,4 @@ class ApplicationStack(Stack):
             Tags.of(self).add(key, value)
 
         Aspects.of(self).add(AwsSolutionsChecks())
+        Aspects.of(self).add(PerformanceChecks(config.get("performanceChecks")))
@@ -0,0 +1,51 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from constructs import Construct
+from aws_cdk import CfnOutput
+from app.app_stack import ApplicationStack, get_deployment_regions
+from app.cognito_helper import CognitoUserPool
+
+
+class AuthStack(ApplicationStack):
+    """
+    Authentication stack for Gen AI Trivia.
+
+    This stack creates the Cognito user pool and identity pool. The identity
+    pool role is scoped by resource names from the configuration, so the stack
+    has no dependency on the other application stacks. Players sign in to the
+    primary region, and the role covers the table and functions of every
+    deployment region.
+
+    Attributes:
+        cognito (CognitoUserPool): The Cognito user pool and identity pool.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, config: dict, **kwargs) -> None:
+        """
+        Initialize the AuthStack.
+
+        Args:
+            scope (Construct): The parent of this stack, usually an App or a Stage, but could be any construct.
+            construct_id (str): The identifier of this stack. Must be unique within this scope.
+            config (dict): Application configuration.
+            **kwargs: Other parameters passed to the base class.
+        """
+        super().__init__(scope, construct_id, config=config, **kwargs)
+
+        # Cognito
+        self.cognito = CognitoUserPool(
+            self,
+            "rCreateCognitoUserPool",
+            table_name=config["appInfrastructure"]['dynamoDb']['tableName'],
+            regions=get_deployment_regions(config, self.region)
+        )
+
+        cog_identity_pool_id = self.cognito.get_identity_pool_id()
+
+        CfnOutput(
+            self,
+            "oGenAiTriviaCognitoPoolIdOutput",
+            value=cog_identity_pool_id,
+            description="Cognito Identity Pool ID"
+        )
@@ -0,0 +1,270 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from constructs import Construct
+from aws_cdk import (
+    Duration,
+    Stack,
+    aws_athena as athena,
+    aws_events as events,
+    aws_events_targets as targets,
+    aws_glue as glue,
+    aws_s3 as s3,
+    aws_stepfunctions as sfn,
+    aws_stepfunctions_tasks as tasks
+)
+from cdk_nag import NagSuppressions
+from app.cloudfront_helper import LOG_FILE_PREFIX
+
+CDN_LOGS_DATABASE = "gen_ai_trivia_cdn_logs"
+CDN_LOGS_WORKGROUP = "gen-ai-trivia-cdn-logs"
+RAW_TABLE = "cloudfront_logs_raw"
+COMPACTED_TABLE = "cloudfront_logs"
+
+# Prefixes of the log bucket, next to the raw logs delivered by CloudFront
+COMPACTED_PREFIX = "cloudfront-logs-compacted"
+RESULTS_PREFIX = "athena-results"
+
+# Fields of a CloudFront standard log line, in file order
+RAW_COLUMNS = [
+    ("date", "date"), ("time", "string"), ("x_edge_location", "string"), ("sc_bytes", "bigint"),
+    ("c_ip", "string"), ("cs_method", "string"), ("cs_host", "string"), ("cs_uri_stem", "string"),
+    ("sc_status", "int"), ("cs_referrer", "string"), ("cs_user_agent", "string"), ("cs_uri_query", "string"),
+    ("cs_cookie", "string"), ("x_edge_result_type", "string"), ("x_edge_request_id", "string"),
+    ("x_host_header", "string"), ("cs_protocol", "string"), ("cs_bytes", "bigint"), ("time_taken", "double"),
+    ("x_forwarded_for", "string"), ("ssl_protocol", "string"), ("ssl_cipher", "string"),
+    ("x_edge_response_result_type", "string"), ("cs_protocol_version", "string"), ("fle_status", "string"),
+    ("fle_encrypted_fields", "int"), ("c_port", "int"), ("time_to_first_byte", "double"),
+    ("x_edge_detailed_result_type", "string"), ("sc_content_type", "string"), ("sc_content_len", "bigint"),
+    ("sc_range_start", "bigint"), ("sc_range_end", "bigint")
+]
+
+# Columns of the compacted table and the expression that reads them from the raw table.
+# Client addresses, cookies and query strings are left out.
+COMPACTED_COLUMNS = {
+    "request_time": ("timestamp", "CAST(concat(CAST(\"date\" AS varchar), ' ', \"time\") AS timestamp)"),
+    "edge_location": ("string", "x_edge_location"),
+    "method": ("string", "cs_method"),
+    "path": ("string", "url_decode(cs_uri_stem)"),
+    "status": ("int", "sc_status"),
+    "result_type": ("string", "x_edge_result_type"),
+    "response_result_type": ("string", "x_edge_response_result_type"),
+    "detailed_result_type": ("string", "x_edge_detailed_result_type"),
+    "sc_bytes": ("bigint", "sc_bytes"),
+    "cs_bytes": ("bigint", "cs_bytes"),
+    "time_taken": ("double", "time_taken"),
+    "time_to_first_byte": ("double", "time_to_first_byte"),
+    "protocol_version": ("string", "cs_protocol_version"),
+    "content_type": ("string", "sc_content_type")
+}
+
+
+class CdnLogAnalytics(Construct):
+    """
+    Daily compaction of the CloudFront standard logs for analytics.
+
+    CloudFront delivers its standard logs as many small gzip files, several per
+    edge location and hour. This class creates a state machine, started on a
+    schedule, that rewrites the logs of the previous day with Athena into a few
+    Parquet files partitioned by date, and a lifecycle rule that deletes the raw
+    files once they have been compacted. Edge caching is analyzed from the
+    "cloudfront_logs" table, for example with scripts/query_cdn_logs.py.
+
+    Attributes:
+        state_machine (sfn.StateMachine): The state machine compacting the logs of one day.
+    """
+
+    def __init__(self, scope: Construct, id: str, log_bucket: s3.Bucket, config: dict, **kwargs):
+        """
+        Initialize the CdnLogAnalytics construct.
+
+        Args:
+            scope (Construct): The scope of the construct.
+            id (str): The ID of the construct.
+            log_bucket (s3.Bucket): The bucket CloudFront writes its standard logs to.
+            config (dict): Application configuration.
+            **kwargs: Additional arguments.
+        """
+        super().__init__(scope, id, **kwargs)
+
+        stack = Stack.of(self)
+        logs_config = config["appInfrastructure"].get("cdnLogs", {})
+        bucket_url = f"s3://{log_bucket.bucket_name}"
+
+        # The raw files are only needed until they are compacted, the compacted ones are kept longer
+        log_bucket.add_lifecycle_rule(
+            prefix=f"{LOG_FILE_PREFIX}/",
+            expiration=Duration.days(logs_config.get("rawLogRetentionDays", 7))
+        )
+        log_bucket.add_lifecycle_rule(
+            prefix=f"{COMPACTED_PREFIX}/",
+            expiration=Duration.days(logs_config.get("compactedLogRetentionDays", 395))
+        )
+        log_bucket.add_lifecycle_rule(
+            prefix=f"{RESULTS_PREFIX}/",
+            expiration=Duration.days(7)
+        )
+
+        database = glue.CfnDatabase(
+            self,
+            "rGenAiTriviaCdnLogsDatabase",
+            catalog_id=stack.account,
+            database_input=glue.CfnDatabase.DatabaseInputProperty(name=CDN_LOGS_DATABASE)
+        )
+
+        # Tab separated, each file starts with a version and a field list line
+        raw_table = glue.CfnTable(
+            self,
+            "rGenAiTriviaCdnLogsRawTable",
+            catalog_id=stack.account,
+            database_name=CDN_LOGS_DATABASE,
+            table_input=glue.CfnTable.TableInputProperty(
+                name=RAW_TABLE,
+                table_type="EXTERNAL_TABLE",
+                parameters={"skip.header.line.count": "2"},
+                storage_descriptor=glue.CfnTable.StorageDescriptorProperty(
+                    columns=[
+                        glue.CfnTable.ColumnProperty(name=column, type=column_type)
+                        for column, column_type in RAW_COLUMNS
+                    ],
+                    location=f"{bucket_url}/{LOG_FILE_PREFIX}/",
+                    input_format="org.apache.hadoop.mapred.TextInputFormat",
+                    output_format="org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat",
+                    serde_info=glue.CfnTable.SerdeInfoProperty(
+                        serialization_library="org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe",
+                        parameters={"field.delim": "\t", "serialization.format": "\t"}
+                    )
+                )
+            )
+        )
+        raw_table.add_dependency(database)
+
+        compacted_table = glue.CfnTable(
+            self,
+            "rGenAiTriviaCdnLogsTable",
+            catalog_id=stack.account,
+            database_name=CDN_LOGS_DATABASE,
+            table_input=glue.CfnTable.TableInputProperty(
+                name=COMPACTED_TABLE,
+                table_type="EXTERNAL_TABLE",
+                parameters={"classification": "parquet", "parquet.compression": "SNAPPY"},
+                partition_keys=[glue.CfnTable.ColumnProperty(name="log_date", type="string")],
+                storage_descriptor=glue.CfnTable.StorageDescriptorProperty(
+                    columns=[
+                        glue.CfnTable.ColumnProperty(name=column, type=column_type)
+                        for column, (column_type, _) in COMPACTED_COLUMNS.items()
+                    ],
+                    location=f"{bucket_url}/{COMPACTED_PREFIX}/",
+                    input_format="org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat",
+                    output_format="org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat",
+                    serde_info=glue.CfnTable.SerdeInfoProperty(
+                        serialization_library="org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe"
+                    )
+                )
+            )
+        )
+        compacted_table.add_dependency(database)
+
+        work_group = athena.CfnWorkGroup(
+            self,
+            "rGenAiTriviaCdnLogsWorkGroup",
+            name=CDN_LOGS_WORKGROUP,
+            recursive_delete_option=True,
+            work_group_configuration=athena.CfnWorkGroup.WorkGroupConfigurationProperty(
+                enforce_work_group_configuration=True,
+                result_configuration=athena.CfnWorkGroup.ResultConfigurationProperty(
+                    output_location=f"{bucket_url}/{RESULTS_PREFIX}/",
+                    encryption_configuration=athena.CfnWorkGroup.EncryptionConfigurationProperty(
+                        encryption_option="SSE_S3"
+                    )
+                )
+            )
+        )
+
+        self.state_machine = sfn.StateMachine(
+            self,
+            "rGenAiTriviaCdnLogsCompactionStateMachine",
+            state_machine_name="gen-ai-trivia-cdn-log-compaction",
+            definition_body=sfn.DefinitionBody.from_chainable(self._create_definition(work_group)),
+            timeout=Duration.hours(1)
+        )
+
+        log_bucket.grant_read_write(self.state_machine)
+
+        events.Rule(
+            self,
+            "rGenAiTriviaCdnLogsCompactionSchedule",
+            schedule=events.Schedule.expression(logs_config.get("scheduleExpression", "cron(0 4 * * ? *)")),
+            targets=[targets.SfnStateMachine(self.state_machine)]
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            self.state_machine,
+            [
+                {
+                    "id": "AwsSolutions-IAM5",
+                    "reason": "The log files and the Athena query results use generated object keys.",
+                },
+                {
+                    "id": "AwsSolutions-SF1",
+                    "reason": "The state machine does not log its events, failed executions are visible in the console.",
+                },
+                {
+                    "id": "AwsSolutions-SF2",
+                    "reason": "The state machine does not have X-Ray tracing enabled.",
+                }
+            ],
+            apply_to_children=True
+        )
+
+    def _create_definition(self, work_group: athena.CfnWorkGroup) -> sfn.IChainable:
+        """
+        Create the steps of the compaction state machine.
+
+        Args:
+            work_group (athena.CfnWorkGroup): The Athena workgroup running the queries.
+
+        Returns:
+            sfn.IChainable: The first step of the state machine.
+
+        The scheduled execution compacts the previous day. An execution started
+        with {"date": "YYYY-MM-DD"} compacts that day instead, as long as its raw
+        files are still kept. INSERT INTO adds the partition of the day to the
+        table, so running the same day twice duplicates its rows.
+        """
+        use_given_date = sfn.Pass(
+            self,
+            "Use given date",
+            parameters={"date": sfn.JsonPath.string_at("$.date")},
+            result_path="$.run"
+        )
+        use_previous_day = sfn.Pass(
+            self,
+            "Use previous day",
+            parameters={"date": ""},
+            result_path="$.run"
+        )
+
+        columns = ", ".join(f"{expression} AS {column}" for column, (_, expression) in COMPACTED_COLUMNS.items())
+        # An empty date selects the previous day, the partition column has to be the last column of the query
+        compact_query = sfn.JsonPath.format(
+            f"INSERT INTO {COMPACTED_TABLE} "
+            f"SELECT {columns}, CAST(\"date\" AS varchar) AS log_date FROM {RAW_TABLE} "
+            "WHERE \"date\" = COALESCE(TRY_CAST({} AS date), current_date - INTERVAL '1' DAY)",
+            sfn.JsonPath.format("'{}'", sfn.JsonPath.string_at("$.run.date"))
+        )
+
+        compact = tasks.AthenaStartQueryExecution(
+            self,
+            "Compact logs",
+            query_string=compact_query,
+            work_group=work_group.name,
+            query_execution_context=tasks.QueryExecutionContext(database_name=CDN_LOGS_DATABASE),
+            integration_pattern=sfn.IntegrationPattern.RUN_JOB,
+            result_path=sfn.JsonPath.DISCARD
+        )
+
+        choose_date = sfn.Choice(self, "Date given?")
+        choose_date.when(sfn.Condition.is_present("$.date"), use_given_date.next(compact))
+        choose_date.otherwise(use_previous_day.next(compact))
+        return choose_date
@@ -9,10 +9,14 @@ from aws_cdk import (
     RemovalPolicy,
     aws_s3 as s3,
     aws_iam as iam,
+    aws_lambda as _lambda,
     aws_ssm as ssm
 )
 from cdk_nag import NagSuppressions
 
+# Prefix of the CloudFront standard logs in the log bucket
+LOG_FILE_PREFIX = "gen-ai-trivia-frontend-cloudfront-logs"
+
 
 class CreateCloudFrontFrontEnd(Construct):
     """
@@ -120,7 +124,8 @@ class CreateCloudFrontFrontEnd(Construct):
             ],
             enable_logging=True,
             log_bucket=self.log_bucket,
-            log_file_prefix="gen-ai-trivia-frontend-cloudfront-logs"
+            # CloudFront appends the file names to the prefix as is, the slash makes it a folder
+            log_file_prefix=f"{LOG_FILE_PREFIX}/"
         )
 
         NagSuppressions.add_resource_suppressions(
@@ -181,3 +186,38 @@ class CreateCloudFrontFrontEnd(Construct):
             str: The CloudFront distribution domain name.
         """
         return self.distribution.distribution_domain_name
+
+    def add_function_url_behavior(
+        self,
+        path_pattern: str,
+        function_url: _lambda.IFunctionUrl,
+        cache_policy: cloudfront.ICachePolicy = cloudfront.CachePolicy.CACHING_DISABLED,
+        allowed_methods: cloudfront.AllowedMethods = cloudfront.AllowedMethods.ALLOW_GET_HEAD
+    ):
+        """
+        Route a path pattern of the distribution to a Lambda Function URL.
+
+        Args:
+            path_pattern (str): The path pattern of the behavior, for example "/api/leaderboard".
+            function_url (lambda.IFunctionUrl): The Function URL used as the origin.
+            cache_policy (cloudfront.ICachePolicy, optional): The cache policy of the behavior.
+                Defaults to caching disabled.
+            allowed_methods (cloudfront.AllowedMethods, optional): The HTTP methods allowed by
+                the behavior. Defaults to GET and HEAD.
+
+        Function URLs using AWS_IAM authentication are signed by CloudFront through an
+        origin access control, so they can only be reached through the distribution.
+        """
+        if function_url.auth_type == _lambda.FunctionUrlAuthType.AWS_IAM:
+            origin = origins.FunctionUrlOrigin.with_origin_access_control(function_url)
+        else:
+            origin = origins.FunctionUrlOrigin(function_url)
+
+        self.distribution.add_behavior(
+            path_pattern,
+            origin,
+            allowed_methods=allowed_methods,
+            cache_policy=cache_policy,
+            compress=True,
+            viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS
+        )
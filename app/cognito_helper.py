@@ -28,7 +28,7 @@ class CognitoUserPool(Construct):
         identity_pool (cognitoip.IdentityPool): The Cognito identity pool.
     """
 
-    def __init__(self, scope: Construct, id: str, table_name: str, **kwargs):
+    def __init__(self, scope: Construct, id: str, table_name: str, regions: list = None, **kwargs):
         """
         Initialize the CognitoUserPool construct.
 
@@ -36,6 +36,8 @@ class CognitoUserPool(Construct):
             scope (Construct): The scope of the construct.
             id (str): The ID of the construct.
             table_name (str): The name of the DynamoDB table.
+            regions (list, optional): Regions the game calls the table and functions in.
+                Defaults to the region of the stack.
             **kwargs: Additional arguments.
         """
         super().__init__(scope, id, **kwargs)
@@ -45,6 +47,7 @@ class CognitoUserPool(Construct):
         region = stack.region
         account = stack.account
         partition = stack.partition
+        regions = regions or [region]
 
         # Cognito User Pool
         self.user_pool = cognito.UserPool(
@@ -74,7 +77,7 @@ class CognitoUserPool(Construct):
             ]
         )
 
-        user_pool_client = self.user_pool.add_client(
+        self.user_pool_client = self.user_pool.add_client(
             "rGenAiTriviaCognitoUserPoolClient",
             user_pool_client_name="GenAI-Trivia-UserPoolClient",
             # id_token_validity=Duration.days(1),
@@ -92,7 +95,7 @@ class CognitoUserPool(Construct):
                 user_pools=[
                     cognitoip.UserPoolAuthenticationProvider(
                         user_pool=self.user_pool,
-                        user_pool_client=user_pool_client
+                        user_pool_client=self.user_pool_client
                     )
                 ]
             )
@@ -101,18 +104,15 @@ class CognitoUserPool(Construct):
         self.identity_pool.authenticated_role.add_to_principal_policy(
             iam.PolicyStatement(
                 effect=iam.Effect.ALLOW,
-                actions=[
-                    "dynamodb:PutItem",
-                    "dynamodb:Scan",
-                    "dynamodb:Query",
-                    "dynamodb:UpdateItem",
-                    "dynamodb:UpdateTable",
-                    "dynamodb:GetRecords"
-                ],
+                # Scores are written through the gen-ai-trivia-submit-score function
+                actions=["dynamodb:Query"],
                 resources=[
-                    f"arn:{partition}:dynamodb:{region}:{account}:table/{table_name}/index/*",
-                    f"arn:{partition}:dynamodb:{region}:{account}:table/{table_name}/stream/*",
-                    f"arn:{partition}:dynamodb:{region}:{account}:table/{table_name}"
+                    resource
+                    for region in regions
+                    for resource in (
+                        f"arn:{partition}:dynamodb:{region}:{account}:table/{table_name}/index/*",
+                        f"arn:{partition}:dynamodb:{region}:{account}:table/{table_name}"
+                    )
                 ]
             )
         )
@@ -125,7 +125,9 @@ class CognitoUserPool(Construct):
                     "lambda:InvokeAsync"
                 ],
                 resources=[
-                    f"arn:{partition}:lambda:{region}:{account}:function:bedrock-generate-questions-streaming"
+                    f"arn:{partition}:lambda:{region}:{account}:function:{function_name}"
+                    for region in regions
+                    for function_name in ("bedrock-generate-questions-streaming", "gen-ai-trivia-submit-score")
                 ]
             )
         )
@@ -160,7 +162,7 @@ class CognitoUserPool(Construct):
             self,
             "rGenAiTriviaCognitoUserPoolClientId",
             parameter_name="/genAiTrivia/cognito/userPoolClientId",
-            string_value=user_pool_client.user_pool_client_id,
+            string_value=self.user_pool_client.user_pool_client_id,
         )
         ssm.StringParameter(
             self,
@@ -0,0 +1,112 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from constructs import Construct
+from aws_cdk import aws_dynamodb as dynamodb
+from app.app_stack import ApplicationStack
+from app.lambda_streaming import BedrockStreamingFunction
+from app.leaderboard_api import LeaderboardFunction
+from app.room_api import RoomApi
+from app.score_ingestion import ScoreIngestion
+from app.telemetry_collector import TelemetryCollector
+
+
+class ComputeStack(ApplicationStack):
+    """
+    Compute stack for Gen AI Trivia.
+
+    This stack creates the Lambda functions, so Lambda code changes only
+    update this stack. Every deployment region runs question generation and
+    score ingestion. The leaderboard and telemetry origins and the shared rooms
+    are only created in the primary region.
+
+    Attributes:
+        streaming_lambda (BedrockStreamingFunction): The Lambda function for streaming question generation.
+        score_ingestion (ScoreIngestion): The score submission function, queue and batch writer.
+        leaderboard (LeaderboardFunction): The Lambda function serving the cached leaderboard, primary region only.
+        rooms (RoomApi): The WebSocket API and Lambda function of the shared-room mode, primary region only.
+        telemetry (TelemetryCollector): The Lambda function collecting browser timings, primary region only.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        config: dict,
+        table: dynamodb.ITable = None,
+        room_table: dynamodb.ITable = None,
+        user_pool_id: str = None,
+        user_pool_client_id: str = None,
+        primary: bool = True,
+        **kwargs
+    ) -> None:
+        """
+        Initialize the ComputeStack.
+
+        Args:
+            scope (Construct): The parent of this stack, usually an App or a Stage, but could be any construct.
+            construct_id (str): The identifier of this stack. Must be unique within this scope.
+            config (dict): Application configuration.
+            table (dynamodb.ITable, optional): The high score table from the DataStack. In a secondary
+                region the local replica of the table is used instead.
+            room_table (dynamodb.ITable, optional): The room and connection table from the DataStack.
+                Required in the primary region.
+            user_pool_id (str, optional): The Cognito user pool ID from the AuthStack.
+                Required in the primary region.
+            user_pool_client_id (str, optional): The Cognito user pool client ID from the AuthStack.
+                Required in the primary region.
+            primary (bool, optional): Whether this is the stack of the primary region. Defaults to True.
+            **kwargs: Other parameters passed to the base class.
+        """
+        super().__init__(scope, construct_id, config=config, **kwargs)
+
+        if table is None:
+            table = dynamodb.Table.from_table_name(
+                self,
+                "rGenAiTriviaHighScoreReplica",
+                config["appInfrastructure"]["dynamoDb"]["tableName"]
+            )
+
+        # BedRock
+        self.streaming_lambda = BedrockStreamingFunction(
+            self,
+            "rBedrockStreamingFunction",
+            config=config
+        )
+
+        # High scores, queued and written in batches to the table of this region
+        self.score_ingestion = ScoreIngestion(
+            self,
+            "rScoreIngestion",
+            table=table,
+            config=config
+        )
+
+        if not primary:
+            return
+
+        # Leaderboard, cached at the edge and in the function
+        self.leaderboard = LeaderboardFunction(
+            self,
+            "rLeaderboardFunction",
+            table=table,
+            config=config
+        )
+
+        # Shared rooms, one question generation broadcast to all players of a room
+        self.rooms = RoomApi(
+            self,
+            "rRoomApi",
+            table=room_table,
+            generation_function=self.streaming_lambda.lambda_function,
+            user_pool_id=user_pool_id,
+            user_pool_client_id=user_pool_client_id,
+            config=config
+        )
+
+        # Browser timings of the game, sent through CloudFront and written as metrics
+        self.telemetry = TelemetryCollector(
+            self,
+            "rTelemetryCollector",
+            config=config
+        )
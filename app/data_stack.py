@@ -0,0 +1,56 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from constructs import Construct
+from app.app_stack import ApplicationStack, get_deployment_regions
+from app.dynamodb_helper import create_dynamodb, create_room_table
+from app.score_analytics import ScoreAnalytics
+
+
+class DataStack(ApplicationStack):
+    """
+    Data stack for Gen AI Trivia.
+
+    This stack creates the DynamoDB table holding the high scores and the
+    table holding the rooms and WebSocket connections of the shared-room mode.
+    The high scores are exported to S3 on a schedule, so analytics do not read
+    the table. In a multi-region deployment the high score table is a global
+    table with a replica in every secondary region.
+
+    Attributes:
+        table (dynamodb.ITable): The DynamoDB table.
+        room_table (dynamodb.ITable): The room and connection table.
+        analytics (ScoreAnalytics): The scheduled export of the high scores to Parquet.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, config: dict, **kwargs) -> None:
+        """
+        Initialize the DataStack.
+
+        Args:
+            scope (Construct): The parent of this stack, usually an App or a Stage, but could be any construct.
+            construct_id (str): The identifier of this stack. Must be unique within this scope.
+            config (dict): Application configuration.
+            **kwargs: Other parameters passed to the base class.
+        """
+        super().__init__(scope, construct_id, config=config, **kwargs)
+
+        # DynamoDB Tables
+        self.table = create_dynamodb(
+            scope=self,
+            table_name=config["appInfrastructure"]["dynamoDb"]["tableName"],
+            capacity=config["appInfrastructure"]["dynamoDb"].get("capacity", {}),
+            replica_regions=get_deployment_regions(config, self.region)[1:]
+        )
+
+        self.room_table = create_room_table(
+            scope=self,
+            table_name=config["appInfrastructure"]["rooms"]["tableName"]
+        )
+
+        self.analytics = ScoreAnalytics(
+            self,
+            "rScoreAnalytics",
+            table=self.table,
+            config=config
+        )
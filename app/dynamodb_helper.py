@@ -1,11 +1,22 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: MIT-0
 
+from functools import partial
 from aws_cdk import aws_dynamodb as dynamodb, RemovalPolicy
+from cdk_nag import NagSuppressions
+from app.performance_checks import PerformanceSuppressions
+
+# Indexes created on the high score table and their key schema
+SCORE_INDEXES = {
+    "sortedScores": {
+        "partition_key": dynamodb.Attribute(name="sortID", type=dynamodb.AttributeType.NUMBER),
+        "sort_key": dynamodb.Attribute(name="score", type=dynamodb.AttributeType.NUMBER),
+    }
+}
 
 
 def create_dynamodb(
-    scope, table_name: str, pit_recovery: bool = True
+    scope, table_name: str, pit_recovery: bool = True, capacity: dict = None, replica_regions: list = None
 ) -> dynamodb.ITable:
     """
     Create a DynamoDB table.
@@ -14,10 +25,33 @@ def create_dynamodb(
         scope (Construct): The scope in which to define this construct.
         table_name (str): Desired DynamoDB Table name.
         pit_recovery (bool, optional): Enable Point in Time Recovery. Defaults to True.
+        capacity (dict, optional): Capacity configuration from the "capacity" section of the
+            deploy config. Defaults to on-demand (PAY_PER_REQUEST) billing.
+        replica_regions (list, optional): Other regions that get a replica of the table,
+            which makes it a global table. Defaults to no replicas.
 
     Returns:
         dynamodb.ITable: CDK Interface for created DynamoDB Table
+
+    In PROVISIONED mode, the table and every global secondary index are created with
+    their configured minimum capacity and a target-tracking autoscaling policy for
+    reads and writes. Warm throughput and contributor insights are only set when
+    configured, for the table and each index independently.
+
+    With replica regions, every region reads and writes its own replica and
+    DynamoDB replicates the writes between them, last writer wins. Scores are
+    never updated, so concurrent writes to the same item do not happen.
     """
+    capacity = capacity or {}
+    billing_mode = capacity.get("billingMode", "PAY_PER_REQUEST").upper()
+    if billing_mode not in ("PAY_PER_REQUEST", "PROVISIONED"):
+        raise ValueError(
+            f"Unsupported DynamoDB billingMode '{billing_mode}', expected PAY_PER_REQUEST or PROVISIONED"
+        )
+    provisioned = billing_mode == "PROVISIONED"
+    contributor_insights = capacity.get("contributorInsights", False)
+    table_capacity = capacity.get("table", {})
+    index_capacity = capacity.get("globalSecondaryIndexes", {})
 
     table = dynamodb.Table(
         scope,
@@ -27,14 +61,173 @@ def create_dynamodb(
         sort_key=dynamodb.Attribute(name="score", type=dynamodb.AttributeType.NUMBER),
         point_in_time_recovery=pit_recovery,
         removal_policy=RemovalPolicy.DESTROY,
+        billing_mode=dynamodb.BillingMode[billing_mode],
+        contributor_insights_enabled=contributor_insights,
+        replication_regions=replica_regions or None,
+        **_capacity_props(table_capacity, provisioned)
     )
 
-    table.add_global_secondary_index(
-        index_name="sortedScores",
-        partition_key=dynamodb.Attribute(
-            name="sortID", type=dynamodb.AttributeType.NUMBER
-        ),
-        sort_key=dynamodb.Attribute(name="score", type=dynamodb.AttributeType.NUMBER),
+    if provisioned:
+        _scale_on_utilization(table.auto_scale_read_capacity, table_capacity.get("read", {}))
+        _scale_on_utilization(table.auto_scale_write_capacity, table_capacity.get("write", {}))
+
+    for index_name, keys in SCORE_INDEXES.items():
+        index_config = index_capacity.get(index_name, {})
+        table.add_global_secondary_index(
+            index_name=index_name,
+            contributor_insights_enabled=contributor_insights,
+            **keys,
+            **_capacity_props(index_config, provisioned)
+        )
+
+        if provisioned:
+            _scale_on_utilization(
+                partial(table.auto_scale_global_secondary_index_read_capacity, index_name),
+                index_config.get("read", {})
+            )
+            _scale_on_utilization(
+                partial(table.auto_scale_global_secondary_index_write_capacity, index_name),
+                index_config.get("write", {})
+            )
+
+    PerformanceSuppressions.add_resource_suppressions(
+        table,
+        [
+            {
+                "id": "Performance-DDB2",
+                "reason": "sortedScores keeps every score in one sortID partition so the top scores are " \
+                    "a single sorted query, viewers read them through the cached leaderboard endpoint."
+            }
+        ]
+    )
+
+    return table
+
+
+def create_room_table(scope, table_name: str) -> dynamodb.ITable:
+    """
+    Create the DynamoDB table of the shared-room game mode.
+
+    Args:
+        scope (Construct): The scope in which to define this construct.
+        table_name (str): Desired DynamoDB Table name.
+
+    Returns:
+        dynamodb.ITable: CDK Interface for created DynamoDB Table
+
+    The table holds short lived room state in a single table design, keyed by
+    "pk" and "sk":
+    - ROOM#<roomId> / META: host, topic, round, questions and question clock
+    - ROOM#<roomId> / CONN#<connectionId>: player name and room score
+    - CONN#<connectionId> / META: the room a WebSocket connection has joined
+    Items expire through the "expiresAt" TTL attribute.
+    """
+    table = dynamodb.Table(
+        scope,
+        f"rGenAiTriviaDynamoDBTable{table_name.title().replace('/','')}",
+        table_name=table_name,
+        partition_key=dynamodb.Attribute(name="pk", type=dynamodb.AttributeType.STRING),
+        sort_key=dynamodb.Attribute(name="sk", type=dynamodb.AttributeType.STRING),
+        time_to_live_attribute="expiresAt",
+        removal_policy=RemovalPolicy.DESTROY,
+        billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST
+    )
+
+    NagSuppressions.add_resource_suppressions(
+        table,
+        [
+            {
+                "id": "AwsSolutions-DDB3",
+                "reason": "Room state only lives for the duration of a game and expires through TTL."
+            }
+        ]
     )
 
     return table
+
+
+def create_rate_limit_table(scope, table_name: str) -> dynamodb.ITable:
+    """
+    Create the DynamoDB table of the question generation rate limits.
+
+    Args:
+        scope (Construct): The scope in which to define this construct.
+        table_name (str): Desired DynamoDB Table name.
+
+    Returns:
+        dynamodb.ITable: CDK Interface for created DynamoDB Table
+
+    The table is keyed by "pk":
+    - <cognitoIdentityId>: the token bucket of a player, tokens and updatedAt
+    - #SATURATION: the time until which Bedrock is treated as saturated
+    Items expire through the "expiresAt" TTL attribute.
+    """
+    table = dynamodb.Table(
+        scope,
+        f"rGenAiTriviaDynamoDBTable{table_name.title().replace('/','')}",
+        table_name=table_name,
+        partition_key=dynamodb.Attribute(name="pk", type=dynamodb.AttributeType.STRING),
+        time_to_live_attribute="expiresAt",
+        removal_policy=RemovalPolicy.DESTROY,
+        billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST
+    )
+
+    NagSuppressions.add_resource_suppressions(
+        table,
+        [
+            {
+                "id": "AwsSolutions-DDB3",
+                "reason": "Rate limit counters are refilled over time and expire through TTL."
+            }
+        ]
+    )
+
+    return table
+
+
+def _capacity_props(config: dict, provisioned: bool) -> dict:
+    """
+    Build the capacity related properties shared by a table and its indexes.
+
+    Args:
+        config (dict): Capacity configuration of the table or index.
+        provisioned (bool): Whether the table uses PROVISIONED billing.
+
+    Returns:
+        dict: Keyword arguments for dynamodb.Table or add_global_secondary_index.
+    """
+    props = {}
+    if provisioned:
+        props["read_capacity"] = config.get("read", {}).get("minCapacity", 5)
+        props["write_capacity"] = config.get("write", {}).get("minCapacity", 5)
+
+    warm_throughput = config.get("warmThroughput")
+    if warm_throughput:
+        props["warm_throughput"] = dynamodb.WarmThroughput(
+            read_units_per_second=warm_throughput.get("readUnitsPerSecond"),
+            write_units_per_second=warm_throughput.get("writeUnitsPerSecond")
+        )
+
+    return props
+
+
+def _scale_on_utilization(enable_scaling, config: dict) -> None:
+    """
+    Attach a target-tracking autoscaling policy to a capacity dimension.
+
+    Args:
+        enable_scaling (Callable): Function enabling autoscaling for the dimension,
+            called with min_capacity and max_capacity.
+        config (dict): Autoscaling range and target utilization for the dimension.
+
+    Returns:
+        None
+    """
+    min_capacity = config.get("minCapacity", 5)
+    scalable = enable_scaling(
+        min_capacity=min_capacity,
+        max_capacity=max(config.get("maxCapacity", 100), min_capacity)
+    )
+    scalable.scale_on_utilization(
+        target_utilization_percent=config.get("targetUtilization", 70)
+    )
@@ -0,0 +1,113 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from constructs import Construct
+from aws_cdk import (
+    CfnOutput,
+    Duration,
+    aws_cloudfront as cloudfront,
+    aws_lambda as _lambda
+)
+from app.app_stack import ApplicationStack
+from app.cdn_log_analytics import CdnLogAnalytics
+from app.cloudfront_helper import CreateCloudFrontFrontEnd
+from app.frontend_deployment import FrontendDeployment
+
+
+class EdgeStack(ApplicationStack):
+    """
+    Edge stack for Gen AI Trivia.
+
+    This stack creates the CloudFront distribution for frontend hosting,
+    deploys the web bundle with its runtime configuration, and routes the API
+    paths to their Function URLs. CloudFront updates are slow, so keeping them
+    in their own stack stops them from blocking other changes.
+
+    Attributes:
+        cloudfront (CreateCloudFrontFrontEnd): The CloudFront distribution for frontend hosting.
+        frontend (FrontendDeployment): The deployment of the web bundle and its config.json.
+        cdn_logs (CdnLogAnalytics): The daily compaction of the CloudFront logs.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        config: dict,
+        leaderboard_function_url: _lambda.IFunctionUrl,
+        telemetry_function_url: _lambda.IFunctionUrl,
+        runtime_config: dict,
+        **kwargs
+    ) -> None:
+        """
+        Initialize the EdgeStack.
+
+        Args:
+            scope (Construct): The parent of this stack, usually an App or a Stage, but could be any construct.
+            construct_id (str): The identifier of this stack. Must be unique within this scope.
+            config (dict): Application configuration.
+            leaderboard_function_url (lambda.IFunctionUrl): Function URL of the leaderboard from the ComputeStack.
+            telemetry_function_url (lambda.IFunctionUrl): Function URL of the telemetry collector from the ComputeStack.
+            runtime_config (dict): Values of the other stacks published to the SPA as config.json.
+            **kwargs: Other parameters passed to the base class.
+        """
+        super().__init__(scope, construct_id, config=config, **kwargs)
+
+        # CloudFront
+        self.cloudfront = CreateCloudFrontFrontEnd(
+            self,
+            "rCreateCloudFrontFrontEnd"
+        )
+
+        cf_distribution_domain_name = self.cloudfront.get_distribution_domain_name()
+
+        CfnOutput(
+            self,
+            "oGenAiTriviaCloudFrontDistributionDomainName",
+            value=cf_distribution_domain_name,
+            description="CloudFront Distribution Domain Name"
+        )
+
+        # Standard logs compacted daily to Parquet, for cache hit ratio and latency reports
+        self.cdn_logs = CdnLogAnalytics(
+            self,
+            "rCdnLogAnalytics",
+            log_bucket=self.cloudfront.log_bucket,
+            config=config
+        )
+
+        # Leaderboard, honors the s-maxage sent by the function with a short default for safety
+        leaderboard_config = config["appInfrastructure"].get("leaderboard", {})
+        s_max_age = leaderboard_config.get("sMaxAgeSeconds", 5)
+        leaderboard_cache_policy = cloudfront.CachePolicy(
+            self,
+            "rGenAiTriviaLeaderboardCachePolicy",
+            comment="Gen AI Trivia leaderboard",
+            min_ttl=Duration.seconds(0),
+            default_ttl=Duration.seconds(s_max_age),
+            max_ttl=Duration.seconds(max(s_max_age, 60)),
+            enable_accept_encoding_gzip=True,
+            enable_accept_encoding_brotli=True
+        )
+
+        self.cloudfront.add_function_url_behavior(
+            "/api/leaderboard",
+            leaderboard_function_url,
+            cache_policy=leaderboard_cache_policy
+        )
+
+        # Telemetry beacons, same origin as the SPA so the browser sends them without CORS
+        self.cloudfront.add_function_url_behavior(
+            "/api/telemetry",
+            telemetry_function_url,
+            allowed_methods=cloudfront.AllowedMethods.ALLOW_ALL
+        )
+
+        # Web bundle built in the pipeline Synth step, with the values it needs at runtime
+        self.frontend = FrontendDeployment(
+            self,
+            "rGenAiTriviaFrontendDeployment",
+            bucket=self.cloudfront.app_bucket,
+            distribution=self.cloudfront.distribution,
+            runtime_config=runtime_config
+        )
@@ -0,0 +1,101 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from constructs import Construct
+from aws_cdk import (
+    Stack,
+    aws_s3 as s3,
+    aws_cloudfront as cloudfront,
+    aws_s3_deployment as s3deploy
+)
+from cdk_nag import NagSuppressions
+
+RUNTIME_CONFIG_KEY = "config.json"
+
+
+class FrontendDeployment(Construct):
+    """
+    Deploys the frontend and its runtime configuration to the frontend bucket.
+
+    The web bundle is built once in the pipeline Synth step and does not
+    contain any deployment specific values. Those values are published next to
+    it as config.json, which the SPA fetches at startup, so the same bundle can
+    be promoted unchanged.
+
+    Attributes:
+        bundle_deployment (s3_deployment.BucketDeployment): Deploys the built web bundle.
+        config_deployment (s3_deployment.BucketDeployment): Deploys the runtime configuration.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        id: str,
+        bucket: s3.IBucket,
+        distribution: cloudfront.IDistribution,
+        runtime_config: dict,
+        bundle_path: str = "./www/dist",
+        **kwargs
+    ):
+        """
+        Initialize the FrontendDeployment construct.
+
+        Args:
+            scope (Construct): The scope of the construct.
+            id (str): The ID of the construct.
+            bucket (s3.IBucket): The frontend bucket.
+            distribution (cloudfront.IDistribution): The distribution serving the frontend bucket.
+            runtime_config (dict): Values published as config.json, may contain tokens from other stacks.
+            bundle_path (str, optional): The directory holding the built web bundle. Defaults to "./www/dist".
+            **kwargs: Additional arguments.
+        """
+        super().__init__(scope, id, **kwargs)
+
+        # Vite fingerprints every asset file name, so only the entry page needs an invalidation
+        self.bundle_deployment = s3deploy.BucketDeployment(
+            self,
+            "rGenAiTriviaDeploySourceToBucket",
+            sources=[s3deploy.Source.asset(bundle_path)],
+            destination_bucket=bucket,
+            distribution=distribution,
+            distribution_paths=["/index.html"],
+            exclude=[RUNTIME_CONFIG_KEY],
+            memory_limit=512
+        )
+
+        self.config_deployment = s3deploy.BucketDeployment(
+            self,
+            "rGenAiTriviaDeployRuntimeConfig",
+            sources=[s3deploy.Source.json_data(RUNTIME_CONFIG_KEY, runtime_config)],
+            destination_bucket=bucket,
+            distribution=distribution,
+            distribution_paths=[f"/{RUNTIME_CONFIG_KEY}"],
+            cache_control=[s3deploy.CacheControl.no_cache()],
+            prune=False,
+            memory_limit=512
+        )
+
+        # The BucketDeployment handler and its role are a singleton in the stack
+        stack = Stack.of(self)
+        for child in stack.node.children:
+            if not child.node.id.startswith("Custom::CDKBucketDeployment"):
+                continue
+            NagSuppressions.add_resource_suppressions(
+                child,
+                [
+                    {
+                        "id": "AwsSolutions-IAM4",
+                        "reason": "The IAM user, role, or group uses AWS managed policies."
+                    },
+                    {
+                        "id": "AwsSolutions-IAM5",
+                        "reason": "The IAM entity contains wildcard permissions and does not have " \
+                            "a cdk-nag rule suppression with evidence for those permission."
+                    },
+                    {
+                        "id": "AwsSolutions-L1",
+                        "reason": "The non-container Lambda function is not configured to use the latest runtime version."
+                    }
+                ],
+                apply_to_children=True
+            )
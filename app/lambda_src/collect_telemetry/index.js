@@ -0,0 +1,102 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+
+// Receives batches of game timings the browser sends with navigator.sendBeacon
+// and writes them as CloudWatch embedded metric format. CloudWatch derives the
+// percentiles (p50, p90, p99) of each timing per topic, difficulty and region.
+
+const METRICS_NAMESPACE = process.env.METRICS_NAMESPACE || 'GenAiTrivia';
+const MAX_BODY_BYTES = parseInt(process.env.MAX_BODY_BYTES || '16384');
+const MAX_SAMPLES = parseInt(process.env.MAX_SAMPLES || '100');
+// Custom topics are free text, they are reported as one "Custom" topic
+const KNOWN_TOPICS = new Set(JSON.parse(process.env.KNOWN_TOPICS || '[]'));
+const KNOWN_DIFFICULTIES = new Set(JSON.parse(process.env.KNOWN_DIFFICULTIES || '[]'));
+const REGION_PATTERN = /^[a-z]{2}(-[a-z]+)+-\d$/;
+// Timings the game records, in milliseconds from the start of the measured step
+const METRICS = new Set([
+    'AuthSession',
+    'InvokeStart',
+    'FirstChunk',
+    'FirstQuestion',
+    'RoundLoaded',
+    'LeaderboardLoad'
+]);
+const MAX_VALUE_MS = 300000;
+// Values per metric in one EMF document
+const MAX_VALUES_PER_METRIC = 100;
+
+function dimensionsOf(sample) {
+    return {
+        Topic: KNOWN_TOPICS.has(sample.topic) ? sample.topic : (sample.topic ? 'Custom' : 'None'),
+        Difficulty: KNOWN_DIFFICULTIES.has(sample.difficulty) ? sample.difficulty : 'None',
+        Region: REGION_PATTERN.test(sample.region || '') ? sample.region : 'None'
+    };
+}
+
+// Groups valid samples by their dimensions, dropping anything malformed
+function aggregate(samples) {
+    const groups = new Map();
+    for (const sample of samples.slice(0, MAX_SAMPLES)) {
+        const value = Number(sample?.value);
+        if (!METRICS.has(sample?.metric) || !Number.isFinite(value) || value < 0 || value > MAX_VALUE_MS) {
+            continue;
+        }
+        const dimensions = dimensionsOf(sample);
+        const key = JSON.stringify(dimensions);
+        if (!groups.has(key)) {
+            groups.set(key, { dimensions, values: {} });
+        }
+        const values = groups.get(key).values;
+        (values[sample.metric] ||= []).push(Math.round(value));
+    }
+    return [...groups.values()];
+}
+
+function logMetrics({ dimensions, values }) {
+    const names = Object.keys(values);
+    const longest = Math.max(...names.map((name) => values[name].length));
+    for (let offset = 0; offset < longest; offset += MAX_VALUES_PER_METRIC) {
+        const metrics = {};
+        for (const name of names) {
+            const slice = values[name].slice(offset, offset + MAX_VALUES_PER_METRIC);
+            if (slice.length > 0) {
+                metrics[name] = slice;
+            }
+        }
+        console.log(JSON.stringify({
+            _aws: {
+                Timestamp: Date.now(),
+                CloudWatchMetrics: [{
+                    Namespace: METRICS_NAMESPACE,
+                    Dimensions: [['Topic', 'Difficulty', 'Region'], ['Region'], []],
+                    Metrics: Object.keys(metrics).map((name) => ({ Name: name, Unit: 'Milliseconds' }))
+                }]
+            },
+            ...dimensions,
+            ...metrics
+        }));
+    }
+}
+
+exports.handler = async (event) => {
+    const body = event.isBase64Encoded
+        ? Buffer.from(event.body || '', 'base64').toString('utf-8')
+        : (event.body || '');
+    if (event.requestContext?.http?.method !== 'POST' || Buffer.byteLength(body) > MAX_BODY_BYTES) {
+        return { statusCode: 400 };
+    }
+
+    let samples;
+    try {
+        samples = JSON.parse(body).samples;
+    } catch (error) {
+        return { statusCode: 400 };
+    }
+    if (!Array.isArray(samples)) {
+        return { statusCode: 400 };
+    }
+
+    aggregate(samples).forEach(logMetrics);
+    // sendBeacon ignores the response, so there is nothing to return
+    return { statusCode: 204 };
+};
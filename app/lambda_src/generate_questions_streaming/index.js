@@ -6,71 +6,477 @@ const stream = require('stream');
 const { Readable } = stream;
 const pipeline = util.promisify(stream.pipeline);
 
+const https = require('https');
+
 const {
     BedrockRuntimeClient,
     InvokeModelWithResponseStreamCommand,
 } = require('@aws-sdk/client-bedrock-runtime'); // ES Modules import
+const { NodeHttpHandler } = require('@smithy/node-http-handler');
+const { NearDuplicateIndex, DEFAULT_THRESHOLD } = require('./near_duplicates');
+const { QuestionStreamParser } = require('./question_stream');
+const { RateLimiter } = require('./rate_limiter');
+const { captureClient, startSubsegment, traceAnnotations } = require('./tracing');
+
+// Connections are kept open between invocations of an execution environment, so
+// warm invocations skip the TLS handshake with Bedrock. A response stream can
+// pause while the model works, so only a socket idle for a full minute is dropped.
+// Bedrock is called in the region of the function unless BEDROCK_REGION is set.
+function createBedrockClient(region) {
+    return captureClient(new BedrockRuntimeClient({
+        region: region,
+        requestHandler: new NodeHttpHandler({
+            httpsAgent: new https.Agent({ keepAlive: true, keepAliveMsecs: 15000, maxSockets: 50 }),
+            connectionTimeout: 3000,
+            requestTimeout: 60000
+        })
+    }));
+}
+
+const BEDROCK_REGION = process.env.BEDROCK_REGION || process.env.AWS_REGION;
+const bedrock = createBedrockClient(BEDROCK_REGION);
+
+const MODEL_ID = process.env.MODEL_ID || 'anthropic.claude-3-sonnet-20240229-v1:0';
+
+// The rules are the same for every request, so they form a stable system prompt
+// ahead of the short request of the user turn. With PROMPT_CACHING the system
+// prompt ends in a cache checkpoint, for models that support prompt caching.
+const PROMPT_CACHING = process.env.PROMPT_CACHING === 'true';
+// The compact schema uses short keys and the index of the correct answer instead
+// of repeating its text, so each question takes fewer output tokens to generate.
+const OUTPUT_SCHEMA = process.env.OUTPUT_SCHEMA || 'compact';
+const OUTPUT_FORMATS = {
+    compact: 'Provide the questions as a JSON array of objects with the keys "q" (the question), "a" (the four answers) and "c" (the zero-based index of the correct answer in "a"), for example [{"q":"...","a":["...","...","...","..."],"c":2}]. Do not add whitespace between the JSON tokens.',
+    verbose: 'Provide the questions and answers as a JSON array of objects with the keys question, answers and correctAnswer.'
+};
+const SYSTEM_PROMPT = `You create question and answer pairs for a trivia game. Follow these rules:
+<RULES>
+   1. Each question has four answers, only one of which is correct.
+   2. When the request asks for questions with a silly answer, that many of the questions have one silly answer, but the others do not.
+   3. ${OUTPUT_FORMATS[OUTPUT_SCHEMA] || OUTPUT_FORMATS.compact}
+   4. Ensure that the correct answer is one of the answers supplied.
+   5. Skip the preamble in the output.
+   6. Ensure that every question is about a different fact.
+</RULES>`;
+const SYSTEM = PROMPT_CACHING
+    ? [{ type: 'text', text: SYSTEM_PROMPT, cache_control: { type: 'ephemeral' } }]
+    : SYSTEM_PROMPT;
+
+// Near duplicates are dropped, so a few extra questions are requested to fill the round
+const NEAR_DUPLICATE_THRESHOLD = parseFloat(process.env.NEAR_DUPLICATE_THRESHOLD || DEFAULT_THRESHOLD);
+const OVERSAMPLE_RATIO = parseFloat(process.env.QUESTION_OVERSAMPLE_RATIO || '0.2');
+
+// Output token budget of a request: the expected tokens of its questions plus headroom,
+// capped at the output limit of the model
+const MAX_TOKENS_LIMIT = parseInt(process.env.MAX_TOKENS_LIMIT || '4096');
+const BUDGET_OVERHEAD_TOKENS = 64;
+const BUDGET_HEADROOM = 1.25;
+const MAX_CONTINUATIONS = parseInt(process.env.MAX_CONTINUATIONS || '2');
+const METRICS_NAMESPACE = process.env.METRICS_NAMESPACE || 'GenAiTrivia';
+
+// Hedging: when the first token of a request takes longer than the deadline, a second
+// request is started, optionally with another model or region. The first one to stream
+// text is used and the other is aborted. The deadline is a high percentile of the
+// recent times to first token, so only the slowest requests are hedged.
+const HEDGE_ENABLED = process.env.HEDGE_ENABLED === 'true';
+const HEDGE_PERCENTILE = parseFloat(process.env.HEDGE_PERCENTILE || '95');
+const HEDGE_INITIAL_DEADLINE_MS = parseInt(process.env.HEDGE_INITIAL_DEADLINE_MS || '3000');
+const HEDGE_MIN_DEADLINE_MS = parseInt(process.env.HEDGE_MIN_DEADLINE_MS || '1000');
+const HEDGE_MAX_DEADLINE_MS = parseInt(process.env.HEDGE_MAX_DEADLINE_MS || '10000');
+const HEDGE_MODEL_ID = process.env.HEDGE_MODEL_ID || MODEL_ID;
+const HEDGE_REGION = process.env.HEDGE_REGION || BEDROCK_REGION;
+const hedgeBedrock = HEDGE_REGION === BEDROCK_REGION ? bedrock : createBedrockClient(HEDGE_REGION);
+// Times to first token of the primary requests, the deadline needs this many before it adapts
+const TTFT_WINDOW = 100;
+const TTFT_MIN_SAMPLES = 20;
+const firstTokenTimes = [];
 
-const bedrock = new BedrockRuntimeClient({ region: 'us-east-1' });
+// Per-identity limits of players invoking the function with their Cognito identity.
+// Invocations without one, such as those of the room function, are not limited.
+const rateLimiter = process.env.RATE_LIMIT_TABLE
+    ? new RateLimiter({
+        tableName: process.env.RATE_LIMIT_TABLE,
+        requestsPerMinute: parseFloat(process.env.RATE_LIMIT_REQUESTS_PER_MINUTE || '4'),
+        burst: parseFloat(process.env.RATE_LIMIT_BURST || '6'),
+        fairShare: parseFloat(process.env.RATE_LIMIT_FAIR_SHARE || '0.5'),
+        saturationSeconds: parseInt(process.env.RATE_LIMIT_SATURATION_SECONDS || '30')
+    })
+    : null;
+const THROTTLING_ERRORS = new Set(['ThrottlingException', 'ServiceQuotaExceededException']);
+
+// Output tokens per generated question, a moving average kept per execution environment
+let tokensPerQuestion = parseFloat(process.env.TOKENS_PER_QUESTION || '100');
 
 function parseBase64(message) {
     return JSON.parse(Buffer.from(message, 'base64').toString('utf-8'));
 }
 
+function tokenBudget(numberOfQuestions) {
+    const expected = BUDGET_OVERHEAD_TOKENS + numberOfQuestions * tokensPerQuestion * BUDGET_HEADROOM;
+    return Math.min(MAX_TOKENS_LIMIT, Math.ceil(expected));
+}
+
+function observeTokensPerQuestion(outputTokens, questions) {
+    if (questions > 0 && outputTokens > 0) {
+        tokensPerQuestion = 0.7 * tokensPerQuestion + 0.3 * (outputTokens / questions);
+    }
+}
+
+// An aborted primary request is recorded with the time it had waited, a lower bound
+// of its time to first token, so hedging does not pull the deadline down
+function observeFirstTokenTime(milliseconds) {
+    firstTokenTimes.push(milliseconds);
+    if (firstTokenTimes.length > TTFT_WINDOW) {
+        firstTokenTimes.shift();
+    }
+}
+
+function hedgeDeadline() {
+    if (firstTokenTimes.length < TTFT_MIN_SAMPLES) {
+        return HEDGE_INITIAL_DEADLINE_MS;
+    }
+    const sorted = [...firstTokenTimes].sort((a, b) => a - b);
+    const index = Math.min(sorted.length - 1, Math.ceil(sorted.length * HEDGE_PERCENTILE / 100) - 1);
+    return Math.min(HEDGE_MAX_DEADLINE_MS, Math.max(HEDGE_MIN_DEADLINE_MS, sorted[index]));
+}
+
+// One CloudWatch embedded metric format record per model request, the average
+// of Truncated is the share of requests that stopped at max_tokens. The average
+// of Hedged is the hedge rate, the sum of HedgeWon over the sum of Hedged the
+// share of hedges that streamed first. InputTokens only counts the input that
+// was not read from or written to the prompt cache.
+function logRequestMetrics(metrics) {
+    console.log(JSON.stringify({
+        _aws: {
+            Timestamp: Date.now(),
+            CloudWatchMetrics: [{
+                Namespace: METRICS_NAMESPACE,
+                Dimensions: [['FunctionName']],
+                Metrics: [
+                    { Name: 'Truncated', Unit: 'Count' },
+                    { Name: 'Continuation', Unit: 'Count' },
+                    { Name: 'MaxTokens', Unit: 'Count' },
+                    { Name: 'OutputTokens', Unit: 'Count' },
+                    { Name: 'QuestionsParsed', Unit: 'Count' },
+                    { Name: 'InputTokens', Unit: 'Count' },
+                    { Name: 'CacheReadInputTokens', Unit: 'Count' },
+                    { Name: 'CacheWriteInputTokens', Unit: 'Count' },
+                    { Name: 'TimeToFirstToken', Unit: 'Milliseconds' },
+                    { Name: 'QuestionsPerSecond', Unit: 'Count/Second' },
+                    { Name: 'Hedged', Unit: 'Count' },
+                    { Name: 'HedgeWon', Unit: 'Count' }
+                ]
+            }]
+        },
+        FunctionName: process.env.AWS_LAMBDA_FUNCTION_NAME,
+        ...metrics
+    }));
+}
+
+// One CloudWatch embedded metric format record per refused request, by reason
+function logThrottleMetric(reason) {
+    console.log(JSON.stringify({
+        _aws: {
+            Timestamp: Date.now(),
+            CloudWatchMetrics: [{
+                Namespace: METRICS_NAMESPACE,
+                Dimensions: [['FunctionName', 'Reason']],
+                Metrics: [{ Name: 'Throttled', Unit: 'Count' }]
+            }]
+        },
+        FunctionName: process.env.AWS_LAMBDA_FUNCTION_NAME,
+        Reason: reason,
+        Throttled: 1
+    }));
+}
+
+// The throttle record takes the place of the questions, the client retries after retryAfterSeconds
+function writeThrottle(responseStream, reason, retryAfterSeconds) {
+    logThrottleMetric(reason);
+    responseStream.write(JSON.stringify({ throttled: true, reason, retryAfterSeconds }) + '\n');
+    responseStream.end();
+}
+
+// Starts a model request and reads its events up to the first text delta. The
+// events read so far are kept in pending, the rest are read from the iterator.
+function startAttempt(client, modelId, body) {
+    const controller = new AbortController();
+    const started = Date.now();
+    const params = {
+        body: body,
+        contentType: 'application/json',
+        modelId: modelId
+    };
+    console.log(params);
+
+    const ready = (async () => {
+        const command = new InvokeModelWithResponseStreamCommand(params);
+        const response = await client.send(command, { abortSignal: controller.signal });
+        console.log('Response: ' + JSON.stringify(response));
+        const iterator = response.body[Symbol.asyncIterator]();
+        const pending = [];
+        for (;;) {
+            const { value, done } = await iterator.next();
+            if (done) {
+                break;
+            }
+            const parsed = parseBase64(value.chunk.bytes);
+            pending.push(parsed);
+            if (parsed.type === 'content_block_delta') {
+                break;
+            }
+        }
+        return { iterator, pending, timeToFirstToken: Date.now() - started };
+    })();
+    return { modelId, controller, started, ready };
+}
+
+function cancelAttempt(attempt) {
+    attempt.controller.abort();
+    attempt.ready.then(({ iterator }) => iterator.return?.()).catch(() => {});
+}
+
+// Waits for the first text of the primary request, and past the hedge deadline for
+// the first text of either request. A primary request that fails before the
+// deadline is not hedged: a throttled or invalid request would fail again and
+// only double the requests to Bedrock while it is overloaded.
+async function firstStream(body) {
+    const primary = startAttempt(bedrock, MODEL_ID, body);
+    if (!HEDGE_ENABLED) {
+        const stream = await primary.ready;
+        observeFirstTokenTime(stream.timeToFirstToken);
+        return { stream, hedged: false, hedgeWon: false };
+    }
+
+    const deadline = hedgeDeadline();
+    let timer;
+    const timeout = new Promise((resolve) => {
+        timer = setTimeout(resolve, deadline, null);
+    });
+    const early = await Promise.race([
+        primary.ready.then((stream) => ({ stream }), (error) => ({ error })),
+        timeout
+    ]);
+    clearTimeout(timer);
+    if (early?.error) {
+        throw early.error;
+    }
+    if (early) {
+        observeFirstTokenTime(early.stream.timeToFirstToken);
+        return { stream: early.stream, hedged: false, hedgeWon: false };
+    }
+
+    console.log(`No first token after ${Date.now() - primary.started} ms (deadline ${deadline} ms), hedging with ${HEDGE_MODEL_ID} in ${HEDGE_REGION}`);
+    const hedge = startAttempt(hedgeBedrock, HEDGE_MODEL_ID, body);
+    const attempts = [primary, hedge];
+    let winner;
+    try {
+        winner = await Promise.any(attempts.map((attempt) => attempt.ready.then((stream) => ({ attempt, stream }))));
+    } catch (error) {
+        throw error.errors?.[0] || error;
+    }
+    const hedgeWon = winner.attempt === hedge;
+    observeFirstTokenTime(hedgeWon ? Date.now() - primary.started : winner.stream.timeToFirstToken);
+    cancelAttempt(hedgeWon ? primary : hedge);
+    return { stream: winner.stream, hedged: true, hedgeWon };
+}
+
+// Streams one model response, passing the text to onText until it returns true.
+// Returns the stop reason, the token usage and the hedging outcome of the response.
+// The wait for the first token and the streaming phase are traced as subsegments.
+async function streamCompletion(messages, maxTokens, onText, annotations) {
+    const body = JSON.stringify({
+        anthropic_version: 'bedrock-2023-05-31',
+        max_tokens: maxTokens,
+        temperature: 0.9,
+        system: SYSTEM,
+        messages: messages,
+    });
+
+    const started = Date.now();
+    const waiting = startSubsegment('TimeToFirstToken', annotations);
+    let first;
+    try {
+        first = await firstStream(body);
+    } catch (error) {
+        waiting.close(error);
+        throw error;
+    }
+    const { stream, hedged, hedgeWon } = first;
+    waiting.annotate('hedged', hedged);
+    waiting.close();
+    const streaming = startSubsegment('Streaming', annotations);
+    const firstTokenAt = Date.now();
+    const timeToFirstToken = firstTokenAt - started;
+    let stopReason = null;
+    let outputTokens = 0;
+    let usage = {};
+
+    // Returns true once the response has enough questions
+    const handle = (parsed) => {
+        console.debug('PARSED:');
+        console.debug(parsed);
+        if (parsed.type === 'content_block_delta') {
+            if (onText(parsed.delta.text)) {
+                stopReason = 'enough_questions';
+                return true;
+            }
+        } else if (parsed.type === 'message_start') {
+            usage = parsed.message?.usage || usage;
+        } else if (parsed.type === 'message_delta') {
+            stopReason = parsed.delta.stop_reason;
+            outputTokens = parsed.usage?.output_tokens || outputTokens;
+        }
+        return false;
+    };
+
+    try {
+        let done = stream.pending.some(handle);
+        while (!done) {
+            const { value, done: ended } = await stream.iterator.next();
+            if (ended) {
+                break;
+            }
+            done = handle(parseBase64(value.chunk.bytes));
+        }
+    } catch (error) {
+        streaming.close(error);
+        throw error;
+    } finally {
+        await stream.iterator.return?.();
+    }
+    streaming.metadata('usage', { outputTokens, maxTokens, stopReason });
+    streaming.close();
+    return {
+        stopReason,
+        outputTokens,
+        inputTokens: usage.input_tokens || 0,
+        cacheReadInputTokens: usage.cache_read_input_tokens || 0,
+        cacheWriteInputTokens: usage.cache_creation_input_tokens || 0,
+        timeToFirstToken,
+        streamMilliseconds: Date.now() - firstTokenAt,
+        hedged,
+        hedgeWon
+    };
+}
+
 exports.handler = awslambda.streamifyResponse(
-    async (event, responseStream, _context) => {
+    async (event, responseStream, context) => {
 
         console.log('Event: ' + JSON.stringify(event));
-        const promptText = `I'm creating a trivia game and need questions and answers generated on the topic of ${event.topic}. Can you generate question and answer pairs using the following rules outlined below?
-        <RULES>
-           1. Generate ${event.number_questions} ${event.difficulty} questions with each question having four answers, only one of which is correct
-           2. ${event.num_silly} of the questions should have one silly answer, but the others should not.
-           3. Provide the questions and answers as a JSON array, and indicate which is the correct answer for each question by assigning it a key called correctAnswer. 
-           4. Ensure that the correct answer is one of the answers supplied. 
-           5. Skip the preamble in the output.
-           6. Ensure that there are no questions and answers that have been asked before by comparing them with the previously asked questions supplied.
-        </RULES>
-        <PREVIOUSLY-ASKED-QUESTIONS>
-        ${JSON.stringify(event.existing_questions)}
-        </PREVIOUSLY-ASKED-QUESTIONS>`
-
-        const messages = [{ role: 'user', content: promptText }];
-        const body = {
-            anthropic_version: 'bedrock-2023-05-31',
-            max_tokens: 2048,
-            temperature: 0.9,
-            system: "",
-            messages: messages,
+        const identityId = context.identity?.cognitoIdentityId;
+        if (rateLimiter && identityId) {
+            const decision = await rateLimiter.acquire(identityId);
+            if (!decision.allowed) {
+                console.log(`Throttled ${identityId} (${decision.reason}), retry after ${decision.retryAfterSeconds} s`);
+                writeThrottle(responseStream, decision.reason, decision.retryAfterSeconds);
+                return;
+            }
         }
+        // trace_id links the round of the browser to this trace, client_auth_ms is the
+        // Cognito credential exchange the browser did before it invoked the function
+        const annotations = traceAnnotations({ topic: event.topic, difficulty: event.difficulty, clientTraceId: event.trace_id });
+        const promptConstruction = startSubsegment('PromptConstruction', annotations);
+        if (Number.isFinite(event.client_auth_ms)) {
+            promptConstruction.annotate('client_auth_ms', event.client_auth_ms);
+        }
+        const numberOfQuestions = parseInt(event.number_questions);
+        const numberToGenerate = numberOfQuestions + Math.ceil(numberOfQuestions * OVERSAMPLE_RATIO);
+
+        // Questions from earlier rounds are checked here instead of being sent to the model
+        const askedQuestions = new NearDuplicateIndex({ threshold: NEAR_DUPLICATE_THRESHOLD });
+        for (const question of event.existing_questions || []) {
+            askedQuestions.add(question);
+        }
+
+        const promptText = `Generate ${numberToGenerate} ${event.difficulty} questions on the topic of ${event.topic}. ${event.num_silly} of the questions should have one silly answer.`;
+        promptConstruction.close();
 
-        const params = {
-            body: JSON.stringify(body),
-            contentType: 'application/json',
-            modelId: 'anthropic.claude-3-sonnet-20240229-v1:0'
+        // Text of the response up to the end of its last complete question
+        let completedText = '';
+        let parsedQuestions = 0;
+        let accepted = 0;
+        let rejected = 0;
+
+        // Each accepted question is written as one line of JSON
+        const writeQuestions = (parser, text) => {
+            for (const question of parser.push(text)) {
+                parsedQuestions++;
+                const duplicate = askedQuestions.addIfNew(question);
+                if (duplicate) {
+                    rejected++;
+                    console.log(`Rejected near duplicate (${duplicate.similarity.toFixed(2)}): ${question.question} ~ ${duplicate.text}`);
+                    continue;
+                }
+                responseStream.write(JSON.stringify(question) + '\n');
+                accepted++;
+                if (accepted >= numberOfQuestions) {
+                    return true;
+                }
+            }
+            return false;
         };
 
-        console.log(params);
+        for (let continuation = 0; continuation <= MAX_CONTINUATIONS; continuation++) {
+            // A continuation prefills the assistant turn with the complete questions so far,
+            // so the model resumes the JSON array right after the last complete question
+            const messages = [{ role: 'user', content: promptText }];
+            if (completedText) {
+                messages.push({ role: 'assistant', content: completedText });
+            }
+            const remaining = Math.max(numberOfQuestions - accepted, numberToGenerate - parsedQuestions);
+            const maxTokens = tokenBudget(remaining);
+            const parser = new QuestionStreamParser();
+            const parsedBefore = parsedQuestions;
 
-        const command = new InvokeModelWithResponseStreamCommand(params);
+            let text = '';
+            let completion;
+            try {
+                completion = await streamCompletion(messages, maxTokens, (delta) => {
+                    text += delta;
+                    return writeQuestions(parser, delta);
+                }, annotations);
+            } catch (error) {
+                if (!THROTTLING_ERRORS.has(error.name)) {
+                    throw error;
+                }
+                // Bedrock is out of capacity, the players that used the least of it go first for a while
+                const retryAfterSeconds = rateLimiter ? await rateLimiter.markSaturated() : 5;
+                console.log(`Bedrock throttled after ${accepted} questions: ${error.message}`);
+                writeThrottle(responseStream, 'saturated', retryAfterSeconds);
+                return;
+            }
+            const { stopReason, outputTokens } = completion;
+            completedText += text.slice(0, parser.completedLength);
+            observeTokensPerQuestion(outputTokens, parsedQuestions - parsedBefore);
 
-        const response = await bedrock.send(command);
-        console.log('Response: ' + JSON.stringify(response));
-        const chunks = [];
-
-        for await (const chunk of response.body) {
-            console.debug('CHUNK:');
-            console.debug(chunk);
-            const parsed = parseBase64(chunk.chunk.bytes);
-            console.debug('PARSED:');
-            console.debug(parsed);
-            if (parsed.type === 'content_block_delta') {
-                chunks.push(parsed.delta.text);
-                responseStream.write(parsed.delta.text);
+            const truncated = stopReason === 'max_tokens';
+            logRequestMetrics({
+                Truncated: truncated ? 1 : 0,
+                Continuation: continuation > 0 ? 1 : 0,
+                MaxTokens: maxTokens,
+                OutputTokens: outputTokens,
+                QuestionsParsed: parsedQuestions - parsedBefore,
+                InputTokens: completion.inputTokens,
+                CacheReadInputTokens: completion.cacheReadInputTokens,
+                CacheWriteInputTokens: completion.cacheWriteInputTokens,
+                TimeToFirstToken: completion.timeToFirstToken,
+                // Generation speed after the first token, compares output schemas
+                QuestionsPerSecond: (parsedQuestions - parsedBefore) / Math.max(completion.streamMilliseconds / 1000, 0.001),
+                Hedged: completion.hedged ? 1 : 0,
+                HedgeWon: completion.hedgeWon ? 1 : 0
+            });
+            console.log(JSON.stringify({ continuation, stopReason, maxTokens, outputTokens, tokensPerQuestion }));
+
+            if (!truncated || accepted >= numberOfQuestions) {
+                break;
             }
+            console.log(`Response stopped at max_tokens after ${accepted} of ${numberOfQuestions} questions, continuing`);
         }
 
-        console.log('Stream retreival is complete. Final full response:');
-        console.log(chunks.join(''));
+        console.log(JSON.stringify({ accepted, rejected, requested: numberOfQuestions, generated: numberToGenerate }));
+        console.log('Stream retreival is complete. Final complete questions:');
+        console.log(completedText);
         responseStream.end();
     }
-);
\ No newline at end of file
+);
@@ -0,0 +1,187 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+
+// Near-duplicate detection for trivia questions with MinHash signatures and
+// LSH banding. A question is reduced to the character shingles of its
+// normalized text plus its correct answer, so a rephrased question about the
+// same fact still shares most of its shingles with the original. Everything
+// runs in-process and a signature takes NUM_BANDS * ROWS_PER_BAND 32-bit
+// integers, so the index of a large topic pool fits in memory.
+
+const SHINGLE_SIZE = 5;
+const NUM_BANDS = 16;
+const ROWS_PER_BAND = 4;
+const NUM_HASHES = NUM_BANDS * ROWS_PER_BAND;
+// With 16 bands of 4 rows, pairs above a Jaccard similarity of about
+// (1 / 16) ^ (1 / 4) = 0.5 are likely to share a band
+const DEFAULT_THRESHOLD = 0.5;
+
+const STOP_WORDS = new Set([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'called', 'did', 'do', 'does', 'for', 'from', 'has', 'have',
+    'how', 'in', 'is', 'it', 'its', 'known', 'named', 'of', 'on', 'or', 'the', 'this', 'to', 'was', 'were',
+    'what', 'when', 'where', 'which', 'who', 'whom', 'whose', 'why', 'with'
+]);
+
+// Fixed seeds keep signatures comparable across Lambda execution environments
+const HASH_SEEDS = (() => {
+    let state = 0x9e3779b9;
+    const next = () => {
+        state ^= state << 13;
+        state ^= state >>> 17;
+        state ^= state << 5;
+        return state >>> 0;
+    };
+    const seeds = new Uint32Array(NUM_HASHES * 2);
+    for (let i = 0; i < seeds.length; i++) {
+        seeds[i] = next() | 1;
+    }
+    return seeds;
+})();
+
+function normalize(text) {
+    return String(text || '')
+        .toLowerCase()
+        .normalize('NFKD')
+        .replace(/[\u0300-\u036f]/g, '')
+        .replace(/[^a-z0-9\s]/g, ' ')
+        .split(/\s+/)
+        .filter((word) => word && !STOP_WORDS.has(word))
+        .join(' ');
+}
+
+// FNV-1a hash of each character shingle
+function shingleHashes(text) {
+    const hashes = new Set();
+    const padded = text.length < SHINGLE_SIZE ? text.padEnd(SHINGLE_SIZE, ' ') : text;
+    for (let start = 0; start + SHINGLE_SIZE <= padded.length; start++) {
+        let hash = 0x811c9dc5;
+        for (let i = start; i < start + SHINGLE_SIZE; i++) {
+            hash ^= padded.charCodeAt(i);
+            hash = Math.imul(hash, 0x01000193);
+        }
+        hashes.add(hash >>> 0);
+    }
+    return hashes;
+}
+
+function signature(text) {
+    const minimums = new Uint32Array(NUM_HASHES).fill(0xffffffff);
+    for (const shingle of shingleHashes(text)) {
+        for (let i = 0; i < NUM_HASHES; i++) {
+            // Multiply-xorshift permutation of the 32-bit shingle hash
+            let value = Math.imul(shingle ^ HASH_SEEDS[2 * i], HASH_SEEDS[2 * i + 1]);
+            value = (value ^ (value >>> 15)) >>> 0;
+            if (value < minimums[i]) {
+                minimums[i] = value;
+            }
+        }
+    }
+    return minimums;
+}
+
+// One 32-bit key per band, so each band is a Map with integer keys
+function bandKeys(minimums) {
+    const keys = new Uint32Array(NUM_BANDS);
+    for (let band = 0; band < NUM_BANDS; band++) {
+        let key = 0x811c9dc5;
+        for (let row = 0; row < ROWS_PER_BAND; row++) {
+            key = Math.imul(key ^ minimums[band * ROWS_PER_BAND + row], 0x01000193);
+        }
+        keys[band] = key >>> 0;
+    }
+    return keys;
+}
+
+function similarity(left, right) {
+    let equal = 0;
+    for (let i = 0; i < NUM_HASHES; i++) {
+        if (left[i] === right[i]) {
+            equal++;
+        }
+    }
+    return equal / NUM_HASHES;
+}
+
+function questionText(question) {
+    if (typeof question === 'string') {
+        return question;
+    }
+    return `${question?.question || ''} ${question?.correctAnswer || ''}`;
+}
+
+class NearDuplicateIndex {
+    constructor({ threshold = DEFAULT_THRESHOLD } = {}) {
+        this.threshold = threshold;
+        this.signatures = [];
+        this.texts = [];
+        this.buckets = Array.from({ length: NUM_BANDS }, () => new Map());
+    }
+
+    get size() {
+        return this.signatures.length;
+    }
+
+    // Returns the most similar indexed question at or above the threshold, or undefined
+    findDuplicate(question) {
+        return this.#match(signature(normalize(questionText(question))));
+    }
+
+    // Adds the question unless it is a near duplicate, returns the duplicate match if it was rejected
+    addIfNew(question) {
+        const text = questionText(question);
+        const minimums = signature(normalize(text));
+        const match = this.#match(minimums);
+        if (match) {
+            return match;
+        }
+        this.#insert(minimums, text);
+        return undefined;
+    }
+
+    add(question) {
+        const text = questionText(question);
+        this.#insert(signature(normalize(text)), text);
+    }
+
+    #insert(minimums, text) {
+        const id = this.signatures.length;
+        this.signatures.push(minimums);
+        this.texts.push(text);
+        const keys = bandKeys(minimums);
+        for (let band = 0; band < NUM_BANDS; band++) {
+            const bucket = this.buckets[band].get(keys[band]);
+            if (bucket) {
+                bucket.push(id);
+            } else {
+                this.buckets[band].set(keys[band], [id]);
+            }
+        }
+    }
+
+    #match(minimums) {
+        let best;
+        const checked = new Set();
+        const keys = bandKeys(minimums);
+        for (let band = 0; band < NUM_BANDS; band++) {
+            for (const id of this.buckets[band].get(keys[band]) || []) {
+                if (checked.has(id)) {
+                    continue;
+                }
+                checked.add(id);
+                const score = similarity(minimums, this.signatures[id]);
+                if (score >= this.threshold && (!best || score > best.similarity)) {
+                    best = { text: this.texts[id], similarity: score };
+                }
+            }
+        }
+        return best;
+    }
+}
+
+module.exports = {
+    NearDuplicateIndex,
+    normalize,
+    signature,
+    similarity,
+    DEFAULT_THRESHOLD
+};
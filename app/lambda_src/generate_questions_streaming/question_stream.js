@@ -0,0 +1,92 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+
+// Extracts complete question objects from the streamed JSON array the model
+// writes. Text is pushed as it arrives and every top-level object is returned
+// as soon as its closing brace is seen, braces inside strings are ignored.
+// completedLength is the length of the text pushed so far up to the end of
+// the last complete object, which is where a truncated response can resume.
+// Objects in the compact schema, {"q": question, "a": answers, "c": index of
+// the correct answer}, are expanded to question, answers and correctAnswer.
+
+function expandQuestion(question) {
+    if (typeof question?.q !== 'string' || !Array.isArray(question.a)) {
+        return question || {};
+    }
+    if (!Number.isInteger(question.c) || question.c < 0 || question.c >= question.a.length) {
+        return {};
+    }
+    return { question: question.q, answers: question.a, correctAnswer: question.a[question.c] };
+}
+
+class QuestionStreamParser {
+    constructor() {
+        this.buffer = '';
+        this.depth = 0;
+        this.inString = false;
+        this.escaped = false;
+        this.objectStart = -1;
+        // Length of the text pushed before the start of the buffer
+        this.offset = 0;
+        this.completedLength = 0;
+    }
+
+    // Returns the question objects completed by this piece of text
+    push(text) {
+        const questions = [];
+        let position = this.buffer.length;
+        this.buffer += text;
+        for (; position < this.buffer.length; position++) {
+            const char = this.buffer[position];
+            if (this.inString) {
+                if (this.escaped) {
+                    this.escaped = false;
+                } else if (char === '\\') {
+                    this.escaped = true;
+                } else if (char === '"') {
+                    this.inString = false;
+                }
+            } else if (char === '"') {
+                this.inString = this.depth > 0;
+            } else if (char === '{') {
+                if (this.depth === 0) {
+                    this.objectStart = position;
+                }
+                this.depth++;
+            } else if (char === '}' && this.depth > 0) {
+                this.depth--;
+                if (this.depth === 0) {
+                    const question = this.#parse(this.buffer.slice(this.objectStart, position + 1));
+                    if (question) {
+                        questions.push(question);
+                    }
+                    this.completedLength = this.offset + position + 1;
+                    this.offset = this.completedLength;
+                    this.buffer = this.buffer.slice(position + 1);
+                    position = -1;
+                    this.objectStart = -1;
+                }
+            }
+        }
+        if (this.depth === 0) {
+            this.offset += this.buffer.length;
+            this.buffer = '';
+        }
+        return questions;
+    }
+
+    #parse(objectText) {
+        try {
+            const question = expandQuestion(JSON.parse(objectText));
+            if (typeof question.question === 'string' && Array.isArray(question.answers)) {
+                return question;
+            }
+            console.warn('Skipping object that is not a question: ' + objectText);
+        } catch (error) {
+            console.warn('Skipping unparsable question: ' + objectText);
+        }
+        return undefined;
+    }
+}
+
+module.exports = { QuestionStreamParser, expandQuestion };
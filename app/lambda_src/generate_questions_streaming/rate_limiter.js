@@ -0,0 +1,141 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+
+// Per-identity token buckets kept in DynamoDB, so every execution environment
+// of every caller sees the same limit. A bucket holds up to burst requests and
+// refills at requestsPerMinute. It is read with a consistent read and written
+// back with a condition on its previous update time, so two concurrent
+// requests of one identity cannot both spend the last token. Buckets expire
+// through the "expiresAt" TTL attribute once they would be full again.
+//
+// When Bedrock throttles, the function marks the region as saturated for a
+// while. During saturation each request must also leave a fair share of the
+// bucket behind: identities that generated recently wait, so the remaining
+// model capacity goes to the players that have used the least of it.
+
+const {
+    DynamoDBClient,
+    GetItemCommand,
+    PutItemCommand
+} = require('@aws-sdk/client-dynamodb');
+const { captureClient } = require('./tracing');
+
+const SATURATION_KEY = '#SATURATION';
+// The saturation item is read by every request, a short cache per execution
+// environment keeps it from becoming a hot key
+const SATURATION_CACHE_MS = 1000;
+const MAX_ATTEMPTS = 3;
+
+class RateLimiter {
+    constructor({ tableName, requestsPerMinute, burst, fairShare = 0.5, saturationSeconds = 30, client }) {
+        this.tableName = tableName;
+        this.ratePerSecond = requestsPerMinute / 60;
+        this.burst = burst;
+        this.fairShare = fairShare;
+        this.saturationSeconds = saturationSeconds;
+        this.client = client || captureClient(new DynamoDBClient({}));
+        this.saturation = { until: 0, readAt: 0 };
+    }
+
+    // Returns { allowed, reason, retryAfterSeconds }, reason is "rate" or "saturated".
+    // Fails open: without the table the game keeps working, only unlimited.
+    async acquire(identityId, cost = 1) {
+        try {
+            for (let attempt = 0; attempt < MAX_ATTEMPTS; attempt++) {
+                const [item, saturated] = await Promise.all([this.readBucket(identityId), this.isSaturated()]);
+                const now = Date.now() / 1000;
+                const previous = item ? parseFloat(item.updatedAt.N) : null;
+                const tokens = item
+                    ? Math.min(this.burst, parseFloat(item.tokens.N) + (now - previous) * this.ratePerSecond)
+                    : this.burst;
+                const required = cost + (saturated ? this.burst * this.fairShare : 0);
+                if (tokens < required) {
+                    return {
+                        allowed: false,
+                        reason: saturated ? 'saturated' : 'rate',
+                        retryAfterSeconds: Math.ceil((required - tokens) / this.ratePerSecond)
+                    };
+                }
+                if (await this.writeBucket(identityId, tokens - cost, now, previous)) {
+                    return { allowed: true };
+                }
+            }
+            // Lost every race against other requests of the same identity
+            return { allowed: false, reason: 'rate', retryAfterSeconds: 1 };
+        } catch (error) {
+            console.error('Rate limit check failed, allowing the request', error);
+            return { allowed: true };
+        }
+    }
+
+    async readBucket(identityId) {
+        const response = await this.client.send(new GetItemCommand({
+            TableName: this.tableName,
+            Key: { pk: { S: identityId } },
+            ConsistentRead: true
+        }));
+        return response.Item;
+    }
+
+    async writeBucket(identityId, tokens, now, previous) {
+        const refillSeconds = (this.burst - tokens) / this.ratePerSecond;
+        try {
+            await this.client.send(new PutItemCommand({
+                TableName: this.tableName,
+                Item: {
+                    pk: { S: identityId },
+                    tokens: { N: tokens.toFixed(3) },
+                    updatedAt: { N: now.toFixed(3) },
+                    expiresAt: { N: String(Math.ceil(now + refillSeconds + 60)) }
+                },
+                ConditionExpression: previous === null
+                    ? 'attribute_not_exists(pk)'
+                    : 'updatedAt = :previous',
+                ExpressionAttributeValues: previous === null
+                    ? undefined
+                    : { ':previous': { N: previous.toFixed(3) } }
+            }));
+            return true;
+        } catch (error) {
+            if (error.name === 'ConditionalCheckFailedException') {
+                return false;
+            }
+            throw error;
+        }
+    }
+
+    async isSaturated() {
+        const now = Date.now();
+        if (now - this.saturation.readAt > SATURATION_CACHE_MS) {
+            const response = await this.client.send(new GetItemCommand({
+                TableName: this.tableName,
+                Key: { pk: { S: SATURATION_KEY } }
+            }));
+            this.saturation = { until: parseFloat(response.Item?.until?.N || '0'), readAt: now };
+        }
+        return this.saturation.until * 1000 > now;
+    }
+
+    // Called when Bedrock throttles a request of this region
+    async markSaturated() {
+        const until = Date.now() / 1000 + this.saturationSeconds;
+        this.saturation = { until, readAt: Date.now() };
+        try {
+            await this.client.send(new PutItemCommand({
+                TableName: this.tableName,
+                Item: {
+                    pk: { S: SATURATION_KEY },
+                    until: { N: until.toFixed(3) },
+                    expiresAt: { N: String(Math.ceil(until + 60)) }
+                }
+            }));
+        } catch (error) {
+            console.error('Could not record the saturation', error);
+        }
+        return this.saturationSeconds;
+    }
+}
+
+module.exports = {
+    RateLimiter
+};
@@ -0,0 +1,66 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+
+// X-Ray subsegments of a question generation. Lambda records the cold start
+// (Initialization) and the invocation, the captured SDK clients record every
+// Bedrock and DynamoDB call, and the subsegments here split a round into
+// prompt construction, the wait for the first token and the streaming phase.
+// Every subsegment is annotated with the topic, the difficulty and the trace
+// ID sent by the browser, so traces can be filtered and grouped by them:
+//     annotation.topic = "Geography" AND annotation.difficulty = "hard"
+// Without TRACING_ENABLED the helpers do nothing.
+
+const AWSXRay = process.env.TRACING_ENABLED === 'true' ? require('aws-xray-sdk-core') : null;
+if (AWSXRay) {
+    // Code that runs outside of an invocation, such as module initialization, has no segment
+    AWSXRay.setContextMissingStrategy('IGNORE_ERROR');
+}
+
+const NOOP_SUBSEGMENT = {
+    annotate() {},
+    metadata() {},
+    close() {}
+};
+
+function captureClient(client) {
+    return AWSXRay ? AWSXRay.captureAWSv3Client(client) : client;
+}
+
+// Annotations are indexed for filter expressions, keys may only contain letters, digits and underscores
+function traceAnnotations({ topic, difficulty, clientTraceId }) {
+    const annotations = { topic: String(topic || 'None').slice(0, 100), difficulty: String(difficulty || 'None') };
+    if (clientTraceId) {
+        annotations.client_trace_id = String(clientTraceId).slice(0, 64);
+    }
+    return annotations;
+}
+
+// Starts a subsegment of the invocation, close(error) ends it and marks it as failed with an error
+function startSubsegment(name, annotations = {}) {
+    const segment = AWSXRay?.getSegment();
+    if (!segment) {
+        return NOOP_SUBSEGMENT;
+    }
+    const subsegment = segment.addNewSubsegment(name);
+    const wrapper = {
+        annotate(key, value) {
+            subsegment.addAnnotation(key, value);
+        },
+        metadata(key, value) {
+            subsegment.addMetadata(key, value);
+        },
+        close(error) {
+            subsegment.close(error);
+        }
+    };
+    for (const [key, value] of Object.entries(annotations)) {
+        wrapper.annotate(key, value);
+    }
+    return wrapper;
+}
+
+module.exports = {
+    captureClient,
+    startSubsegment,
+    traceAnnotations
+};
@@ -0,0 +1,89 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+
+const {
+    DynamoDBClient,
+    QueryCommand,
+} = require('@aws-sdk/client-dynamodb');
+
+const dynamo = new DynamoDBClient({});
+
+const TABLE_NAME = process.env.TABLE_NAME;
+const INDEX_NAME = process.env.INDEX_NAME;
+const NUMBER_OF_HIGH_SCORES = parseInt(process.env.NUMBER_OF_HIGH_SCORES || '10');
+const CACHE_TTL_MS = parseInt(process.env.CACHE_TTL_SECONDS || '5') * 1000;
+const CACHE_CONTROL = process.env.CACHE_CONTROL || 'public, max-age=0, s-maxage=5, stale-while-revalidate=30';
+
+// Cached per execution environment, so concurrent and repeated requests that
+// miss the CloudFront cache share one DynamoDB query per TTL window.
+let cached = null;
+let inFlight = null;
+
+async function queryTopScores() {
+    const response = await dynamo.send(new QueryCommand({
+        TableName: TABLE_NAME,
+        IndexName: INDEX_NAME,
+        Limit: NUMBER_OF_HIGH_SCORES,
+        ScanIndexForward: false,
+        ExpressionAttributeValues: {
+            ':s': {
+                N: '1'
+            }
+        },
+        KeyConditionExpression: 'sortID = :s'
+    }));
+    return {
+        items: response.Items,
+        generatedAt: new Date().toISOString()
+    };
+}
+
+async function getTopScores() {
+    if (cached && cached.expiresAt > Date.now()) {
+        return cached.body;
+    }
+    if (!inFlight) {
+        inFlight = queryTopScores()
+            .then((body) => {
+                cached = { body: body, expiresAt: Date.now() + CACHE_TTL_MS };
+                return body;
+            })
+            .finally(() => {
+                inFlight = null;
+            });
+    }
+    try {
+        return await inFlight;
+    } catch (error) {
+        // Serve the last known leaderboard rather than failing every viewer
+        if (cached) {
+            console.error('Error refreshing top scores, serving stale copy:', error);
+            return cached.body;
+        }
+        throw error;
+    }
+}
+
+exports.handler = async (event) => {
+    try {
+        const body = await getTopScores();
+        return {
+            statusCode: 200,
+            headers: {
+                'Content-Type': 'application/json',
+                'Cache-Control': CACHE_CONTROL
+            },
+            body: JSON.stringify(body)
+        };
+    } catch (error) {
+        console.error('Error fetching top scores:', error);
+        return {
+            statusCode: 503,
+            headers: {
+                'Content-Type': 'application/json',
+                'Cache-Control': 'no-store'
+            },
+            body: JSON.stringify({ message: 'Top scores are unavailable' })
+        };
+    }
+};
@@ -0,0 +1,70 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+
+// Verifies Cognito ID tokens with the public keys of the user pool. Browsers
+// cannot set headers on a WebSocket, so the token arrives as a query string
+// parameter of the $connect request.
+
+const crypto = require('crypto');
+
+const REGION = process.env.AWS_REGION;
+const USER_POOL_ID = process.env.USER_POOL_ID;
+const USER_POOL_CLIENT_ID = process.env.USER_POOL_CLIENT_ID;
+const ISSUER = `https://cognito-idp.${REGION}.amazonaws.com/${USER_POOL_ID}`;
+
+// Cached per execution environment, the keys are only fetched again for an unknown key id
+let signingKeys = new Map();
+
+async function getSigningKey(kid) {
+    if (!signingKeys.has(kid)) {
+        const response = await fetch(`${ISSUER}/.well-known/jwks.json`);
+        if (!response.ok) {
+            throw new Error(`JWKS request failed with status ${response.status}`);
+        }
+        const { keys } = await response.json();
+        signingKeys = new Map(keys.map((jwk) => [jwk.kid, crypto.createPublicKey({ key: jwk, format: 'jwk' })]));
+    }
+    const key = signingKeys.get(kid);
+    if (!key) {
+        throw new Error(`Unknown signing key ${kid}`);
+    }
+    return key;
+}
+
+function decodeSegment(segment) {
+    return JSON.parse(Buffer.from(segment, 'base64url').toString('utf-8'));
+}
+
+// Returns the claims of a valid ID token of the user pool client, throws otherwise
+async function verifyIdToken(token) {
+    const segments = String(token || '').split('.');
+    if (segments.length !== 3) {
+        throw new Error('Malformed token');
+    }
+    const [encodedHeader, encodedPayload, encodedSignature] = segments;
+    const header = decodeSegment(encodedHeader);
+    if (header.alg !== 'RS256') {
+        throw new Error(`Unsupported token algorithm ${header.alg}`);
+    }
+
+    const valid = crypto.verify(
+        'RSA-SHA256',
+        Buffer.from(`${encodedHeader}.${encodedPayload}`),
+        await getSigningKey(header.kid),
+        Buffer.from(encodedSignature, 'base64url')
+    );
+    if (!valid) {
+        throw new Error('Invalid token signature');
+    }
+
+    const claims = decodeSegment(encodedPayload);
+    if (claims.iss !== ISSUER || claims.aud !== USER_POOL_CLIENT_ID || claims.token_use !== 'id') {
+        throw new Error('Token was not issued for this application');
+    }
+    if (claims.exp * 1000 < Date.now()) {
+        throw new Error('Token has expired');
+    }
+    return claims;
+}
+
+module.exports = { verifyIdToken };
@@ -0,0 +1,622 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+
+// Shared-room game mode. Players of a room share one WebSocket game: the room
+// runner generates the questions of a round once, broadcasts them to every
+// connection on a synchronized clock, and scores the answers into a live room
+// leaderboard. Bedrock calls and Lambda time scale with rooms, not players.
+
+const crypto = require('crypto');
+const { DynamoDBClient } = require('@aws-sdk/client-dynamodb');
+const {
+    DynamoDBDocumentClient,
+    DeleteCommand,
+    GetCommand,
+    PutCommand,
+    QueryCommand,
+    TransactWriteCommand,
+    UpdateCommand,
+} = require('@aws-sdk/lib-dynamodb');
+const {
+    ApiGatewayManagementApiClient,
+    PostToConnectionCommand,
+} = require('@aws-sdk/client-apigatewaymanagementapi');
+const {
+    LambdaClient,
+    InvokeCommand,
+    InvokeWithResponseStreamCommand,
+} = require('@aws-sdk/client-lambda');
+const { verifyIdToken } = require('./auth');
+
+const dynamo = DynamoDBDocumentClient.from(new DynamoDBClient({}));
+const lambda = new LambdaClient({});
+
+const TABLE_NAME = process.env.TABLE_NAME;
+const GENERATION_FUNCTION_NAME = process.env.GENERATION_FUNCTION_NAME;
+const ROOM_TTL_SECONDS = parseInt(process.env.ROOM_TTL_HOURS || '6') * 3600;
+const MAX_PLAYERS = parseInt(process.env.MAX_PLAYERS || '200');
+const QUESTION_MS = parseInt(process.env.QUESTION_SECONDS || '15') * 1000;
+const REVEAL_MS = parseInt(process.env.REVEAL_SECONDS || '4') * 1000;
+const LEADERBOARD_SIZE = parseInt(process.env.LEADERBOARD_SIZE || '10');
+const MAX_ROUNDS = 5;
+const MAX_QUESTIONS_PER_ROUND = 25;
+// Time between the broadcast of a question and the start of its clock
+const QUESTION_LEAD_MS = 1000;
+
+const ROOM_CODE_ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789';
+
+class RoomError extends Error {}
+
+function roomKey(roomId) {
+    return { pk: `ROOM#${roomId}`, sk: 'META' };
+}
+
+function playerKey(roomId, connectionId) {
+    return { pk: `ROOM#${roomId}`, sk: `CONN#${connectionId}` };
+}
+
+function connectionKey(connectionId) {
+    return { pk: `CONN#${connectionId}`, sk: 'META' };
+}
+
+function expiresAt() {
+    return Math.floor(Date.now() / 1000) + ROOM_TTL_SECONDS;
+}
+
+function sleep(ms) {
+    return new Promise((resolve) => setTimeout(resolve, Math.max(ms, 0)));
+}
+
+function sanitizeName(name) {
+    return String(name || '').replace(/[^\p{L}\p{N} ._-]/gu, '').trim().slice(0, 20) || 'Player';
+}
+
+function createRoomCode() {
+    const bytes = crypto.randomBytes(6);
+    return Array.from(bytes, (byte) => ROOM_CODE_ALPHABET[byte % ROOM_CODE_ALPHABET.length]).join('');
+}
+
+function shuffle(items) {
+    const shuffled = [...items];
+    for (let i = shuffled.length - 1; i > 0; i--) {
+        const j = crypto.randomInt(i + 1);
+        [shuffled[i], shuffled[j]] = [shuffled[j], shuffled[i]];
+    }
+    return shuffled;
+}
+
+// Same speed tiers as the single player game
+function pointsFor(elapsedMs) {
+    if (elapsedMs <= 2000) {
+        return 300;
+    }
+    if (elapsedMs <= 3000) {
+        return 200;
+    }
+    return 100;
+}
+
+async function getRoom(roomId) {
+    const response = await dynamo.send(new GetCommand({
+        TableName: TABLE_NAME,
+        Key: roomKey(roomId),
+        ConsistentRead: true
+    }));
+    return response.Item;
+}
+
+async function getPlayers(roomId) {
+    const players = [];
+    let ExclusiveStartKey;
+    do {
+        const response = await dynamo.send(new QueryCommand({
+            TableName: TABLE_NAME,
+            KeyConditionExpression: 'pk = :pk AND begins_with(sk, :conn)',
+            ExpressionAttributeValues: { ':pk': `ROOM#${roomId}`, ':conn': 'CONN#' },
+            ExclusiveStartKey
+        }));
+        players.push(...response.Items);
+        ExclusiveStartKey = response.LastEvaluatedKey;
+    } while (ExclusiveStartKey);
+    return players;
+}
+
+function leaderboard(players) {
+    return players
+        .map(({ name, score = 0 }) => ({ name, score }))
+        .sort((left, right) => right.score - left.score)
+        .slice(0, LEADERBOARD_SIZE);
+}
+
+async function removeConnection(connectionId, roomId) {
+    await dynamo.send(new DeleteCommand({ TableName: TABLE_NAME, Key: connectionKey(connectionId) }));
+    if (roomId) {
+        await leaveRoom(connectionId, roomId);
+    }
+}
+
+// Removes the player of the connection from the room, the connection itself stays
+async function leaveRoom(connectionId, roomId) {
+    const removed = await dynamo.send(new DeleteCommand({
+        TableName: TABLE_NAME,
+        Key: playerKey(roomId, connectionId),
+        ReturnValues: 'ALL_OLD'
+    }));
+    if (removed.Attributes) {
+        await dynamo.send(new UpdateCommand({
+            TableName: TABLE_NAME,
+            Key: roomKey(roomId),
+            UpdateExpression: 'ADD playerCount :minusOne',
+            ConditionExpression: 'attribute_exists(pk)',
+            ExpressionAttributeValues: { ':minusOne': -1 }
+        })).catch((error) => console.warn('Could not update the player count:', error));
+    }
+}
+
+async function send(api, connectionId, message) {
+    await api.send(new PostToConnectionCommand({
+        ConnectionId: connectionId,
+        Data: JSON.stringify({ ...message, serverTime: Date.now() })
+    }));
+}
+
+// Sends a message to every player of the room, closed connections are removed
+async function broadcast(api, roomId, message, players) {
+    players = players || await getPlayers(roomId);
+    const results = await Promise.allSettled(
+        players.map((player) => send(api, player.connectionId, message))
+    );
+    await Promise.all(results.map((result, i) => {
+        if (result.status === 'rejected') {
+            if (result.reason?.name === 'GoneException') {
+                return removeConnection(players[i].connectionId, roomId);
+            }
+            console.warn(`Could not send to ${players[i].connectionId}:`, result.reason);
+        }
+        return undefined;
+    }));
+    return players;
+}
+
+function publicQuestion(room) {
+    if (room.status !== 'running' || !room.currentQuestion) {
+        return undefined;
+    }
+    return {
+        round: room.round + 1,
+        index: room.currentIndex,
+        total: room.currentTotal,
+        question: room.currentQuestion.question,
+        answers: room.currentQuestion.answers,
+        startsAt: room.questionStartsAt,
+        endsAt: room.questionEndsAt
+    };
+}
+
+async function connect(event, connectionId) {
+    try {
+        const claims = await verifyIdToken(event.queryStringParameters?.token);
+        await dynamo.send(new PutCommand({
+            TableName: TABLE_NAME,
+            Item: {
+                ...connectionKey(connectionId),
+                userId: claims.sub,
+                expiresAt: expiresAt()
+            }
+        }));
+        return { statusCode: 200 };
+    } catch (error) {
+        console.warn('Rejected connection:', error.message);
+        return { statusCode: 401 };
+    }
+}
+
+async function disconnect(connectionId) {
+    const response = await dynamo.send(new GetCommand({ TableName: TABLE_NAME, Key: connectionKey(connectionId) }));
+    await removeConnection(connectionId, response.Item?.roomId);
+    return { statusCode: 200 };
+}
+
+async function createRoom(api, connectionId, body) {
+    for (let attempt = 0; attempt < 5; attempt++) {
+        const roomId = createRoomCode();
+        try {
+            await dynamo.send(new PutCommand({
+                TableName: TABLE_NAME,
+                Item: {
+                    ...roomKey(roomId),
+                    hostConnectionId: connectionId,
+                    status: 'lobby',
+                    round: 0,
+                    playerCount: 0,
+                    askedQuestions: [],
+                    expiresAt: expiresAt()
+                },
+                ConditionExpression: 'attribute_not_exists(pk)'
+            }));
+            return joinRoom(api, connectionId, { ...body, roomId });
+        } catch (error) {
+            if (error.name !== 'ConditionalCheckFailedException') {
+                throw error;
+            }
+        }
+    }
+    throw new RoomError('Could not create a room, please try again');
+}
+
+// A connection plays in one room at a time, joining another room leaves the
+// previous one. The player item and the player count are written together, so
+// the count only grows when a new player item is created.
+async function joinRoom(api, connectionId, body) {
+    const roomId = String(body.roomId || '').toUpperCase();
+    const connection = await dynamo.send(new GetCommand({ TableName: TABLE_NAME, Key: connectionKey(connectionId) }));
+    const previousRoomId = connection.Item?.roomId;
+    if (previousRoomId === roomId) {
+        throw new RoomError(`You are already in room ${roomId}`);
+    }
+
+    const name = sanitizeName(body.name);
+    try {
+        await dynamo.send(new TransactWriteCommand({
+            TransactItems: [
+                {
+                    Update: {
+                        TableName: TABLE_NAME,
+                        Key: roomKey(roomId),
+                        UpdateExpression: 'ADD playerCount :one',
+                        ConditionExpression: 'attribute_exists(pk) AND playerCount < :max AND #status <> :finished',
+                        ExpressionAttributeNames: { '#status': 'status' },
+                        ExpressionAttributeValues: { ':one': 1, ':max': MAX_PLAYERS, ':finished': 'finished' }
+                    }
+                },
+                {
+                    Put: {
+                        TableName: TABLE_NAME,
+                        Item: {
+                            ...playerKey(roomId, connectionId),
+                            connectionId,
+                            name,
+                            score: 0,
+                            expiresAt: expiresAt()
+                        },
+                        ConditionExpression: 'attribute_not_exists(pk)'
+                    }
+                }
+            ]
+        }));
+    } catch (error) {
+        if (error.name === 'TransactionCanceledException') {
+            const [roomCheck, playerCheck] = error.CancellationReasons || [];
+            if (playerCheck?.Code === 'ConditionalCheckFailed') {
+                throw new RoomError(`You are already in room ${roomId}`);
+            }
+            if (roomCheck?.Code === 'ConditionalCheckFailed') {
+                throw new RoomError(`Room ${roomId} does not exist, is full or has finished`);
+            }
+        }
+        throw error;
+    }
+
+    await dynamo.send(new UpdateCommand({
+        TableName: TABLE_NAME,
+        Key: connectionKey(connectionId),
+        UpdateExpression: 'SET roomId = :roomId',
+        ExpressionAttributeValues: { ':roomId': roomId }
+    }));
+    if (previousRoomId) {
+        await leaveRoom(connectionId, previousRoomId);
+        const remaining = await getPlayers(previousRoomId);
+        await broadcast(api, previousRoomId, { type: 'players', count: remaining.length, leaderboard: leaderboard(remaining) }, remaining);
+    }
+
+    const room = await getRoom(roomId);
+    const players = await getPlayers(roomId);
+    await send(api, connectionId, {
+        type: 'joined',
+        roomId,
+        name,
+        host: room.hostConnectionId === connectionId,
+        status: room.status,
+        topic: room.topic,
+        question: publicQuestion(room)
+    });
+    await broadcast(api, roomId, { type: 'players', count: players.length, leaderboard: leaderboard(players) }, players);
+}
+
+async function startRoom(api, connectionId, body, endpoint) {
+    const roomId = String(body.roomId || '').toUpperCase();
+    const topic = String(body.topic || '').trim().slice(0, 50);
+    const rounds = (Array.isArray(body.rounds) ? body.rounds : []).slice(0, MAX_ROUNDS).map((round) => ({
+        difficulty: String(round.difficulty || 'easy').slice(0, 30),
+        numberOfQuestions: Math.min(Math.max(parseInt(round.numberOfQuestions) || 10, 1), MAX_QUESTIONS_PER_ROUND)
+    }));
+    if (!topic || rounds.length === 0) {
+        throw new RoomError('A topic and at least one round are needed to start');
+    }
+
+    try {
+        await dynamo.send(new UpdateCommand({
+            TableName: TABLE_NAME,
+            Key: roomKey(roomId),
+            UpdateExpression: 'SET #status = :running, topic = :topic, rounds = :rounds, #round = :zero',
+            ConditionExpression: 'hostConnectionId = :host AND #status = :lobby',
+            ExpressionAttributeNames: { '#status': 'status', '#round': 'round' },
+            ExpressionAttributeValues: {
+                ':running': 'running',
+                ':lobby': 'lobby',
+                ':host': connectionId,
+                ':topic': topic,
+                ':rounds': rounds,
+                ':zero': 0
+            }
+        }));
+    } catch (error) {
+        if (error.name === 'ConditionalCheckFailedException') {
+            throw new RoomError('Only the host can start the room, and only once');
+        }
+        throw error;
+    }
+
+    await broadcast(api, roomId, { type: 'starting', topic, rounds: rounds.length });
+    await startRound(roomId, 0, endpoint);
+}
+
+// Every round runs in its own asynchronous invocation to stay within the Lambda timeout
+async function startRound(roomId, round, endpoint) {
+    await lambda.send(new InvokeCommand({
+        FunctionName: process.env.AWS_LAMBDA_FUNCTION_NAME,
+        InvocationType: 'Event',
+        Payload: JSON.stringify({ runRound: { roomId, round, endpoint } })
+    }));
+}
+
+async function answer(api, connectionId, body) {
+    const connection = await dynamo.send(new GetCommand({ TableName: TABLE_NAME, Key: connectionKey(connectionId) }));
+    const roomId = connection.Item?.roomId;
+    if (!roomId) {
+        throw new RoomError('Join a room before answering');
+    }
+    const room = await getRoom(roomId);
+    const now = Date.now();
+    const index = parseInt(body.index);
+    if (room?.status !== 'running' || room.currentIndex !== index || now < room.questionStartsAt || now > room.questionEndsAt) {
+        await send(api, connectionId, { type: 'answerResult', index, accepted: false });
+        return;
+    }
+
+    const correct = body.answer === room.currentQuestion.correctAnswer;
+    const points = correct ? pointsFor(now - room.questionStartsAt) : 0;
+    const answerKey = `${room.round}:${index}`;
+    try {
+        const response = await dynamo.send(new UpdateCommand({
+            TableName: TABLE_NAME,
+            Key: playerKey(roomId, connectionId),
+            UpdateExpression: 'SET lastAnswer = :answerKey ADD score :points, answered :one, correctAnswers :correct',
+            ConditionExpression: 'attribute_exists(pk) AND (attribute_not_exists(lastAnswer) OR lastAnswer <> :answerKey)',
+            ExpressionAttributeValues: {
+                ':answerKey': answerKey,
+                ':points': points,
+                ':one': 1,
+                ':correct': correct ? 1 : 0
+            },
+            ReturnValues: 'UPDATED_NEW'
+        }));
+        await send(api, connectionId, { type: 'answerResult', index, accepted: true, correct, points, score: response.Attributes.score });
+    } catch (error) {
+        if (error.name !== 'ConditionalCheckFailedException') {
+            throw error;
+        }
+        await send(api, connectionId, { type: 'answerResult', index, accepted: false });
+    }
+}
+
+// Reads the question lines of the generation function as they stream in
+function generateQuestions(payload) {
+    const questions = [];
+    let done = false;
+    let failure;
+    let notify = () => {};
+
+    const consume = async () => {
+        const response = await lambda.send(new InvokeWithResponseStreamCommand({
+            FunctionName: GENERATION_FUNCTION_NAME,
+            Payload: JSON.stringify(payload)
+        }));
+        const decoder = new TextDecoder('utf-8');
+        let buffered = '';
+        for await (const event of response.EventStream) {
+            if (event.PayloadChunk) {
+                buffered += decoder.decode(event.PayloadChunk.Payload, { stream: true });
+                const lines = buffered.split('\n');
+                buffered = lines.pop();
+                for (const line of lines.filter((line) => line.trim())) {
+                    const question = JSON.parse(line);
+                    if (question.throttled) {
+                        throw new Error(`Question generation throttled (${question.reason}), retry after ${question.retryAfterSeconds} s`);
+                    }
+                    questions.push(question);
+                    notify();
+                }
+            }
+            if (event.InvokeComplete?.ErrorCode) {
+                throw new Error(`Question generation failed: ${event.InvokeComplete.ErrorCode} ${event.InvokeComplete.ErrorDetails}`);
+            }
+        }
+    };
+    consume()
+        .catch((error) => {
+            failure = error;
+        })
+        .finally(() => {
+            done = true;
+            notify();
+        });
+
+    // Resolves with question number index, or undefined once the generation ended without it
+    return async function nextQuestion(index) {
+        while (questions.length <= index && !done) {
+            await new Promise((resolve) => {
+                notify = resolve;
+            });
+        }
+        if (questions.length <= index && failure) {
+            throw failure;
+        }
+        return questions[index];
+    };
+}
+
+// Round invocations are not retried, a retry would generate and broadcast the
+// round again. A failed round ends the room instead of leaving it running.
+async function runRound({ roomId, round, endpoint }) {
+    try {
+        await playRound({ roomId, round, endpoint });
+    } catch (error) {
+        console.error(`Round ${round + 1} of room ${roomId} failed`, error);
+        const api = new ApiGatewayManagementApiClient({ endpoint });
+        await dynamo.send(new UpdateCommand({
+            TableName: TABLE_NAME,
+            Key: roomKey(roomId),
+            UpdateExpression: 'SET #status = :finished REMOVE currentQuestion',
+            ExpressionAttributeNames: { '#status': 'status' },
+            ExpressionAttributeValues: { ':finished': 'finished' }
+        }));
+        const scores = await getPlayers(roomId);
+        await broadcast(api, roomId, { type: 'error', message: 'The questions could not be created, the room has ended' }, scores);
+        await broadcast(api, roomId, { type: 'finished', leaderboard: leaderboard(scores) }, scores);
+    }
+}
+
+async function playRound({ roomId, round, endpoint }) {
+    const api = new ApiGatewayManagementApiClient({ endpoint });
+    const room = await getRoom(roomId);
+    if (!room || room.status !== 'running' || !room.rounds[round]) {
+        return;
+    }
+    const { difficulty, numberOfQuestions } = room.rounds[round];
+    await broadcast(api, roomId, { type: 'round', round: round + 1, rounds: room.rounds.length, difficulty, total: numberOfQuestions });
+
+    // One generation for the whole room
+    const nextQuestion = generateQuestions({
+        number_questions: numberOfQuestions,
+        difficulty,
+        topic: room.topic,
+        num_silly: 'one',
+        existing_questions: room.askedQuestions
+    });
+
+    const asked = [];
+    for (let index = 0; index < numberOfQuestions; index++) {
+        const question = await nextQuestion(index);
+        if (!question) {
+            break;
+        }
+        asked.push({ question: question.question, correctAnswer: question.correctAnswer });
+
+        const startsAt = Date.now() + QUESTION_LEAD_MS;
+        const endsAt = startsAt + QUESTION_MS;
+        const currentQuestion = { ...question, answers: shuffle(question.answers) };
+        await dynamo.send(new UpdateCommand({
+            TableName: TABLE_NAME,
+            Key: roomKey(roomId),
+            UpdateExpression: 'SET currentIndex = :index, currentTotal = :total, currentQuestion = :question, ' +
+                'questionStartsAt = :startsAt, questionEndsAt = :endsAt, #round = :round',
+            ExpressionAttributeNames: { '#round': 'round' },
+            ExpressionAttributeValues: {
+                ':index': index,
+                ':total': numberOfQuestions,
+                ':question': currentQuestion,
+                ':startsAt': startsAt,
+                ':endsAt': endsAt,
+                ':round': round
+            }
+        }));
+        const players = await broadcast(api, roomId, {
+            type: 'question',
+            round: round + 1,
+            index,
+            total: numberOfQuestions,
+            question: currentQuestion.question,
+            answers: currentQuestion.answers,
+            startsAt,
+            endsAt
+        });
+        if (players.length === 0) {
+            console.log(`Room ${roomId} is empty, stopping`);
+            return;
+        }
+
+        await sleep(endsAt - Date.now());
+        const scores = await getPlayers(roomId);
+        await broadcast(api, roomId, {
+            type: 'reveal',
+            index,
+            correctAnswer: question.correctAnswer,
+            leaderboard: leaderboard(scores)
+        }, scores);
+        await sleep(REVEAL_MS);
+    }
+
+    await dynamo.send(new UpdateCommand({
+        TableName: TABLE_NAME,
+        Key: roomKey(roomId),
+        UpdateExpression: 'SET askedQuestions = list_append(askedQuestions, :asked) REMOVE currentQuestion',
+        ExpressionAttributeValues: { ':asked': asked }
+    }));
+
+    if (round + 1 < room.rounds.length) {
+        await startRound(roomId, round + 1, endpoint);
+        return;
+    }
+    await dynamo.send(new UpdateCommand({
+        TableName: TABLE_NAME,
+        Key: roomKey(roomId),
+        UpdateExpression: 'SET #status = :finished',
+        ExpressionAttributeNames: { '#status': 'status' },
+        ExpressionAttributeValues: { ':finished': 'finished' }
+    }));
+    const scores = await getPlayers(roomId);
+    await broadcast(api, roomId, { type: 'finished', leaderboard: leaderboard(scores) }, scores);
+}
+
+exports.handler = async (event) => {
+    if (event.runRound) {
+        console.log('Running round: ' + JSON.stringify(event.runRound));
+        return runRound(event.runRound);
+    }
+
+    const { routeKey, connectionId, domainName, stage } = event.requestContext;
+    if (routeKey === '$connect') {
+        return connect(event, connectionId);
+    }
+    if (routeKey === '$disconnect') {
+        return disconnect(connectionId);
+    }
+
+    const endpoint = `https://${domainName}/${stage}`;
+    const api = new ApiGatewayManagementApiClient({ endpoint });
+    try {
+        const body = JSON.parse(event.body || '{}');
+        switch (routeKey) {
+            case 'create':
+                await createRoom(api, connectionId, body);
+                break;
+            case 'join':
+                await joinRoom(api, connectionId, body);
+                break;
+            case 'start':
+                await startRoom(api, connectionId, body, endpoint);
+                break;
+            case 'answer':
+                await answer(api, connectionId, body);
+                break;
+            default:
+                throw new RoomError(`Unknown action ${body.action}`);
+        }
+    } catch (error) {
+        console.error(error);
+        const message = error instanceof RoomError ? error.message : 'Something went wrong';
+        await send(api, connectionId, { type: 'error', message }).catch(() => {});
+    }
+    return { statusCode: 200 };
+};
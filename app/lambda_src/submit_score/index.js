@@ -0,0 +1,90 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+
+// Validates a finished game's score and queues it for the score writer, so a
+// burst of submissions at the end of a round does not reach the table at once.
+
+const crypto = require('crypto');
+const {
+    SQSClient,
+    SendMessageCommand,
+} = require('@aws-sdk/client-sqs');
+
+const sqs = new SQSClient({});
+
+const QUEUE_URL = process.env.QUEUE_URL;
+const MAX_SCORE = parseInt(process.env.MAX_SCORE || '1000000');
+const MAX_NAME_LENGTH = 3;
+const MAX_CATEGORY_LENGTH = 100;
+
+// Same escaping the game applied before writing the score itself
+const HTML_ESCAPES = {
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+    '/': '&#x2F;',
+};
+
+function truncate(value, maxLength) {
+    return String(value || '').trim().slice(0, maxLength);
+}
+
+function sanitize(value, maxLength) {
+    return truncate(value, maxLength).replace(/[&<>"'/]/g, (match) => HTML_ESCAPES[match]);
+}
+
+function toNumber(value, min, max) {
+    const number = Number(value);
+    if (!Number.isFinite(number) || number < min || number > max) {
+        return undefined;
+    }
+    return number;
+}
+
+// Returns the high score item, or an error message when the submission is invalid
+function validate(submission) {
+    const name = sanitize(submission.name, MAX_NAME_LENGTH);
+    const category = truncate(submission.category, MAX_CATEGORY_LENGTH);
+    const initialScore = toNumber(submission.initialScore, 0, MAX_SCORE);
+    const accuracy = toNumber(submission.accuracy, 0, 100);
+    if (!name) {
+        return { error: 'A name is required' };
+    }
+    if (!category) {
+        return { error: 'A category is required' };
+    }
+    if (initialScore === undefined || accuracy === undefined) {
+        return { error: 'The score or accuracy is out of range' };
+    }
+    return {
+        item: {
+            id: crypto.randomUUID().replace(/-/g, '').slice(0, 12),
+            name: name,
+            initialScore: Math.round(initialScore),
+            accuracy: accuracy,
+            // The final score is derived here instead of being trusted from the browser
+            score: (accuracy / 100) * Math.round(initialScore),
+            category: category,
+            sortID: 1,
+            submittedAt: new Date().toISOString()
+        }
+    };
+}
+
+exports.handler = async (event) => {
+    const submission = typeof event === 'string' ? JSON.parse(event) : event;
+    const { item, error } = validate(submission || {});
+    if (error) {
+        console.warn(`Rejected score submission: ${error}`);
+        return { accepted: false, error: error };
+    }
+
+    await sqs.send(new SendMessageCommand({
+        QueueUrl: QUEUE_URL,
+        MessageBody: JSON.stringify(item)
+    }));
+
+    return { accepted: true, item: item };
+};
@@ -0,0 +1,77 @@
+// Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+// SPDX-License-Identifier: MIT-0
+
+// Writes queued high scores to DynamoDB with BatchWriteItem. SQS hands the
+// function batches of up to BATCH_SIZE submissions and its concurrency is
+// capped, so the write rate of the table follows the average submission rate
+// and bursts wait in the queue instead of throttling the table.
+
+const {
+    DynamoDBClient,
+    BatchWriteItemCommand,
+} = require('@aws-sdk/client-dynamodb');
+const { marshall } = require('@aws-sdk/util-dynamodb');
+
+const dynamo = new DynamoDBClient({});
+
+const TABLE_NAME = process.env.TABLE_NAME;
+// Largest number of put requests in one BatchWriteItem call
+const WRITE_BATCH_SIZE = 25;
+const MAX_ATTEMPTS = 5;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Writes the requests of one chunk, retrying unprocessed items with backoff.
+// Returns the requests that were still not written.
+async function writeChunk(requests) {
+    let pending = requests;
+    for (let attempt = 0; attempt < MAX_ATTEMPTS && pending.length > 0; attempt++) {
+        if (attempt > 0) {
+            await sleep(Math.random() * 50 * 2 ** attempt);
+        }
+        const response = await dynamo.send(new BatchWriteItemCommand({
+            RequestItems: { [TABLE_NAME]: pending }
+        }));
+        pending = response.UnprocessedItems?.[TABLE_NAME] || [];
+    }
+    return pending;
+}
+
+exports.handler = async (event) => {
+    // A submission delivered twice has the same id, only one copy is kept per batch
+    const byId = new Map();
+    const failures = [];
+    let failedItems = 0;
+    for (const record of event.Records) {
+        try {
+            const item = JSON.parse(record.body);
+            byId.set(item.id, { item: item, messageIds: [...(byId.get(item.id)?.messageIds || []), record.messageId] });
+        } catch (error) {
+            console.error(`Dropping unparsable message ${record.messageId}:`, error);
+        }
+    }
+
+    const entries = [...byId.values()];
+    for (let start = 0; start < entries.length; start += WRITE_BATCH_SIZE) {
+        const chunk = entries.slice(start, start + WRITE_BATCH_SIZE);
+        const requests = chunk.map(({ item }) => ({ PutRequest: { Item: marshall(item) } }));
+        let unprocessed;
+        try {
+            unprocessed = await writeChunk(requests);
+        } catch (error) {
+            console.error('BatchWriteItem failed:', error);
+            unprocessed = requests;
+        }
+        const unprocessedIds = new Set(unprocessed.map((request) => request.PutRequest.Item.id.S));
+        for (const { item, messageIds } of chunk) {
+            if (unprocessedIds.has(item.id)) {
+                failedItems++;
+                failures.push(...messageIds.map((messageId) => ({ itemIdentifier: messageId })));
+            }
+        }
+    }
+
+    console.log(JSON.stringify({ received: event.Records.length, written: entries.length - failedItems, failed: failedItems }));
+    // Only the failed messages return to the queue
+    return { batchItemFailures: failures };
+};
@@ -5,9 +5,12 @@ import aws_cdk as cdk
 from constructs import Construct
 from aws_cdk import (
     aws_lambda as _lambda,
+    aws_lambda_nodejs as nodejs,
     aws_iam as iam
 )
 from cdk_nag import NagSuppressions
+from app.app_stack import get_lambda_tracing
+from app.dynamodb_helper import create_rate_limit_table
 
 
 class BedrockStreamingFunction(Construct):
@@ -15,33 +18,93 @@ class BedrockStreamingFunction(Construct):
     Lambda function for streaming question generation using Bedrock.
 
     This class creates a Lambda function with the necessary permissions and
-    configuration to generate questions using the Bedrock AI model.
+    configuration to generate questions using the Bedrock AI model. The code is
+    bundled with esbuild into a single minified file for arm64, including only
+    the parts of the Bedrock client it uses, so a cold start loads one small
+    file instead of the full AWS SDK of the runtime.
+
+    The dependencies in app/lambda_src/generate_questions_streaming/package.json
+    are installed before synth; esbuild runs locally when it is installed and in
+    Docker otherwise.
 
     Attributes:
-        function (lambda.Function): The Lambda function.
+        lambda_function (lambda_nodejs.NodejsFunction): The Lambda function.
+        rate_limit_table (dynamodb.ITable): The table of the per-player rate limits, None when disabled.
     """
 
-    def __init__(self, scope: Construct, id: str, **kwargs):
+    def __init__(self, scope: Construct, id: str, config: dict = None, **kwargs):
         """
         Initialize the BedrockStreamingFunction construct.
 
         Args:
             scope (Construct): The scope of the construct.  
             id (str): The ID of the construct.
+            config (dict, optional): Application configuration.
             **kwargs: Additional arguments.
         """
         super().__init__(scope, id, **kwargs)
 
-        self.lambda_function = _lambda.Function(
+        generation_config = (config or {}).get("appInfrastructure", {}).get("questionGeneration", {})
+        tracing = get_lambda_tracing(config) if config else _lambda.Tracing.DISABLED
+
+        source_path = "app/lambda_src/generate_questions_streaming"
+        self.lambda_function = nodejs.NodejsFunction(
             self,
             "rGenAiTriviaBedrockStreamingFunction",
             function_name="bedrock-generate-questions-streaming",
             runtime=_lambda.Runtime.NODEJS_20_X,
-            handler="index.handler",
-            code=_lambda.Code.from_asset("app/lambda_src/generate_questions_streaming"),
-            timeout=cdk.Duration.seconds(900)
+            architecture=_lambda.Architecture.ARM_64,
+            entry=f"{source_path}/index.js",
+            handler="handler",
+            project_root=source_path,
+            deps_lock_file_path=f"{source_path}/package-lock.json",
+            bundling=nodejs.BundlingOptions(
+                minify=True,
+                target="node20",
+                format=nodejs.OutputFormat.CJS,
+                # Prefer the ES module builds of the SDK so unused commands are tree-shaken
+                main_fields=["module", "main"],
+                # Bundle the SDK instead of loading the copy in the runtime
+                bundle_aws_sdk=True,
+                external_modules=[],
+                esbuild_version="0.21.5"
+            ),
+            timeout=cdk.Duration.seconds(900),
+            # Memory also sets the CPU share that parses the stream and runs the near-duplicate checks
+            memory_size=generation_config.get("memorySize", 512),
+            reserved_concurrent_executions=generation_config.get("reservedConcurrency"),
+            tracing=tracing,
+            environment={
+                "NEAR_DUPLICATE_THRESHOLD": str(generation_config.get("nearDuplicateThreshold", 0.5)),
+                "QUESTION_OVERSAMPLE_RATIO": str(generation_config.get("oversampleRatio", 0.2)),
+                "TOKENS_PER_QUESTION": str(generation_config.get("tokensPerQuestion", 100)),
+                "MAX_TOKENS_LIMIT": str(generation_config.get("maxTokensLimit", 4096)),
+                "MAX_CONTINUATIONS": str(generation_config.get("maxContinuations", 2)),
+                "METRICS_NAMESPACE": "GenAiTrivia",
+                "BEDROCK_REGION": generation_config.get("bedrockRegion", cdk.Stack.of(self).region),
+                "PROMPT_CACHING": str(generation_config.get("promptCaching", False)).lower(),
+                "OUTPUT_SCHEMA": generation_config.get("outputSchema", "compact"),
+                # Subsegments for prompt construction, time to first token and streaming
+                "TRACING_ENABLED": str(tracing == _lambda.Tracing.ACTIVE).lower(),
+                **self.hedging_environment(generation_config.get("hedging", {}))
+            }
         )
 
+        if generation_config.get("modelId"):
+            self.lambda_function.add_environment("MODEL_ID", generation_config["modelId"])
+
+        # Per-player token buckets, kept in a table of this region
+        rate_limit_config = generation_config.get("rateLimiting", {})
+        self.rate_limit_table = None
+        if rate_limit_config.get("enabled", False):
+            self.rate_limit_table = create_rate_limit_table(
+                self,
+                rate_limit_config.get("tableName", "generationRateLimits")
+            )
+            self.rate_limit_table.grant_read_write_data(self.lambda_function)
+            for name, value in self.rate_limit_environment(rate_limit_config).items():
+                self.lambda_function.add_environment(name, value)
+
         self.lambda_function.add_to_role_policy(
             iam.PolicyStatement(
                 effect=iam.Effect.ALLOW,
@@ -64,3 +127,45 @@ class BedrockStreamingFunction(Construct):
             ],
             apply_to_children=True
         )
+
+    @staticmethod
+    def hedging_environment(hedging_config: dict) -> dict:
+        """
+        Get the environment variables of request hedging.
+
+        Args:
+            hedging_config (dict): The "hedging" section of the question generation configuration.
+
+        Returns:
+            dict: The environment variables, the hedge model and region only when configured.
+        """
+        environment = {
+            "HEDGE_ENABLED": str(hedging_config.get("enabled", False)).lower(),
+            "HEDGE_PERCENTILE": str(hedging_config.get("percentile", 95)),
+            "HEDGE_INITIAL_DEADLINE_MS": str(hedging_config.get("initialDeadlineMs", 3000)),
+            "HEDGE_MIN_DEADLINE_MS": str(hedging_config.get("minDeadlineMs", 1000)),
+            "HEDGE_MAX_DEADLINE_MS": str(hedging_config.get("maxDeadlineMs", 10000))
+        }
+        if hedging_config.get("modelId"):
+            environment["HEDGE_MODEL_ID"] = hedging_config["modelId"]
+        if hedging_config.get("region"):
+            environment["HEDGE_REGION"] = hedging_config["region"]
+        return environment
+
+    def rate_limit_environment(self, rate_limit_config: dict) -> dict:
+        """
+        Get the environment variables of the per-player rate limits.
+
+        Args:
+            rate_limit_config (dict): The "rateLimiting" section of the question generation configuration.
+
+        Returns:
+            dict: The environment variables.
+        """
+        return {
+            "RATE_LIMIT_TABLE": self.rate_limit_table.table_name,
+            "RATE_LIMIT_REQUESTS_PER_MINUTE": str(rate_limit_config.get("requestsPerMinute", 4)),
+            "RATE_LIMIT_BURST": str(rate_limit_config.get("burst", 6)),
+            "RATE_LIMIT_FAIR_SHARE": str(rate_limit_config.get("fairShare", 0.5)),
+            "RATE_LIMIT_SATURATION_SECONDS": str(rate_limit_config.get("saturationSeconds", 30))
+        }
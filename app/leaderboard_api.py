@@ -0,0 +1,91 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import aws_cdk as cdk
+from constructs import Construct
+from aws_cdk import (
+    aws_lambda as _lambda,
+    aws_dynamodb as dynamodb
+)
+from cdk_nag import NagSuppressions
+from app.app_stack import get_lambda_tracing
+
+
+class LeaderboardFunction(Construct):
+    """
+    Lambda function serving the top scores through CloudFront.
+
+    This class creates a Lambda function that queries the top scores from the
+    DynamoDB score index, keeps them in an in-memory TTL cache, and returns them
+    with shared cache headers. It also creates the Function URL used as the
+    CloudFront origin.
+
+    Attributes:
+        lambda_function (lambda.Function): The Lambda function.
+        function_url (lambda.FunctionUrl): The Function URL of the Lambda function.
+    """
+
+    def __init__(self, scope: Construct, id: str, table: dynamodb.ITable, config: dict, **kwargs):
+        """
+        Initialize the LeaderboardFunction construct.
+
+        Args:
+            scope (Construct): The scope of the construct.
+            id (str): The ID of the construct.
+            table (dynamodb.ITable): The high score table.
+            config (dict): Application configuration.
+            **kwargs: Additional arguments.
+        """
+        super().__init__(scope, id, **kwargs)
+
+        leaderboard_config = config["appInfrastructure"].get("leaderboard", {})
+        s_max_age = leaderboard_config.get("sMaxAgeSeconds", 5)
+        stale_while_revalidate = leaderboard_config.get("staleWhileRevalidateSeconds", 30)
+
+        self.lambda_function = _lambda.Function(
+            self,
+            "rGenAiTriviaLeaderboardFunction",
+            function_name="gen-ai-trivia-get-leaderboard",
+            runtime=_lambda.Runtime.NODEJS_20_X,
+            architecture=_lambda.Architecture.ARM_64,
+            memory_size=256,
+            handler="index.handler",
+            code=_lambda.Code.from_asset("app/lambda_src/get_leaderboard"),
+            timeout=cdk.Duration.seconds(10),
+            reserved_concurrent_executions=leaderboard_config.get("reservedConcurrency"),
+            tracing=get_lambda_tracing(config),
+            environment={
+                "TABLE_NAME": table.table_name,
+                "INDEX_NAME": "sortedScores",
+                "NUMBER_OF_HIGH_SCORES": str(leaderboard_config.get("numberOfHighScores", 10)),
+                "CACHE_TTL_SECONDS": str(leaderboard_config.get("cacheTtlSeconds", 5)),
+                "CACHE_CONTROL": f"public, max-age=0, s-maxage={s_max_age}, "
+                                 f"stale-while-revalidate={stale_while_revalidate}"
+            }
+        )
+
+        table.grant(self.lambda_function, "dynamodb:Query")
+
+        self.function_url = self.lambda_function.add_function_url(
+            auth_type=_lambda.FunctionUrlAuthType.AWS_IAM
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            self.lambda_function,
+            [
+                {
+                    "id": "AwsSolutions-IAM4",
+                    "reason": "Managed policy for Lambda Execution",
+                },
+                {
+                    "id": "AwsSolutions-IAM5",
+                    "reason": "The IAM entity contains wildcard permissions and does not have " \
+                        "a cdk-nag rule suppression with evidence for those permission.",
+                },
+                {
+                    "id": "AwsSolutions-L1",
+                    "reason": "The non-container Lambda function is not configured to use the latest runtime version."
+                }
+            ],
+            apply_to_children=True
+        )
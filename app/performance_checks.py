@@ -0,0 +1,286 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+import jsii
+from constructs import IConstruct
+from aws_cdk import (
+    Annotations,
+    CfnResource,
+    IAspect,
+    Stack,
+    aws_lambda as _lambda,
+    aws_dynamodb as dynamodb,
+    aws_cloudfront as cloudfront,
+    aws_applicationautoscaling as appscaling,
+    custom_resources as cr
+)
+
+# Metadata key holding the suppressed rules of a resource
+SUPPRESSIONS_METADATA_KEY = "performance_checks"
+
+RULES = {
+    "Performance-L1": "The Lambda function uses the default memory size, which also limits its CPU share.",
+    "Performance-L2": "The Lambda function does not use the arm64 architecture.",
+    "Performance-L3": "The Lambda function does not have reserved concurrency.",
+    "Performance-DDB1": "The DynamoDB table or global secondary index uses provisioned capacity without autoscaling.",
+    "Performance-DDB2": "The DynamoDB global secondary index uses a partition key that holds a single value.",
+    "Performance-CFR1": "The CloudFront cache behavior does not compress responses.",
+    "Performance-CFR2": "The CloudFront cache behavior does not use a cache policy.",
+    "Performance-S3D1": "The BucketDeployment invalidates every path (/*) of the CloudFront distribution.",
+}
+
+
+class PerformanceSuppressions:
+    """
+    Suppress performance checks on resources, mirroring cdk_nag.NagSuppressions.
+
+    Suppressions are stored as metadata on the underlying CloudFormation
+    resources and read by PerformanceChecks while it visits them.
+    """
+
+    @staticmethod
+    def add_resource_suppressions(construct: IConstruct, suppressions: list, apply_to_children: bool = False):
+        """
+        Suppress performance checks on a construct.
+
+        Args:
+            construct (IConstruct): The construct to suppress the rules on.
+            suppressions (list): Dictionaries with the "id" of the rule and the "reason" it is suppressed.
+            apply_to_children (bool, optional): Also suppress the rules on all child constructs.
+                Defaults to False.
+        """
+        for suppression in suppressions:
+            if suppression.get("id") not in RULES:
+                raise ValueError(f"Unknown performance rule '{suppression.get('id')}'")
+            if len(suppression.get("reason", "")) < 10:
+                raise ValueError(
+                    f"Suppression of '{suppression['id']}' needs a reason of at least 10 characters"
+                )
+
+        if apply_to_children:
+            resources = [child for child in construct.node.find_all() if isinstance(child, CfnResource)]
+        elif isinstance(construct, CfnResource):
+            resources = [construct]
+        else:
+            resources = [construct.node.default_child] if construct.node.default_child else []
+
+        for resource in resources:
+            existing = (resource.get_metadata(SUPPRESSIONS_METADATA_KEY) or {}).get("rules_to_suppress", [])
+            existing_ids = [rule["id"] for rule in existing]
+            rules = existing + [
+                {"id": suppression["id"], "reason": suppression["reason"]}
+                for suppression in suppressions if suppression["id"] not in existing_ids
+            ]
+            resource.add_metadata(SUPPRESSIONS_METADATA_KEY, {"rules_to_suppress": rules})
+
+    @staticmethod
+    def add_stack_suppressions(stack: Stack, suppressions: list):
+        """
+        Suppress performance checks on every resource of a stack.
+
+        Args:
+            stack (Stack): The stack to suppress the rules on.
+            suppressions (list): Dictionaries with the "id" of the rule and the "reason" it is suppressed.
+        """
+        PerformanceSuppressions.add_resource_suppressions(stack, suppressions, apply_to_children=True)
+
+
+@jsii.implements(IAspect)
+class PerformanceChecks:
+    """
+    Performance rule pack, flags slow or throttle-prone configuration at synth time.
+
+    The checks run next to cdk_nag's AwsSolutionsChecks and report findings as
+    warnings, or as errors that fail the synth, on the offending resources.
+    Functions of CDK custom resource providers, such as the BucketDeployment
+    handler, are not checked because their configuration cannot be changed.
+
+    Attributes:
+        enabled (bool): Whether the checks run at all.
+        level (str): "warning" or "error".
+        disabled_rules (list): Rule IDs that are not checked.
+        low_cardinality_keys (list): Attribute names known to hold a single value.
+    """
+
+    def __init__(self, config: dict = None):
+        """
+        Initialize the PerformanceChecks aspect.
+
+        Args:
+            config (dict, optional): The "performanceChecks" section of the deploy config.
+        """
+        config = config or {}
+        self.enabled = config.get("enabled", True)
+        self.level = config.get("level", "warning").lower()
+        self.disabled_rules = config.get("disabledRules", [])
+        self.low_cardinality_keys = config.get("lowCardinalityKeys", [])
+
+    def visit(self, node: IConstruct) -> None:
+        """
+        Check a construct against the enabled rules.
+
+        Args:
+            node (IConstruct): The construct being visited.
+        """
+        if not self.enabled or not isinstance(node, CfnResource):
+            return
+
+        if isinstance(node, _lambda.CfnFunction):
+            if not self._is_provider_function(node):
+                self.check_lambda_function(node)
+        elif isinstance(node, dynamodb.CfnTable):
+            self.check_dynamodb_table(node)
+        elif isinstance(node, cloudfront.CfnDistribution):
+            self.check_cloudfront_distribution(node)
+        elif node.cfn_resource_type == "Custom::CDKBucketDeployment":
+            self.check_bucket_deployment(node)
+
+    def check_lambda_function(self, node: _lambda.CfnFunction) -> None:
+        """
+        Check memory, architecture and concurrency of a Lambda function.
+
+        Args:
+            node (lambda.CfnFunction): The Lambda function resource.
+        """
+        props = self._resolved_properties(node)
+        if props.get("memorySize") in (None, 128):
+            self._report(node, "Performance-L1")
+        if "arm64" not in (props.get("architectures") or []):
+            self._report(node, "Performance-L2")
+        if props.get("reservedConcurrentExecutions") is None:
+            self._report(node, "Performance-L3")
+
+    def check_dynamodb_table(self, node: dynamodb.CfnTable) -> None:
+        """
+        Check capacity autoscaling and index partition keys of a DynamoDB table.
+
+        Args:
+            node (dynamodb.CfnTable): The DynamoDB table resource.
+        """
+        props = self._resolved_properties(node)
+        indexes = props.get("globalSecondaryIndexes") or []
+
+        if props.get("billingMode") != "PAY_PER_REQUEST":
+            scaled = self._scaled_resource_ids(node)
+            logical_id = Stack.of(node).get_logical_id(node)
+            if not any(f"table/{logical_id}" == resource_id for resource_id in scaled):
+                self._report(node, "Performance-DDB1")
+            for index in indexes:
+                if f"table/{logical_id}/index/{index['indexName']}" not in scaled:
+                    self._report(node, "Performance-DDB1")
+                    break
+
+        for index in indexes:
+            partition_keys = [key["attributeName"] for key in index["keySchema"] if key["keyType"] == "HASH"]
+            if any(key in self.low_cardinality_keys for key in partition_keys):
+                self._report(node, "Performance-DDB2")
+                break
+
+    def check_cloudfront_distribution(self, node: cloudfront.CfnDistribution) -> None:
+        """
+        Check compression and cache policies of all distribution behaviors.
+
+        Args:
+            node (cloudfront.CfnDistribution): The CloudFront distribution resource.
+        """
+        config = self._resolved_properties(node).get("distributionConfig", {})
+        behaviors = [config.get("defaultCacheBehavior", {})] + (config.get("cacheBehaviors") or [])
+        if not all(behavior.get("compress") for behavior in behaviors):
+            self._report(node, "Performance-CFR1")
+        if not all(behavior.get("cachePolicyId") for behavior in behaviors):
+            self._report(node, "Performance-CFR2")
+
+    def check_bucket_deployment(self, node: CfnResource) -> None:
+        """
+        Check the CloudFront invalidation paths of a BucketDeployment.
+
+        Args:
+            node (CfnResource): The Custom::CDKBucketDeployment resource.
+        """
+        if "/*" in (self._resolved_properties(node).get("DistributionPaths") or []):
+            self._report(node, "Performance-S3D1")
+
+    def _report(self, node: CfnResource, rule_id: str) -> None:
+        """
+        Add a finding to a resource unless the rule is disabled or suppressed.
+
+        Args:
+            node (CfnResource): The non-compliant resource.
+            rule_id (str): The ID of the rule.
+        """
+        if rule_id in self.disabled_rules:
+            return
+        suppressed = (node.get_metadata(SUPPRESSIONS_METADATA_KEY) or {}).get("rules_to_suppress", [])
+        if any(rule["id"] == rule_id for rule in suppressed):
+            return
+
+        message = f"{rule_id}: {RULES[rule_id]}"
+        if self.level == "error":
+            Annotations.of(node).add_error(message)
+        else:
+            Annotations.of(node).add_warning_v2(rule_id, message)
+
+    @staticmethod
+    def _is_provider_function(node: _lambda.CfnFunction) -> bool:
+        """
+        Whether a Lambda function belongs to a CDK custom resource provider.
+
+        Args:
+            node (lambda.CfnFunction): The Lambda function resource.
+
+        Returns:
+            bool: True for functions created by a SingletonFunction or a custom resource Provider.
+
+        A SingletonFunction creates its function at the root of the stack, outside
+        of its own scope, so it is found through the ARN it refers to.
+        """
+        if any(isinstance(scope, cr.Provider) for scope in node.node.scopes):
+            return True
+        stack = Stack.of(node)
+        arn = {"Fn::GetAtt": [stack.get_logical_id(node), "Arn"]}
+        return any(
+            isinstance(construct, _lambda.SingletonFunction) and stack.resolve(construct.function_arn) == arn
+            for construct in stack.node.find_all()
+        )
+
+    @staticmethod
+    def _resolved_properties(node: CfnResource) -> dict:
+        """
+        Get the resolved CloudFormation properties of a resource.
+
+        Args:
+            node (CfnResource): The CloudFormation resource.
+
+        Returns:
+            dict: The properties, camelCase for generated L1 resources and as written
+                for generic CfnResources such as custom resources.
+        """
+        # cfnProperties is protected in the CDK, jsii still exposes it by name
+        return Stack.of(node).resolve(jsii.get(node, "cfnProperties")) or {}
+
+    @staticmethod
+    def _scaled_resource_ids(node: CfnResource) -> list:
+        """
+        Get the DynamoDB resource IDs with autoscaling targets in the stack of a resource.
+
+        Args:
+            node (CfnResource): Any resource of the stack.
+
+        Returns:
+            list: Resource IDs such as "table/<logical id>" or "table/<logical id>/index/<name>",
+                with table references replaced by their logical ID.
+        """
+        stack = Stack.of(node)
+        resource_ids = []
+        for child in stack.node.find_all():
+            if isinstance(child, appscaling.CfnScalableTarget) and child.service_namespace == "dynamodb":
+                resource_id = stack.resolve(child.resource_id)
+                if isinstance(resource_id, dict) and "Fn::Join" in resource_id:
+                    resource_id = "".join(
+                        part["Ref"] if isinstance(part, dict) and "Ref" in part else
+                        part if isinstance(part, str) else json.dumps(part)
+                        for part in resource_id["Fn::Join"][1]
+                    )
+                resource_ids.append(resource_id)
+        return resource_ids
@@ -0,0 +1,180 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import aws_cdk as cdk
+from constructs import Construct
+from aws_cdk import (
+    Stack,
+    aws_lambda as _lambda,
+    aws_iam as iam,
+    aws_dynamodb as dynamodb,
+    aws_apigatewayv2 as apigwv2,
+    aws_apigatewayv2_integrations as integrations
+)
+from cdk_nag import NagSuppressions
+from app.app_stack import get_lambda_tracing
+
+ROOM_FUNCTION_NAME = "gen-ai-trivia-room"
+ROOM_ROUTES = ["create", "join", "start", "answer"]
+
+
+class RoomApi(Construct):
+    """
+    WebSocket API of the shared-room game mode.
+
+    This class creates the WebSocket API and the Lambda function behind all of
+    its routes. The function tracks rooms and connections in the room table and
+    runs each round of a room: it requests the questions from the question
+    generation function once and broadcasts them to every player of the room.
+
+    Attributes:
+        lambda_function (lambda.Function): The Lambda function.
+        web_socket_api (apigwv2.WebSocketApi): The WebSocket API.
+        web_socket_stage (apigwv2.WebSocketStage): The stage players connect to.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        id: str,
+        table: dynamodb.ITable,
+        generation_function: _lambda.IFunction,
+        user_pool_id: str,
+        user_pool_client_id: str,
+        config: dict,
+        **kwargs
+    ):
+        """
+        Initialize the RoomApi construct.
+
+        Args:
+            scope (Construct): The scope of the construct.
+            id (str): The ID of the construct.
+            table (dynamodb.ITable): The room and connection table.
+            generation_function (lambda.IFunction): The streaming question generation function.
+            user_pool_id (str): The Cognito user pool ID, used to verify the tokens of players.
+            user_pool_client_id (str): The Cognito user pool client ID the tokens must be issued for.
+            config (dict): Application configuration.
+            **kwargs: Additional arguments.
+        """
+        super().__init__(scope, id, **kwargs)
+
+        stack = Stack.of(self)
+        rooms_config = config["appInfrastructure"]["rooms"]
+
+        self.lambda_function = _lambda.Function(
+            self,
+            "rGenAiTriviaRoomFunction",
+            function_name=ROOM_FUNCTION_NAME,
+            runtime=_lambda.Runtime.NODEJS_20_X,
+            architecture=_lambda.Architecture.ARM_64,
+            memory_size=256,
+            handler="index.handler",
+            code=_lambda.Code.from_asset("app/lambda_src/room"),
+            # A round runner invocation lasts for a whole round of the room
+            timeout=cdk.Duration.seconds(900),
+            # A retried round would generate and broadcast its questions again, the function ends the room instead
+            retry_attempts=0,
+            tracing=get_lambda_tracing(config),
+            environment={
+                "TABLE_NAME": table.table_name,
+                "GENERATION_FUNCTION_NAME": generation_function.function_name,
+                "USER_POOL_ID": user_pool_id,
+                "USER_POOL_CLIENT_ID": user_pool_client_id,
+                "ROOM_TTL_HOURS": str(rooms_config.get("roomTtlHours", 6)),
+                "MAX_PLAYERS": str(rooms_config.get("maxPlayers", 200)),
+                "QUESTION_SECONDS": str(rooms_config.get("questionSeconds", 15)),
+                "REVEAL_SECONDS": str(rooms_config.get("revealSeconds", 4)),
+                "LEADERBOARD_SIZE": str(rooms_config.get("leaderboardSize", 10))
+            }
+        )
+
+        table.grant_read_write_data(self.lambda_function)
+
+        self.lambda_function.add_to_role_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=["lambda:InvokeWithResponseStream"],
+                resources=[generation_function.function_arn]
+            )
+        )
+
+        # Each round starts the next one, the ARN is built from the name to avoid a circular reference
+        self.lambda_function.add_to_role_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=["lambda:InvokeFunction"],
+                resources=[
+                    f"arn:{stack.partition}:lambda:{stack.region}:{stack.account}:function:{ROOM_FUNCTION_NAME}"
+                ]
+            )
+        )
+
+        integration = integrations.WebSocketLambdaIntegration(
+            "rGenAiTriviaRoomIntegration",
+            self.lambda_function
+        )
+
+        self.web_socket_api = apigwv2.WebSocketApi(
+            self,
+            "rGenAiTriviaRoomWebSocketApi",
+            api_name="gen-ai-trivia-rooms",
+            route_selection_expression="$request.body.action",
+            connect_route_options=apigwv2.WebSocketRouteOptions(integration=integration),
+            disconnect_route_options=apigwv2.WebSocketRouteOptions(integration=integration),
+            default_route_options=apigwv2.WebSocketRouteOptions(integration=integration)
+        )
+
+        for route in ROOM_ROUTES:
+            self.web_socket_api.add_route(route, integration=integration)
+
+        self.web_socket_stage = apigwv2.WebSocketStage(
+            self,
+            "rGenAiTriviaRoomWebSocketStage",
+            web_socket_api=self.web_socket_api,
+            stage_name="prod",
+            auto_deploy=True
+        )
+
+        self.web_socket_api.grant_manage_connections(self.lambda_function)
+
+        NagSuppressions.add_resource_suppressions(
+            self.lambda_function,
+            [
+                {
+                    "id": "AwsSolutions-IAM4",
+                    "reason": "Managed policy for Lambda Execution",
+                },
+                {
+                    "id": "AwsSolutions-IAM5",
+                    "reason": "The IAM entity contains wildcard permissions and does not have " \
+                        "a cdk-nag rule suppression with evidence for those permission.",
+                },
+                {
+                    "id": "AwsSolutions-L1",
+                    "reason": "The non-container Lambda function is not configured to use the latest runtime version."
+                }
+            ],
+            apply_to_children=True
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            self.web_socket_api,
+            [
+                {
+                    "id": "AwsSolutions-APIG4",
+                    "reason": "The $connect route verifies the Cognito ID token of the player in the Lambda function.",
+                }
+            ],
+            apply_to_children=True
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            self.web_socket_stage,
+            [
+                {
+                    "id": "AwsSolutions-APIG1",
+                    "reason": "The API does not have access logging enabled.",
+                }
+            ]
+        )
@@ -0,0 +1,386 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from constructs import Construct
+from aws_cdk import (
+    Duration,
+    RemovalPolicy,
+    Stack,
+    aws_athena as athena,
+    aws_dynamodb as dynamodb,
+    aws_events as events,
+    aws_events_targets as targets,
+    aws_glue as glue,
+    aws_s3 as s3,
+    aws_stepfunctions as sfn,
+    aws_stepfunctions_tasks as tasks
+)
+from cdk_nag import NagSuppressions
+
+ANALYTICS_DATABASE = "gen_ai_trivia_analytics"
+ANALYTICS_WORKGROUP = "gen-ai-trivia-analytics"
+EXPORT_TABLE = "score_exports"
+SCORES_TABLE = "scores"
+
+# Prefixes of the analytics bucket
+EXPORT_PREFIX = "exports"
+SCORES_PREFIX = "scores"
+RESULTS_PREFIX = "athena-results"
+
+# Attributes of a high score item and their column in the scores table
+SCORE_ATTRIBUTES = {
+    "id": ("S", "id", "string"),
+    "name": ("S", "name", "string"),
+    "initialScore": ("N", "initial_score", "double"),
+    "accuracy": ("N", "accuracy", "double"),
+    "score": ("N", "score", "double"),
+    "submittedAt": ("S", "submitted_at", "string")
+}
+
+
+class ScoreAnalytics(Construct):
+    """
+    Scheduled export of the high score table for analytics.
+
+    This class creates a Step Functions state machine, started on a schedule,
+    that exports the high score table to S3 with a point-in-time export and
+    rewrites the export with Athena as Parquet partitioned by export date and
+    category. The export is read from the point-in-time recovery backup, so it
+    does not use any capacity of the table. Analytics query the Parquet files
+    in the "scores" table of the Glue database, never the table itself.
+
+    Attributes:
+        bucket (s3.Bucket): The bucket holding the exports, the Parquet files and the query results.
+        state_machine (sfn.StateMachine): The state machine exporting the table.
+    """
+
+    def __init__(self, scope: Construct, id: str, table: dynamodb.ITable, config: dict, **kwargs):
+        """
+        Initialize the ScoreAnalytics construct.
+
+        Args:
+            scope (Construct): The scope of the construct.
+            id (str): The ID of the construct.
+            table (dynamodb.ITable): The high score table, with point-in-time recovery enabled.
+            config (dict): Application configuration.
+            **kwargs: Additional arguments.
+        """
+        super().__init__(scope, id, **kwargs)
+
+        stack = Stack.of(self)
+        analytics_config = config["appInfrastructure"].get("analytics", {})
+
+        self.bucket = s3.Bucket(
+            self,
+            "rGenAiTriviaAnalyticsS3Bucket",
+            removal_policy=RemovalPolicy.DESTROY,
+            auto_delete_objects=True,
+            bucket_name=f"gen-ai-trivia-analytics-{stack.region}-{stack.account}",
+            enforce_ssl=True,
+            lifecycle_rules=[
+                # The raw exports are only needed until they are rewritten as Parquet
+                s3.LifecycleRule(
+                    prefix=f"{EXPORT_PREFIX}/",
+                    expiration=Duration.days(analytics_config.get("exportRetentionDays", 7))
+                ),
+                s3.LifecycleRule(
+                    prefix=f"{RESULTS_PREFIX}/",
+                    expiration=Duration.days(7)
+                )
+            ]
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            self.bucket,
+            [
+                {
+                    "id": "AwsSolutions-S1",
+                    "reason": "The S3 Bucket has server access logs disabled.",
+                }
+            ]
+        )
+
+        bucket_url = f"s3://{self.bucket.bucket_name}"
+
+        database = glue.CfnDatabase(
+            self,
+            "rGenAiTriviaAnalyticsDatabase",
+            catalog_id=stack.account,
+            database_input=glue.CfnDatabase.DatabaseInputProperty(name=ANALYTICS_DATABASE)
+        )
+
+        # DynamoDB JSON written by the point-in-time export, one folder per export id
+        item_type = ",".join(
+            f"{attribute.lower()}:struct<{attribute_type.lower()}:string>"
+            for attribute, (attribute_type, _, _) in {
+                **SCORE_ATTRIBUTES, "category": ("S", "category", "string")
+            }.items()
+        )
+        export_table = glue.CfnTable(
+            self,
+            "rGenAiTriviaScoreExportTable",
+            catalog_id=stack.account,
+            database_name=ANALYTICS_DATABASE,
+            table_input=glue.CfnTable.TableInputProperty(
+                name=EXPORT_TABLE,
+                table_type="EXTERNAL_TABLE",
+                parameters={
+                    "classification": "json",
+                    "projection.enabled": "true",
+                    "projection.export_id.type": "injected",
+                    "storage.location.template": f"{bucket_url}/{EXPORT_PREFIX}/AWSDynamoDB/${{export_id}}/data/"
+                },
+                partition_keys=[glue.CfnTable.ColumnProperty(name="export_id", type="string")],
+                storage_descriptor=glue.CfnTable.StorageDescriptorProperty(
+                    columns=[glue.CfnTable.ColumnProperty(name="item", type=f"struct<{item_type}>")],
+                    location=f"{bucket_url}/{EXPORT_PREFIX}/AWSDynamoDB/",
+                    input_format="org.apache.hadoop.mapred.TextInputFormat",
+                    output_format="org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat",
+                    serde_info=glue.CfnTable.SerdeInfoProperty(
+                        serialization_library="org.openx.data.jsonserde.JsonSerDe"
+                    )
+                )
+            )
+        )
+        export_table.add_dependency(database)
+
+        scores_table = glue.CfnTable(
+            self,
+            "rGenAiTriviaScoresTable",
+            catalog_id=stack.account,
+            database_name=ANALYTICS_DATABASE,
+            table_input=glue.CfnTable.TableInputProperty(
+                name=SCORES_TABLE,
+                table_type="EXTERNAL_TABLE",
+                parameters={"classification": "parquet"},
+                partition_keys=[
+                    glue.CfnTable.ColumnProperty(name="export_date", type="string"),
+                    glue.CfnTable.ColumnProperty(name="category", type="string")
+                ],
+                storage_descriptor=glue.CfnTable.StorageDescriptorProperty(
+                    columns=[
+                        glue.CfnTable.ColumnProperty(name=column, type=column_type)
+                        for _, column, column_type in SCORE_ATTRIBUTES.values()
+                    ],
+                    location=f"{bucket_url}/{SCORES_PREFIX}/",
+                    input_format="org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat",
+                    output_format="org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat",
+                    serde_info=glue.CfnTable.SerdeInfoProperty(
+                        serialization_library="org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe"
+                    )
+                )
+            )
+        )
+        scores_table.add_dependency(database)
+
+        work_group = athena.CfnWorkGroup(
+            self,
+            "rGenAiTriviaAnalyticsWorkGroup",
+            name=ANALYTICS_WORKGROUP,
+            recursive_delete_option=True,
+            work_group_configuration=athena.CfnWorkGroup.WorkGroupConfigurationProperty(
+                enforce_work_group_configuration=True,
+                result_configuration=athena.CfnWorkGroup.ResultConfigurationProperty(
+                    output_location=f"{bucket_url}/{RESULTS_PREFIX}/",
+                    encryption_configuration=athena.CfnWorkGroup.EncryptionConfigurationProperty(
+                        encryption_option="SSE_S3"
+                    )
+                )
+            )
+        )
+
+        self.state_machine = sfn.StateMachine(
+            self,
+            "rGenAiTriviaScoreExportStateMachine",
+            state_machine_name="gen-ai-trivia-score-export",
+            definition_body=sfn.DefinitionBody.from_chainable(
+                self._create_definition(table, bucket_url, work_group)
+            ),
+            timeout=Duration.hours(6)
+        )
+
+        self.bucket.grant_read_write(self.state_machine)
+
+        events.Rule(
+            self,
+            "rGenAiTriviaScoreExportSchedule",
+            schedule=events.Schedule.expression(analytics_config.get("scheduleExpression", "cron(0 3 * * ? *)")),
+            targets=[targets.SfnStateMachine(self.state_machine)]
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            self.state_machine,
+            [
+                {
+                    "id": "AwsSolutions-IAM5",
+                    "reason": "The export files and the Athena query results use generated object keys.",
+                },
+                {
+                    "id": "AwsSolutions-SF1",
+                    "reason": "The state machine does not log its events, failed executions are visible in the console.",
+                },
+                {
+                    "id": "AwsSolutions-SF2",
+                    "reason": "The state machine does not have X-Ray tracing enabled.",
+                }
+            ],
+            apply_to_children=True
+        )
+
+    def _create_definition(self, table: dynamodb.ITable, bucket_url: str, work_group: athena.CfnWorkGroup) -> sfn.IChainable:
+        """
+        Create the steps of the export state machine.
+
+        Args:
+            table (dynamodb.ITable): The high score table.
+            bucket_url (str): The s3:// URL of the analytics bucket.
+            work_group (athena.CfnWorkGroup): The Athena workgroup running the queries.
+
+        Returns:
+            sfn.IChainable: The first step of the state machine.
+
+        The steps are:
+        1. Start a point-in-time export of the table in DynamoDB JSON.
+        2. Poll the export every minute until it completes.
+        3. Delete the Parquet files of an earlier export of the same date, UNLOAD
+           fails when its target is not empty.
+        4. UNLOAD the exported items to scores/export_date=<date>/category=<category>/ as Parquet.
+        5. Load the new partitions into the scores table.
+        """
+        # The date of the execution names the partition of this export
+        set_export_date = sfn.Pass(
+            self,
+            "Set export date",
+            parameters={
+                "date": sfn.JsonPath.array_get_item(
+                    sfn.JsonPath.string_split(sfn.JsonPath.string_at("$$.Execution.StartTime"), "T"), 0
+                )
+            },
+            result_path="$.run"
+        )
+
+        start_export = tasks.CallAwsService(
+            self,
+            "Export table",
+            service="dynamodb",
+            action="exportTableToPointInTime",
+            iam_action="dynamodb:ExportTableToPointInTime",
+            iam_resources=[table.table_arn],
+            parameters={
+                "TableArn": table.table_arn,
+                "S3Bucket": self.bucket.bucket_name,
+                "S3Prefix": EXPORT_PREFIX,
+                "ExportFormat": "DYNAMODB_JSON"
+            },
+            result_selector={
+                "exportArn": sfn.JsonPath.string_at("$.ExportDescription.ExportArn")
+            },
+            result_path="$.export"
+        )
+
+        wait = sfn.Wait(self, "Wait for export", time=sfn.WaitTime.duration(Duration.minutes(1)))
+
+        describe_export = tasks.CallAwsService(
+            self,
+            "Describe export",
+            service="dynamodb",
+            action="describeExport",
+            iam_action="dynamodb:DescribeExport",
+            iam_resources=[f"{table.table_arn}/export/*"],
+            parameters={"ExportArn": sfn.JsonPath.string_at("$.export.exportArn")},
+            result_selector={"status": sfn.JsonPath.string_at("$.ExportDescription.ExportStatus")},
+            result_path="$.describe"
+        )
+
+        # The export id is the last part of arn:...:table/<name>/export/<id>
+        export_id = sfn.JsonPath.array_get_item(
+            sfn.JsonPath.string_split(sfn.JsonPath.string_at("$.export.exportArn"), "/"), 3
+        )
+        columns = ", ".join(
+            f"item.{attribute.lower()}.{attribute_type.lower()} AS {column}" if column_type == "string"
+            else f"CAST(item.{attribute.lower()}.{attribute_type.lower()} AS {column_type}) AS {column}"
+            for attribute, (attribute_type, column, column_type) in SCORE_ATTRIBUTES.items()
+        )
+        # The partition column has to be the last column of the query
+        unload_query = sfn.JsonPath.format(
+            f"UNLOAD (SELECT {columns}, item.category.s AS category "
+            f"FROM {EXPORT_TABLE} WHERE export_id = {{}}) "
+            f"TO {{}} "
+            "WITH (format = 'PARQUET', compression = 'SNAPPY', partitioned_by = ARRAY['category'])",
+            sfn.JsonPath.format("'{}'", export_id),
+            sfn.JsonPath.format(f"'{bucket_url}/{SCORES_PREFIX}/export_date={{}}/'", sfn.JsonPath.string_at("$.run.date"))
+        )
+
+        # Listed in pages of 100 keys to stay below the state size limit, until none are left
+        export_date_prefix = sfn.JsonPath.format(f"{SCORES_PREFIX}/export_date={{}}/", sfn.JsonPath.string_at("$.run.date"))
+        list_previous = tasks.CallAwsService(
+            self,
+            "List previous files",
+            service="s3",
+            action="listObjectsV2",
+            iam_action="s3:ListBucket",
+            iam_resources=[self.bucket.bucket_arn],
+            parameters={"Bucket": self.bucket.bucket_name, "Prefix": export_date_prefix, "MaxKeys": 100},
+            result_path="$.previous"
+        )
+
+        delete_file = tasks.CallAwsService(
+            self,
+            "Delete previous file",
+            service="s3",
+            action="deleteObject",
+            iam_action="s3:DeleteObject",
+            iam_resources=[self.bucket.arn_for_objects(f"{SCORES_PREFIX}/*")],
+            parameters={"Bucket": self.bucket.bucket_name, "Key": sfn.JsonPath.string_at("$.key")},
+            result_path=sfn.JsonPath.DISCARD
+        )
+        delete_previous = sfn.Map(
+            self,
+            "Delete previous files",
+            items_path="$.previous.Contents",
+            item_selector={"key": sfn.JsonPath.string_at("$$.Map.Item.Value.Key")},
+            max_concurrency=10,
+            result_path=sfn.JsonPath.DISCARD
+        )
+        delete_previous.item_processor(delete_file)
+
+        unload = tasks.AthenaStartQueryExecution(
+            self,
+            "Write Parquet",
+            query_string=unload_query,
+            work_group=work_group.name,
+            query_execution_context=tasks.QueryExecutionContext(database_name=ANALYTICS_DATABASE),
+            integration_pattern=sfn.IntegrationPattern.RUN_JOB,
+            result_path=sfn.JsonPath.DISCARD
+        )
+
+        load_partitions = tasks.AthenaStartQueryExecution(
+            self,
+            "Load partitions",
+            query_string=f"MSCK REPAIR TABLE {SCORES_TABLE}",
+            work_group=work_group.name,
+            query_execution_context=tasks.QueryExecutionContext(database_name=ANALYTICS_DATABASE),
+            integration_pattern=sfn.IntegrationPattern.RUN_JOB,
+            result_path=sfn.JsonPath.DISCARD
+        )
+
+        export_done = sfn.Choice(self, "Export complete?")
+        export_done.when(
+            sfn.Condition.string_equals("$.describe.status", "COMPLETED"),
+            list_previous
+        )
+        export_done.when(
+            sfn.Condition.string_equals("$.describe.status", "FAILED"),
+            sfn.Fail(self, "Export failed", cause="The point-in-time export of the table failed")
+        )
+        export_done.otherwise(wait)
+
+        previous_found = sfn.Choice(self, "Previous files?")
+        list_previous.next(previous_found)
+        previous_found.when(
+            sfn.Condition.number_greater_than("$.previous.KeyCount", 0),
+            delete_previous.next(list_previous)
+        )
+        previous_found.otherwise(unload.next(load_partitions))
+
+        return set_export_date.next(start_export).next(wait).next(describe_export).next(export_done)
@@ -0,0 +1,161 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import aws_cdk as cdk
+from constructs import Construct
+from aws_cdk import (
+    aws_lambda as _lambda,
+    aws_lambda_event_sources as event_sources,
+    aws_dynamodb as dynamodb,
+    aws_sqs as sqs
+)
+from cdk_nag import NagSuppressions
+from app.app_stack import get_lambda_tracing
+from app.performance_checks import PerformanceSuppressions
+
+SUBMIT_SCORE_FUNCTION_NAME = "gen-ai-trivia-submit-score"
+
+
+class ScoreIngestion(Construct):
+    """
+    Queue-buffered ingestion of high scores.
+
+    This class creates the function players submit their score to, the SQS
+    queue it validates submissions into, and the function that writes the
+    queued scores to the high score table with BatchWriteItem. The writer's
+    concurrency is capped, so the table is written at the average submission
+    rate and end-of-round bursts wait in the queue.
+
+    Attributes:
+        submit_function (lambda.Function): The Lambda function validating and queuing scores.
+        write_function (lambda.Function): The Lambda function writing queued scores to the table.
+        queue (sqs.Queue): The queue of validated scores.
+        dead_letter_queue (sqs.Queue): The queue of scores that could not be written.
+    """
+
+    def __init__(self, scope: Construct, id: str, table: dynamodb.ITable, config: dict, **kwargs):
+        """
+        Initialize the ScoreIngestion construct.
+
+        Args:
+            scope (Construct): The scope of the construct.
+            id (str): The ID of the construct.
+            table (dynamodb.ITable): The high score table.
+            config (dict): Application configuration.
+            **kwargs: Additional arguments.
+        """
+        super().__init__(scope, id, **kwargs)
+
+        ingestion_config = config["appInfrastructure"].get("scoreIngestion", {})
+        batching_window = ingestion_config.get("maxBatchingWindowSeconds", 5)
+        write_timeout = 30
+
+        self.dead_letter_queue = sqs.Queue(
+            self,
+            "rGenAiTriviaScoreDeadLetterQueue",
+            encryption=sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+            retention_period=cdk.Duration.days(14)
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            self.dead_letter_queue,
+            [
+                {
+                    "id": "AwsSolutions-SQS3",
+                    "reason": "This queue is the dead-letter queue of the score queue.",
+                }
+            ]
+        )
+
+        self.queue = sqs.Queue(
+            self,
+            "rGenAiTriviaScoreQueue",
+            encryption=sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+            # At least six times the writer timeout, as recommended for Lambda event sources
+            visibility_timeout=cdk.Duration.seconds(6 * write_timeout + batching_window),
+            dead_letter_queue=sqs.DeadLetterQueue(
+                max_receive_count=5,
+                queue=self.dead_letter_queue
+            )
+        )
+
+        self.submit_function = _lambda.Function(
+            self,
+            "rGenAiTriviaSubmitScoreFunction",
+            function_name=SUBMIT_SCORE_FUNCTION_NAME,
+            runtime=_lambda.Runtime.NODEJS_20_X,
+            architecture=_lambda.Architecture.ARM_64,
+            memory_size=256,
+            handler="index.handler",
+            code=_lambda.Code.from_asset("app/lambda_src/submit_score"),
+            timeout=cdk.Duration.seconds(10),
+            tracing=get_lambda_tracing(config),
+            environment={
+                "QUEUE_URL": self.queue.queue_url,
+                "MAX_SCORE": str(ingestion_config.get("maxScore", 1000000))
+            }
+        )
+
+        self.queue.grant_send_messages(self.submit_function)
+
+        self.write_function = _lambda.Function(
+            self,
+            "rGenAiTriviaWriteScoresFunction",
+            function_name="gen-ai-trivia-write-scores",
+            runtime=_lambda.Runtime.NODEJS_20_X,
+            architecture=_lambda.Architecture.ARM_64,
+            memory_size=256,
+            handler="index.handler",
+            code=_lambda.Code.from_asset("app/lambda_src/write_scores"),
+            timeout=cdk.Duration.seconds(write_timeout),
+            tracing=get_lambda_tracing(config),
+            environment={
+                "TABLE_NAME": table.table_name
+            }
+        )
+
+        table.grant(self.write_function, "dynamodb:BatchWriteItem")
+
+        self.write_function.add_event_source(
+            event_sources.SqsEventSource(
+                self.queue,
+                batch_size=ingestion_config.get("batchSize", 100),
+                max_batching_window=cdk.Duration.seconds(batching_window),
+                # Caps the number of concurrent writers, and with it the write rate of the table
+                max_concurrency=ingestion_config.get("maxConcurrency", 2),
+                report_batch_item_failures=True
+            )
+        )
+
+        PerformanceSuppressions.add_resource_suppressions(
+            self.write_function,
+            [
+                {
+                    "id": "Performance-L3",
+                    "reason": "The maximum concurrency of the SQS event source caps the concurrent writers."
+                }
+            ]
+        )
+
+        for function in (self.submit_function, self.write_function):
+            NagSuppressions.add_resource_suppressions(
+                function,
+                [
+                    {
+                        "id": "AwsSolutions-IAM4",
+                        "reason": "Managed policy for Lambda Execution",
+                    },
+                    {
+                        "id": "AwsSolutions-IAM5",
+                        "reason": "The IAM entity contains wildcard permissions and does not have " \
+                            "a cdk-nag rule suppression with evidence for those permission.",
+                    },
+                    {
+                        "id": "AwsSolutions-L1",
+                        "reason": "The non-container Lambda function is not configured to use the latest runtime version."
+                    }
+                ],
+                apply_to_children=True
+            )
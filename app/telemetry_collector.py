@@ -0,0 +1,99 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+import aws_cdk as cdk
+from constructs import Construct
+from aws_cdk import aws_lambda as _lambda
+from cdk_nag import NagSuppressions
+from app.app_stack import get_lambda_tracing
+from app.performance_checks import PerformanceSuppressions
+
+# Topics and difficulties of the game, used as metric dimensions
+GAME_DATA_PATH = "www/src/data.json"
+
+
+class TelemetryCollector(Construct):
+    """
+    Lambda function collecting the game timings measured in the browser.
+
+    This class creates a Lambda function that receives batches of timings the
+    SPA sends with navigator.sendBeacon, and writes them as CloudWatch embedded
+    metric format with the topic, difficulty and region as dimensions. It also
+    creates the Function URL used as the CloudFront origin. A beacon cannot be
+    signed, so the Function URL does not use IAM authentication and the
+    function's reserved concurrency caps what it can cost.
+
+    Attributes:
+        lambda_function (lambda.Function): The Lambda function.
+        function_url (lambda.FunctionUrl): The Function URL of the Lambda function.
+    """
+
+    def __init__(self, scope: Construct, id: str, config: dict, **kwargs):
+        """
+        Initialize the TelemetryCollector construct.
+
+        Args:
+            scope (Construct): The scope of the construct.
+            id (str): The ID of the construct.
+            config (dict): Application configuration.
+            **kwargs: Additional arguments.
+        """
+        super().__init__(scope, id, **kwargs)
+
+        telemetry_config = config["appInfrastructure"].get("telemetry", {})
+        with open(GAME_DATA_PATH, "r", encoding="utf-8") as file:
+            game_data = json.load(file)
+
+        self.lambda_function = _lambda.Function(
+            self,
+            "rGenAiTriviaTelemetryFunction",
+            function_name="gen-ai-trivia-collect-telemetry",
+            runtime=_lambda.Runtime.NODEJS_20_X,
+            architecture=_lambda.Architecture.ARM_64,
+            memory_size=128,
+            handler="index.handler",
+            code=_lambda.Code.from_asset("app/lambda_src/collect_telemetry"),
+            timeout=cdk.Duration.seconds(5),
+            reserved_concurrent_executions=telemetry_config.get("reservedConcurrency", 5),
+            tracing=get_lambda_tracing(config),
+            environment={
+                "METRICS_NAMESPACE": "GenAiTrivia",
+                "MAX_SAMPLES": str(telemetry_config.get("maxSamplesPerBatch", 100)),
+                "KNOWN_TOPICS": json.dumps(game_data["topics"]),
+                "KNOWN_DIFFICULTIES": json.dumps([round_["difficulty"] for round_ in game_data["rounds"]])
+            }
+        )
+
+        self.function_url = self.lambda_function.add_function_url(
+            auth_type=_lambda.FunctionUrlAuthType.NONE
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            self.lambda_function,
+            [
+                {
+                    "id": "AwsSolutions-IAM4",
+                    "reason": "Managed policy for Lambda Execution",
+                },
+                {
+                    "id": "AwsSolutions-IAM5",
+                    "reason": "X-Ray tracing requires xray:PutTraceSegments and xray:PutTelemetryRecords on all resources."
+                },
+                {
+                    "id": "AwsSolutions-L1",
+                    "reason": "The non-container Lambda function is not configured to use the latest runtime version."
+                }
+            ],
+            apply_to_children=True
+        )
+
+        PerformanceSuppressions.add_resource_suppressions(
+            self.lambda_function,
+            [
+                {
+                    "id": "Performance-L1",
+                    "reason": "The collector only parses a small JSON body, the smallest memory size is enough."
+                }
+            ]
+        )
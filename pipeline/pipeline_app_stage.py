@@ -3,7 +3,11 @@
 
 from constructs import Construct
 from aws_cdk import Stage
-from app.app_stack import ApplicationStack
+from app.data_stack import DataStack
+from app.auth_stack import AuthStack
+from app.compute_stack import ComputeStack
+from app.edge_stack import EdgeStack
+from app.app_stack import get_deployment_regions
 
 
 class PipelineAppStage(Stage):
@@ -11,10 +15,20 @@ class PipelineAppStage(Stage):
     Application stage for the CDK pipeline.
 
     This class represents a stage in the CDK pipeline that deploys the
-    application stack.
+    application stacks. Values are passed between the stacks as explicit
+    cross-stack references, which also define the deployment order. The
+    pipeline deploys stacks without a dependency between them in parallel:
+    - Wave 1: DataStack and AuthStack
+    - Wave 2: ComputeStack (reads the tables from the DataStack and the user
+      pool from the AuthStack)
+    - Wave 3: EdgeStack (routes to Function URLs from the ComputeStack and
+      publishes the runtime configuration of the SPA)
 
     Attributes:
-        app_stack (ApplicationStack): The application stack instance.
+        data_stack (DataStack): The data stack instance.
+        auth_stack (AuthStack): The authentication stack instance.
+        compute_stack (ComputeStack): The compute stack instance.
+        edge_stack (EdgeStack): The edge stack instance.
     """
 
     def __init__(self, scope: Construct, construct_id: str, config: dict, **kwargs) -> None:
@@ -29,8 +43,77 @@ class PipelineAppStage(Stage):
         """
         super().__init__(scope, construct_id, **kwargs)
 
-        ApplicationStack(
-            self, config['appInfrastructure']['productName'],
-            stack_name=config['appInfrastructure']['cloudformation']['stackName'],
+        product_name = config['appInfrastructure']['productName']
+        stack_name = config['appInfrastructure']['cloudformation']['stackName']
+
+        self.data_stack = DataStack(
+            self, f"{product_name}-data",
+            stack_name=f"{stack_name}-data",
+            config=config
+        )
+
+        self.auth_stack = AuthStack(
+            self, f"{product_name}-auth",
+            stack_name=f"{stack_name}-auth",
             config=config
         )
+
+        self.compute_stack = ComputeStack(
+            self, f"{product_name}-compute",
+            stack_name=f"{stack_name}-compute",
+            config=config,
+            table=self.data_stack.table,
+            room_table=self.data_stack.room_table,
+            user_pool_id=self.auth_stack.cognito.user_pool.user_pool_id,
+            user_pool_client_id=self.auth_stack.cognito.user_pool_client.user_pool_client_id
+        )
+
+        self.edge_stack = EdgeStack(
+            self, f"{product_name}-edge",
+            stack_name=f"{stack_name}-edge",
+            config=config,
+            leaderboard_function_url=self.compute_stack.leaderboard.function_url,
+            telemetry_function_url=self.compute_stack.telemetry.function_url,
+            runtime_config=self.create_runtime_config(config)
+        )
+
+    def create_runtime_config(self, config: dict) -> dict:
+        """
+        Creates the runtime configuration of the SPA, published as config.json.
+
+        Args:
+            config (dict): Application configuration.
+
+        Returns:
+            dict: The Amplify configuration and the resource names the SPA calls.
+
+        The values replace the defaults bundled from www/src/amplifyconfiguration.json
+        and www/src/data.json, so the web bundle does not depend on the deployment.
+        """
+        cognito = self.auth_stack.cognito
+        return {
+            "Auth": {
+                "Cognito": {
+                    "userPoolId": cognito.user_pool.user_pool_id,
+                    "userPoolClientId": cognito.user_pool_client.user_pool_client_id,
+                    "identityPoolId": cognito.get_identity_pool_id()
+                }
+            },
+            "region": self.compute_stack.region,
+            # The SPA probes these regions and calls the functions of the closest one
+            "regions": get_deployment_regions(config, self.compute_stack.region),
+            "bedrockFunctionName": self.compute_stack.streaming_lambda.lambda_function.function_name,
+            "highscores": {
+                "table": self.data_stack.table.table_name,
+                "scoreIndexName": "sortedScores",
+                "numberOfHighScores": config["appInfrastructure"].get("leaderboard", {}).get("numberOfHighScores", 10),
+                "leaderboardPath": "/api/leaderboard",
+                "submitFunctionName": self.compute_stack.score_ingestion.submit_function.function_name
+            },
+            "rooms": {
+                "webSocketUrl": self.compute_stack.rooms.web_socket_stage.url
+            },
+            "telemetry": {
+                "path": "/api/telemetry" if config["appInfrastructure"].get("telemetry", {}).get("enabled", True) else ""
+            }
+        }
@@ -2,13 +2,17 @@
 # SPDX-License-Identifier: MIT-0
 
 import json
+import logging
 import os
 import tempfile
 import shutil
-import fileinput
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from aws_cdk import SecretValue, aws_ssm as ssm
 
+logger = logging.getLogger(__name__)
+
 
 def get_secret_value(secrets_name: str):
     """Retrieves the value of a secret from AWS Secrets Manager.
@@ -174,8 +178,9 @@ def create_archive(config: dict = {}, zip_name="zip_file") -> str:
 
     This function creates a temporary directory and copies files from the
     project root directory into it, ignoring any files/directories specified
-    in the 'codecommit' configuration. It then searches for and replaces any
-    strings specified in the 'fileReplacement' config. Finally, it zips the
+    in the 'codecommit' configuration. It then replaces the strings specified
+    in the 'fileReplacement' config, reading and writing each affected file
+    once, and logs the rules that did not match. Finally, it zips the
     contents of the temporary directory and returns the path to the created
     zip archive.
     """
@@ -208,14 +213,19 @@ def create_archive(config: dict = {}, zip_name="zip_file") -> str:
             ignore=shutil.ignore_patterns(*ignored_files_directories),
         )
 
-        for item in config["deployInfrastructure"]["codecommit"].get(
-            "fileReplacement", []
-        ):
-            file_string_replacement(
-                filename=f"{os.path.join(tmpdir, zip_name)}/{item['filename']}",
-                search_str=item["search_str"],
-                replace_str=item["replace_str"],
-            )
+        report = apply_file_replacements(
+            root_dir=os.path.join(tmpdir, zip_name),
+            replacements=config["deployInfrastructure"]["codecommit"].get(
+                "fileReplacement", []
+            ),
+        )
+        for rule in report:
+            if rule["matches"] == 0:
+                logger.warning(
+                    "fileReplacement '%s' did not match in %s",
+                    rule["search_str"],
+                    rule["filename"],
+                )
 
         # Create Zip File
         shutil.make_archive(
@@ -225,6 +235,170 @@ def create_archive(config: dict = {}, zip_name="zip_file") -> str:
     return os.path.join("cdk.out/", zip_name + ".zip")
 
 
+class MultiPatternReplacer:
+    """
+    Replaces many search strings in one pass with an Aho-Corasick automaton.
+
+    All search strings are compiled into one trie with failure links, so a
+    line is scanned once no matter how many rules apply to it. Where matches
+    overlap, the leftmost match wins, and the longest one of the matches
+    starting at the same position. Replacements are not scanned again, so
+    the rules do not apply to each other's output.
+
+    Attributes:
+        rules (list): The (search_str, replace_str) pairs, in configuration order.
+        matches (list): The number of replacements made per rule.
+    """
+
+    def __init__(self, rules: list):
+        """
+        Initialize the MultiPatternReplacer.
+
+        Args:
+            rules (list): The (search_str, replace_str) pairs. If a search string
+                is listed twice, the first rule is used.
+
+        Raises:
+            ValueError: If a search string is empty.
+        """
+        self.rules = list(rules)
+        self.matches = [0] * len(self.rules)
+        self._goto = [{}]
+        self._fail = [0]
+        # Rules whose search string ends in a state, including through failure links
+        self._output = [[]]
+
+        for index, (search_str, _) in enumerate(self.rules):
+            if not search_str:
+                raise ValueError("A fileReplacement search_str must not be empty")
+            state = 0
+            for char in search_str:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            if not self._output[state]:
+                self._output[state].append(index)
+
+        # Breadth-first, so the failure state of a node is finished before the node
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, target in self._goto[state].items():
+                queue.append(target)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[target] = self._goto[fallback].get(char, 0)
+                self._output[target] = self._output[target] + self._output[self._fail[target]]
+
+    def replace(self, text: str) -> str:
+        """
+        Replace the search strings in a text.
+
+        Args:
+            text (str): The text, usually one line of a file.
+
+        Returns:
+            str: The text with the search strings replaced.
+        """
+        # Longest rule per start position, collected in one scan
+        longest = {}
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._output[state]:
+                start = position - len(self.rules[index][0]) + 1
+                if start not in longest or len(self.rules[index][0]) > len(self.rules[longest[start]][0]):
+                    longest[start] = index
+
+        if not longest:
+            return text
+        parts = []
+        end = 0
+        for start in sorted(longest):
+            if start < end:
+                continue
+            index = longest[start]
+            parts.append(text[end:start])
+            parts.append(self.rules[index][1])
+            end = start + len(self.rules[index][0])
+            self.matches[index] += 1
+        parts.append(text[end:])
+        return "".join(parts)
+
+
+def file_multi_replacement(filename: str, rules: list) -> list:
+    """
+    Replace several strings in a file, reading and writing it once.
+
+    Args:
+        filename (str): The path to the file to modify.
+        rules (list): The (search_str, replace_str) pairs.
+
+    Returns:
+        list: The number of replacements made per rule.
+
+    The file is streamed line by line into a temporary file next to it, which
+    then replaces the original in one rename. A failure leaves the original
+    file untouched instead of partially rewritten. Like the line-based
+    replacement it supersedes, a search string does not match across lines.
+    """
+    replacer = MultiPatternReplacer(rules)
+    directory = os.path.dirname(os.path.abspath(filename))
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", newline="", dir=directory, delete=False
+    ) as target:
+        try:
+            with open(filename, "r", encoding="utf-8", newline="") as source:
+                for line in source:
+                    target.write(replacer.replace(line))
+        except BaseException:
+            target.close()
+            os.unlink(target.name)
+            raise
+    shutil.copymode(filename, target.name)
+    os.replace(target.name, filename)
+    return replacer.matches
+
+
+def apply_file_replacements(root_dir: str, replacements: list, max_workers: int = None) -> list:
+    """
+    Apply 'fileReplacement' rules to the files below a directory.
+
+    Args:
+        root_dir (str): The directory the rule file names are relative to.
+        replacements (list): The rules, dictionaries with filename, search_str and replace_str.
+        max_workers (int, optional): Files processed in parallel. Defaults to the
+            ThreadPoolExecutor default.
+
+    Returns:
+        list: A report per rule in configuration order, the rule with a "matches" count added.
+
+    The rules are grouped by file and each file is rewritten once with all of
+    its rules, so K rules on one file cost one read and one write instead of K.
+    """
+    rules_by_file = {}
+    for position, item in enumerate(replacements):
+        rules_by_file.setdefault(item["filename"], []).append(position)
+
+    def process(filename: str) -> tuple:
+        positions = rules_by_file[filename]
+        rules = [(replacements[p]["search_str"], replacements[p]["replace_str"]) for p in positions]
+        return positions, file_multi_replacement(os.path.join(root_dir, filename), rules)
+
+    report = [{**item, "matches": 0} for item in replacements]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for positions, matches in executor.map(process, rules_by_file):
+            for position, count in zip(positions, matches):
+                report[position]["matches"] = count
+    return report
+
+
 def file_string_replacement(filename: str, search_str: str, replace_str: str) -> None:
     """
     Replace a string in a file.
@@ -236,13 +410,9 @@ def file_string_replacement(filename: str, search_str: str, replace_str: str) ->
 
     Returns:
         None
-    
+
     This function replaces all occurrences of search_str with replace_str
-    in the given filename. It uses fileinput.FileInput to open the file
-    in-place, iterates through each line, and prints it after replacing
-    the search string. This has the effect of modifying the file contents
-    directly.
+    in the given filename. To replace several strings in a file, use
+    file_multi_replacement, which reads and writes the file only once.
     """
-    with fileinput.FileInput(filename, inplace=True, backup="") as file:
-        for line in file:
-            print(line.replace(search_str, replace_str), end="")
+    file_multi_replacement(filename, [(search_str, replace_str)])
@@ -0,0 +1,43 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from constructs import Construct
+from aws_cdk import Stage
+from app.compute_stack import ComputeStack
+
+
+class PipelineRegionalStage(Stage):
+    """
+    Regional stage for the CDK pipeline.
+
+    This class represents a stage that deploys the application to a secondary
+    region. It only contains a ComputeStack, which generates questions with
+    Bedrock in the region and writes scores to the local replica of the high
+    score table. Cognito, the edge stack, the rooms and the leaderboard stay
+    in the primary region.
+
+    Attributes:
+        compute_stack (ComputeStack): The compute stack instance.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, config: dict, **kwargs) -> None:
+        """
+        Initialize the PipelineRegionalStage.
+
+        Args:
+            scope (Construct): The parent of this stage, usually an App or a Stage, but could be any construct.
+            construct_id (str): The identifier of this stage. Must be unique within this scope.
+            config (dict): Application configuration.
+            **kwargs: Other parameters passed to the base class.
+        """
+        super().__init__(scope, construct_id, **kwargs)
+
+        product_name = config['appInfrastructure']['productName']
+        stack_name = config['appInfrastructure']['cloudformation']['stackName']
+
+        self.compute_stack = ComputeStack(
+            self, f"{product_name}-compute",
+            stack_name=f"{stack_name}-compute",
+            config=config,
+            primary=False
+        )
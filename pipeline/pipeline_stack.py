@@ -14,10 +14,21 @@ from aws_cdk import (
     pipelines,
     aws_iam as iam,
     aws_s3 as s3,
+    aws_codebuild as codebuild,
     aws_codepipeline_actions as codepipeline_actions
 )
 from cdk_nag import NagSuppressions, AwsSolutionsChecks
 from pipeline.pipeline_app_stage import PipelineAppStage
+from pipeline.pipeline_regional_stage import PipelineRegionalStage
+from app.app_stack import get_deployment_regions
+from app.performance_checks import PerformanceChecks
+
+# Dependency caches kept between builds: the npm cache also holds the CDK CLI package
+BUILD_CACHE_PATHS = [
+    "/root/.npm/**/*",
+    "/root/.cache/pip/**/*"
+]
+NPM_OFFLINE_FLAGS = "--prefer-offline --no-audit --no-fund"
 
 
 class PipelineStack(Stack):
@@ -69,6 +80,40 @@ class PipelineStack(Stack):
 
         return self.source_bucket
 
+    def create_build_cache(self, config: dict) -> pipelines.CodeBuildOptions:
+        """
+        Creates the CodeBuild options that cache npm, pip and CDK CLI downloads.
+
+        Args:
+            config (dict): The application configuration.
+
+        Returns:
+            pipelines.CodeBuildOptions: The cache options, or None if the cache is disabled.
+
+        Raises:
+            ValueError: If the configured cache type is not s3, local or none.
+
+        The s3 cache is stored in the pipeline artifact bucket and is shared by
+        all builds. The local cache is kept on the build host and is only reused
+        when CodeBuild places the next build on the same host.
+        """
+        cache_type = config["deployInfrastructure"]["codepipeline"].get("buildCache", "s3")
+        if cache_type == "none":
+            return None
+        if cache_type == "s3":
+            cache = codebuild.Cache.bucket(self.pipeline_bucket, prefix="codebuild-cache")
+        elif cache_type == "local":
+            cache = codebuild.Cache.local(codebuild.LocalCacheMode.CUSTOM)
+        else:
+            raise ValueError(f"Unsupported buildCache '{cache_type}', expected s3, local or none")
+
+        return pipelines.CodeBuildOptions(
+            cache=cache,
+            partial_build_spec=codebuild.BuildSpec.from_object({
+                "cache": {"paths": BUILD_CACHE_PATHS}
+            })
+        )
+
     def create_pipeline(self, config: dict):
         """
         Creates the CodePipeline for building and deploying the application.
@@ -105,6 +150,8 @@ class PipelineStack(Stack):
             ]
         )
 
+        build_cache = self.create_build_cache(config=config)
+
         # Create a Pipeline
         source = pipelines.CodePipelineSource.s3(
             bucket=self.source_bucket,
@@ -112,6 +159,25 @@ class PipelineStack(Stack):
             action_name="Source",
             trigger=codepipeline_actions.S3Trigger.EVENTS
         )
+        # The frontend is built once while the CDK toolchain installs. The bundle
+        # does not contain deployment specific values, it reads them from the
+        # config.json published by the edge stack. The dependencies of bundled
+        # Lambda functions and esbuild are installed from their lock file before
+        # synth, so the functions are bundled locally instead of in Docker and
+        # every run bundles the same dependency versions.
+        synth_step = pipelines.ShellStep(
+            "Synth",
+            input=source,
+            commands=[
+                "python scripts/run_timed.py --parallel "
+                f'"webapp-build=cd www && npm ci {NPM_OFFLINE_FLAGS} && npm run build" '
+                f'"cdk-cli-install=npm install -g aws-cdk esbuild@0.21.5 {NPM_OFFLINE_FLAGS}" '
+                f'"lambda-deps=cd app/lambda_src/generate_questions_streaming && npm ci {NPM_OFFLINE_FLAGS}" '
+                '"pip-install=python -m pip install -r requirements.txt"',
+                f'python scripts/run_timed.py "cdk-synth=cdk synth {stack_name}"'
+            ]
+        )
+
         pipeline_name = config["deployInfrastructure"]["codepipeline"]["pipelineName"]
         deployment_pipeline = pipelines.CodePipeline(
             self,
@@ -122,6 +188,9 @@ class PipelineStack(Stack):
             docker_enabled_for_synth=True,
             enable_key_rotation=True,
             cross_account_keys=True,
+            # Update stacks directly instead of through change sets, stacks whose
+            # templates did not change finish as a no-op in a single action
+            use_change_sets=False,
             code_build_defaults=pipelines.CodeBuildOptions(
                 role_policy=[
                     iam.PolicyStatement(
@@ -135,16 +204,8 @@ class PipelineStack(Stack):
                 ],
                 build_environment={"privileged": True}
             ),
-            synth=pipelines.ShellStep(
-                "Synth",
-                input=source,
-                commands=[
-                    "cd www && npm ci && npm run build && cd ..",
-                    "npm install -g aws-cdk",
-                    "python -m pip install -r requirements.txt",
-                    f'cdk synth {stack_name}'
-                ]
-            )
+            synth_code_build_defaults=build_cache,
+            synth=synth_step
         )
 
         # Deployment Stage
@@ -157,32 +218,27 @@ class PipelineStack(Stack):
                     region=os.getenv("CDK_DEFAULT_REGION")
                 ),
                 config=config
-            ),
-            # Have to do this as a post step because cognito ids are synthed tokens in the asset otherwise
-            post=[
-                pipelines.CodeBuildStep(
-                    "Deploy-WebApp",
-                    input=source,
-                    commands=[
-                        "python scripts/update_amplify_config.py",
-                        "cat www/src/amplifyconfiguration.json",
-                        "cd www && npm ci && npm run build && cd ..",
-                        "npm install -g aws-cdk",
-                        "python -m pip install -r requirements.txt",
-                        f'cdk synth {config["appInfrastructure"]["productName"]}-s3-artifact-deployment',
-                        f'cdk deploy {config["appInfrastructure"]["productName"]}-s3-artifact-deployment --require-approval never'
-                    ],
-                    role_policy_statements=[
-                        iam.PolicyStatement(
-                            actions=["sts:AssumeRole"],
-                            resources=[f"arn:aws:iam::{Aws.ACCOUNT_ID}:role/cdk-*"],
-                            effect=iam.Effect.ALLOW
-                        )
-                    ]
-                )
-            ]
+            )
         )
 
+        # Secondary regions deploy after the primary region, which creates the
+        # table replicas they write to. The regions deploy in parallel.
+        secondary_regions = get_deployment_regions(config, os.getenv("CDK_DEFAULT_REGION"))[1:]
+        if secondary_regions:
+            regional_wave = deployment_pipeline.add_wave("Regional-Infrastructure")
+            for secondary_region in secondary_regions:
+                regional_wave.add_stage(
+                    PipelineRegionalStage(
+                        self,
+                        f"Deployment-{secondary_region}",
+                        env=Environment(
+                            account=os.getenv("CDK_DEFAULT_ACCOUNT"),
+                            region=secondary_region
+                        ),
+                        config=config
+                    )
+                )
+
         # Builds CodePipeline to allow for Suppression
         deployment_pipeline.build_pipeline()
 
@@ -238,3 +294,4 @@ class PipelineStack(Stack):
             Tags.of(self).add(key, value)
 
         Aspects.of(self).add(AwsSolutionsChecks())
+        Aspects.of(self).add(PerformanceChecks(config.get("performanceChecks")))
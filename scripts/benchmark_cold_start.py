@@ -0,0 +1,202 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import argparse
+import base64
+import json
+import re
+import statistics
+import time
+import uuid
+import boto3
+
+DEFAULT_FUNCTION_NAME = "bedrock-generate-questions-streaming"
+# Smallest request the function accepts, one question keeps the Bedrock cost of a run low
+DEFAULT_PAYLOAD = {"topic": "Geography", "difficulty": "easy", "number_questions": 1, "num_silly": 0}
+REPORT_PATTERN = re.compile(r"REPORT .*?Duration: ([\d.]+) ms.*?Max Memory Used: (\d+) MB(?:.*?Init Duration: ([\d.]+) ms)?")
+
+
+def force_cold_start(client, function_name: str, environment: dict) -> None:
+    """
+    Change an environment variable of the function so its next invocation starts a new execution environment.
+
+    Args:
+        client (boto3.client): The Lambda client.
+        function_name (str): The name of the function.
+        environment (dict): The environment variables of the function.
+
+    Returns:
+        None
+    """
+    client.update_function_configuration(
+        FunctionName=function_name,
+        Environment={"Variables": {**environment, "COLD_START_BENCHMARK": uuid.uuid4().hex}}
+    )
+    client.get_waiter("function_updated_v2").wait(FunctionName=function_name)
+
+
+def invoke(client, function_name: str, payload: dict) -> dict:
+    """
+    Invoke the function and read the timings from the REPORT line of its log tail.
+
+    Args:
+        client (boto3.client): The Lambda client.
+        function_name (str): The name of the function.
+        payload (dict): The event sent to the function.
+
+    Returns:
+        dict: Init duration, duration and memory used, and the client side round trip in milliseconds.
+    """
+    start = time.monotonic()
+    response = client.invoke(FunctionName=function_name, Payload=json.dumps(payload), LogType="Tail")
+    response["Payload"].read()
+    round_trip = (time.monotonic() - start) * 1000
+    log_tail = base64.b64decode(response.get("LogResult", "")).decode("utf-8", errors="replace")
+    match = REPORT_PATTERN.search(log_tail)
+    if not match:
+        raise RuntimeError(f"No REPORT line in the log tail of {function_name}")
+    duration, memory, init_duration = match.groups()
+    return {
+        "initDuration": float(init_duration) if init_duration else None,
+        "duration": float(duration),
+        "maxMemoryUsed": int(memory),
+        "roundTrip": round_trip
+    }
+
+
+def summarize(values: list) -> dict:
+    """
+    Summarize a list of durations.
+
+    Args:
+        values (list): Durations in milliseconds, None values are ignored.
+
+    Returns:
+        dict: Count, mean, p50, p90 and max, or an empty dict without values.
+    """
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return {}
+    return {
+        "count": len(values),
+        "mean": statistics.fmean(values),
+        "p50": values[len(values) // 2],
+        "p90": values[min(len(values) - 1, int(len(values) * 0.9))],
+        "max": values[-1]
+    }
+
+
+def run(args) -> None:
+    """
+    Measure cold starts of the function and save the samples.
+
+    Args:
+        args (argparse.Namespace): The parsed "run" arguments.
+
+    Returns:
+        None
+    """
+    client = boto3.Session(profile_name=args.profile, region_name=args.region).client("lambda")
+    configuration = client.get_function_configuration(FunctionName=args.function_name)
+    environment = configuration.get("Environment", {}).get("Variables", {})
+    samples = []
+    try:
+        for iteration in range(args.iterations):
+            force_cold_start(client, args.function_name, environment)
+            sample = invoke(client, args.function_name, args.payload)
+            samples.append(sample)
+            print(f"[{iteration + 1}/{args.iterations}] init {sample['initDuration']} ms, "
+                  f"duration {sample['duration']:.0f} ms, memory {sample['maxMemoryUsed']} MB")
+    finally:
+        # Leave the function with its original environment
+        client.update_function_configuration(FunctionName=args.function_name, Environment={"Variables": environment})
+
+    result = {
+        "label": args.label,
+        "functionName": args.function_name,
+        "architectures": configuration.get("Architectures"),
+        "codeSize": configuration.get("CodeSize"),
+        "memorySize": configuration.get("MemorySize"),
+        "initDuration": summarize([sample["initDuration"] for sample in samples]),
+        "duration": summarize([sample["duration"] for sample in samples]),
+        "samples": samples
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(result, file, indent=2)
+    print(f"Saved {len(samples)} samples to {args.output}")
+
+
+def compare(args) -> None:
+    """
+    Print the cold start summaries of two runs side by side.
+
+    Args:
+        args (argparse.Namespace): The parsed "compare" arguments.
+
+    Returns:
+        None
+    """
+    runs = []
+    for path in (args.before, args.after):
+        with open(path, "r", encoding="utf-8") as file:
+            runs.append(json.load(file))
+    before, after = runs
+
+    def row(name: str, left, right, unit: str = "") -> None:
+        change = f"{(right - left) / left * 100:+.1f}%" if isinstance(left, (int, float)) and left else ""
+        print(f"{name:<22} {str(left) + unit:>14} {str(right) + unit:>14} {change:>9}")
+
+    print(f"{'':<22} {before['label']:>14} {after['label']:>14} {'change':>9}")
+    print(f"{'architecture':<22} {','.join(before['architectures'] or []):>14} {','.join(after['architectures'] or []):>14}")
+    row("code size", before["codeSize"], after["codeSize"], " B")
+    for metric in ("initDuration", "duration"):
+        for statistic in ("p50", "p90", "mean"):
+            left = before[metric].get(statistic)
+            right = after[metric].get(statistic)
+            if left is not None and right is not None:
+                row(f"{metric} {statistic}", round(left, 1), round(right, 1), " ms")
+
+
+def main() -> None:
+    """
+    Benchmark the cold start of the question generation function.
+
+    Each iteration changes an environment variable to force a new execution
+    environment, invokes the function, and reads the Init Duration from the
+    REPORT line of the log. Save a run before and after a change, then
+    compare them:
+
+        python scripts/benchmark_cold_start.py run --label before --output before.json
+        python scripts/benchmark_cold_start.py run --label after --output after.json
+        python scripts/benchmark_cold_start.py compare before.json after.json
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Benchmark Lambda cold starts.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Measure cold starts and save the samples")
+    run_parser.add_argument("--function-name", default=DEFAULT_FUNCTION_NAME)
+    run_parser.add_argument("--iterations", type=int, default=10)
+    run_parser.add_argument("--label", default="run", help="Name of the run in the comparison")
+    run_parser.add_argument("--output", default="cold_start.json", help="File the samples are saved to")
+    run_parser.add_argument("--payload", type=json.loads, default=DEFAULT_PAYLOAD, help="Event as JSON")
+    run_parser.add_argument("--profile", help="AWS profile to use")
+    run_parser.add_argument("--region", help="AWS region of the function")
+
+    compare_parser = commands.add_parser("compare", help="Compare two saved runs")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        if args.iterations < 1:
+            parser.error("--iterations must be at least 1")
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import argparse
+import math
+from collections import defaultdict
+import yaml
+from event_model import (
+    ARRIVAL_CURVES,
+    PROMPT_INPUT_TOKENS,
+    ROUND_SECONDS,
+    TRANSITION_SECONDS,
+    arrival_times,
+    load_game
+)
+
+# Throughput of a new on-demand table before it scales, warm throughput is needed above it
+ON_DEMAND_READ_UNITS = 12000
+ON_DEMAND_WRITE_UNITS = 4000
+# Concurrency the account must keep unreserved
+UNRESERVED_CONCURRENCY = 100
+# Scores one writer invocation writes per second, four BatchWriteItem calls of 25
+SCORES_PER_WRITER_SECOND = 100
+# Leaderboard queries per cache period, one per CloudFront regional edge cache that misses
+LEADERBOARD_MISSES_PER_PERIOD = 13
+# Read units of a leaderboard query, eventually consistent and below 4 KB
+LEADERBOARD_QUERY_UNITS = 0.5
+# Duration of a gen-ai-trivia-submit-score invocation, it only queues the score
+SUBMIT_SECONDS = 0.1
+# Leaderboard executions, CloudFront only forwards cache misses
+LEADERBOARD_CONCURRENCY = 10
+
+
+def plan_event(game, arrivals: list, ttft_seconds: float, output_tokens_per_second: float) -> dict:
+    """
+    Compute the per-second demand of an event.
+
+    Args:
+        game (GameDefinition): The game definition.
+        arrivals (list): The arrival time of every player in seconds.
+        ttft_seconds (float): Time to first token of a generation request.
+        output_tokens_per_second (float): Output speed of one generation stream.
+
+    Returns:
+        dict: Per-second series of active players, streams, reserved and output tokens,
+            generation requests and score writes.
+
+    Every player plays the whole game: a transition, then the round, for every
+    round. The generation of a round starts with the round and streams its
+    output tokens after the time to first token. Bedrock counts the input
+    tokens and max_tokens of a request against the tokens per minute quota
+    when the request starts.
+    """
+    series = defaultdict(lambda: defaultdict(float))
+    game_seconds = game.game_seconds()
+    for arrival in arrivals:
+        start = int(arrival)
+        for second in range(start, start + int(game_seconds)):
+            series["players"][second] += 1
+        offset = arrival
+        for round_ in game.rounds:
+            offset += TRANSITION_SECONDS
+            requested = game.questions_to_generate(round_)
+            max_tokens = game.token_budget(requested)
+            output_tokens = min(game.output_tokens(round_), max_tokens)
+            stream_seconds = ttft_seconds + output_tokens / output_tokens_per_second
+            series["requests"][int(offset)] += 1
+            series["reservedTokens"][int(offset)] += PROMPT_INPUT_TOKENS + max_tokens
+            for second in range(int(offset), int(offset + stream_seconds) + 1):
+                series["streams"][second] += 1
+            first_output = offset + ttft_seconds
+            for second in range(int(first_output), int(offset + stream_seconds) + 1):
+                series["outputTokens"][second] += output_tokens_per_second
+            offset += ROUND_SECONDS
+        series["scoreWrites"][int(arrival + game_seconds)] += 1
+    return series
+
+
+def per_minute(values: dict) -> dict:
+    """
+    Sum a per-second series into minutes.
+
+    Args:
+        values (dict): Values per second.
+
+    Returns:
+        dict: Values per minute.
+    """
+    minutes = defaultdict(float)
+    for second, value in values.items():
+        minutes[second // 60] += value
+    return minutes
+
+
+def recommend(game, series: dict, args) -> dict:
+    """
+    Turn the demand of an event into quotas and deploy config settings.
+
+    Args:
+        game (GameDefinition): The game definition.
+        series (dict): The per-second demand of plan_event.
+        args (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        dict: The peaks, the quota requests and the deploy config settings.
+    """
+    headroom = args.headroom
+
+    def peak(name: str) -> float:
+        return max(series[name].values(), default=0)
+
+    peak_streams = peak("streams")
+    peak_tpm = max(per_minute(series["reservedTokens"]).values(), default=0)
+    peak_rpm = max(per_minute(series["requests"]).values(), default=0)
+    peak_writes = peak("scoreWrites")
+    # Scores wait in the queue, so the writers only need to keep up with the average of the busiest minute
+    busy_minute_writes = max(per_minute(series["scoreWrites"]).values(), default=0) / 60
+    writer_concurrency = min(1000, max(2, math.ceil(busy_minute_writes * headroom / SCORES_PER_WRITER_SECOND)))
+    # Each written score is one write unit on the table and one on sortedScores
+    write_units = max(5, math.ceil(busy_minute_writes * headroom))
+    read_units = max(5, math.ceil(LEADERBOARD_MISSES_PER_PERIOD * LEADERBOARD_QUERY_UNITS
+                                  / game.leaderboard_cache_seconds * headroom))
+
+    generation_concurrency = math.ceil(peak_streams * headroom)
+    other_concurrency = writer_concurrency + LEADERBOARD_CONCURRENCY + math.ceil(peak_writes * SUBMIT_SECONDS)
+
+    capacity = {"billingMode": game.capacity.get("billingMode", "PAY_PER_REQUEST")}
+    if capacity["billingMode"] == "PROVISIONED":
+        throughput = {
+            "read": {"minCapacity": read_units, "maxCapacity": read_units * 4},
+            "write": {"minCapacity": write_units, "maxCapacity": write_units * 4}
+        }
+        capacity["table"] = throughput
+        capacity["globalSecondaryIndexes"] = {"sortedScores": throughput}
+    elif write_units > ON_DEMAND_WRITE_UNITS:
+        warm = {"readUnitsPerSecond": ON_DEMAND_READ_UNITS, "writeUnitsPerSecond": write_units}
+        capacity["table"] = {"warmThroughput": warm}
+        capacity["globalSecondaryIndexes"] = {"sortedScores": {"warmThroughput": warm}}
+
+    return {
+        "peaks": {
+            "concurrentPlayers": int(peak("players")),
+            "concurrentStreams": int(peak_streams),
+            "reservedTokensPerMinute": int(peak_tpm),
+            "outputTokensPerMinute": int(max(per_minute(series["outputTokens"]).values(), default=0)),
+            "generationRequestsPerMinute": int(peak_rpm),
+            "scoresPerSecond": int(peak_writes),
+            "writeUnitsPerSecond": write_units,
+            "readUnitsPerSecond": read_units
+        },
+        "quotaRequests": {
+            "bedrockTokensPerMinute": math.ceil(peak_tpm * headroom),
+            "bedrockRequestsPerMinute": math.ceil(peak_rpm * headroom),
+            "lambdaConcurrentExecutions": generation_concurrency + other_concurrency + UNRESERVED_CONCURRENCY
+        },
+        "deployConfig": {
+            "appInfrastructure": {
+                "questionGeneration": {"reservedConcurrency": generation_concurrency},
+                "scoreIngestion": {"maxConcurrency": writer_concurrency},
+                "leaderboard": {"reservedConcurrency": LEADERBOARD_CONCURRENCY},
+                "dynamoDb": {"capacity": capacity}
+            }
+        }
+    }
+
+
+def find_players_for_peak(game, args) -> int:
+    """
+    Find the number of players whose arrivals reach the expected peak of concurrent players.
+
+    Args:
+        game (GameDefinition): The game definition.
+        args (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        int: The number of players of the event.
+    """
+    low, high = args.peak_players, args.peak_players * max(1, math.ceil(args.arrival_seconds / game.game_seconds()) + 1)
+    while low < high:
+        middle = (low + high) // 2
+        arrivals = arrival_times(args.arrival_curve, middle, args.arrival_seconds)
+        concurrent = plan_event(game, arrivals, args.ttft, args.output_tokens_per_second)["players"]
+        if max(concurrent.values()) >= args.peak_players:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def main() -> None:
+    """
+    Plan Bedrock, Lambda and DynamoDB capacity for an event.
+
+    Reads the rounds of www/src/data.json and the generation, ingestion and
+    table settings of configs/deploy-config.yaml. From the expected players
+    and their arrival curve, it computes the per-minute token demand, the
+    concurrent generation streams and the score writes, and prints:
+    - the demand per minute of the event
+    - the quota increases to request before the event
+    - the deploy config settings to apply, as YAML
+
+        python scripts/capacity_planner.py --peak-players 2000 --arrival-seconds 600 --arrival-curve front
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Plan the capacity of an event.")
+    players = parser.add_mutually_exclusive_group(required=True)
+    players.add_argument("--players", type=int, help="Players of the event, each plays one game")
+    players.add_argument("--peak-players", type=int, help="Expected peak of concurrent players")
+    parser.add_argument("--arrival-seconds", type=float, default=600, help="Length of the arrival window")
+    parser.add_argument("--arrival-curve", choices=ARRIVAL_CURVES, default="linear")
+    parser.add_argument("--ttft", type=float, default=1.0, help="Time to first token in seconds")
+    parser.add_argument("--output-tokens-per-second", type=float, default=60, help="Output speed of one stream")
+    parser.add_argument("--headroom", type=float, default=1.3, help="Factor applied to the peaks")
+    parser.add_argument("--data", default="www/src/data.json")
+    parser.add_argument("--config", default="configs/deploy-config.yaml")
+    parser.add_argument("--output", help="Also save the deploy config settings as YAML to this file")
+    args = parser.parse_args()
+    if (args.players or args.peak_players) < 1 or args.headroom < 1:
+        parser.error("the number of players must be at least 1 and --headroom at least 1")
+
+    game = load_game(args.data, args.config)
+    total_players = args.players or find_players_for_peak(game, args)
+    arrivals = arrival_times(args.arrival_curve, total_players, args.arrival_seconds)
+    series = plan_event(game, arrivals, args.ttft, args.output_tokens_per_second)
+    plan = recommend(game, series, args)
+
+    print(f"{total_players} players arriving over {args.arrival_seconds:.0f} s ({args.arrival_curve}), "
+          f"{game.game_seconds():.0f} s per game\n")
+    print(f"{'minute':>6} {'players':>8} {'streams':>8} {'requests':>9} {'reserved TPM':>13} {'output TPM':>11} {'scores':>7}")
+    streams_per_minute = defaultdict(float)
+    players_per_minute = defaultdict(float)
+    for second, value in series["streams"].items():
+        streams_per_minute[second // 60] = max(streams_per_minute[second // 60], value)
+    for second, value in series["players"].items():
+        players_per_minute[second // 60] = max(players_per_minute[second // 60], value)
+    requests = per_minute(series["requests"])
+    reserved = per_minute(series["reservedTokens"])
+    output = per_minute(series["outputTokens"])
+    scores = per_minute(series["scoreWrites"])
+    for minute in range(int(max(players_per_minute, default=0)) + 1):
+        print(f"{minute:>6} {players_per_minute[minute]:>8.0f} {streams_per_minute[minute]:>8.0f} "
+              f"{requests[minute]:>9.0f} {reserved[minute]:>13.0f} {output[minute]:>11.0f} {scores[minute]:>7.0f}")
+
+    print("\nPeaks:")
+    for name, value in plan["peaks"].items():
+        print(f"  {name:<32} {value}")
+    print(f"\nQuota requests (peak x {args.headroom}):")
+    for name, value in plan["quotaRequests"].items():
+        print(f"  {name:<32} {value}")
+    print("\nDeploy config settings (configs/deploy-config.yaml):")
+    print(yaml.safe_dump(plan["deployConfig"], sort_keys=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            yaml.safe_dump(plan["deployConfig"], file, sort_keys=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import argparse
+import boto3
+
+
+def copy_items(dynamodb, source: str, target: str) -> int:
+    """
+    Copy every item of a table into another table.
+
+    Args:
+        dynamodb (boto3.resource): The DynamoDB resource.
+        source (str): The table to read.
+        target (str): The table to write, items with the same key are replaced.
+
+    Returns:
+        int: The number of items copied.
+    """
+    count = 0
+    scan_args = {}
+    with dynamodb.Table(target).batch_writer() as batch:
+        while True:
+            page = dynamodb.Table(source).scan(**scan_args)
+            for item in page["Items"]:
+                batch.put_item(Item=item)
+                count += 1
+            if "LastEvaluatedKey" not in page:
+                return count
+            scan_args["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+
+def main() -> None:
+    """
+    Copy the items of a DynamoDB table into another table.
+
+    Used to move the high scores of a deployment created before the layered
+    stacks into the table of the data stack, from a restored backup:
+
+        python scripts/copy_table.py --source highScoreSorted-restored --target highScoreSorted
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Copy the items of a DynamoDB table into another table.")
+    parser.add_argument("--source", required=True, help="Table to read")
+    parser.add_argument("--target", required=True, help="Table to write")
+    parser.add_argument("--profile", help="AWS profile to use")
+    parser.add_argument("--region", help="AWS region of both tables")
+    args = parser.parse_args()
+
+    session = boto3.Session(profile_name=args.profile, region_name=args.region)
+    count = copy_items(session.resource("dynamodb"), args.source, args.target)
+    print(f"Copied {count} items from {args.source} to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+import math
+from dataclasses import dataclass, field
+import yaml
+
+DATA_PATH = "www/src/data.json"
+CONFIG_PATH = "configs/deploy-config.yaml"
+
+# Game behavior that is not configured anywhere, taken from the web application
+ROUND_SECONDS = 60  # Timer of a round in Questions.vue
+FEEDBACK_SECONDS = 1  # Answer colors are shown for a second before the next question
+TRANSITION_SECONDS = 8  # Typing out the round messages and clicking "Start Round"
+ANSWER_SECONDS_MEDIAN = 4  # Time a player takes to pick an answer
+PROMPT_INPUT_TOKENS = 350  # System prompt, request and earlier questions of a round
+
+# Arrival curves: the share of all players that has arrived at a point of the arrival window
+ARRIVAL_CURVES = ("linear", "burst", "front", "waves")
+
+
+@dataclass
+class Round:
+    """
+    One round of the game.
+
+    Attributes:
+        difficulty (str): The difficulty sent to the question generation function.
+        questions (int): The number of questions of the round.
+    """
+    difficulty: str
+    questions: int
+
+
+@dataclass
+class GameDefinition:
+    """
+    The game and the deployment settings that drive its load.
+
+    Attributes:
+        topics (list): The topics offered on the home page.
+        rounds (list): The rounds of a game.
+        oversample_ratio (float): Extra questions requested per round.
+        tokens_per_question (float): Output tokens of one generated question.
+        max_tokens_limit (int): Upper bound of max_tokens of one model request.
+        leaderboard_cache_seconds (int): CloudFront cache time of the leaderboard.
+        number_of_high_scores (int): Items read by a leaderboard query.
+        ingestion (dict): The "scoreIngestion" section of the deploy config.
+        capacity (dict): The "capacity" section of the high score table.
+        table_name (str): The name of the high score table.
+    """
+    topics: list
+    rounds: list
+    oversample_ratio: float = 0.2
+    tokens_per_question: float = 100
+    max_tokens_limit: int = 4096
+    leaderboard_cache_seconds: int = 5
+    number_of_high_scores: int = 10
+    ingestion: dict = field(default_factory=dict)
+    capacity: dict = field(default_factory=dict)
+    table_name: str = "highScoreSorted"
+
+    def questions_to_generate(self, round_: Round) -> int:
+        """
+        Get the number of questions requested from the model for a round, including the oversample.
+
+        Args:
+            round_ (Round): The round.
+
+        Returns:
+            int: The number of questions requested.
+        """
+        return round_.questions + math.ceil(round_.questions * self.oversample_ratio)
+
+    def token_budget(self, questions: int) -> int:
+        """
+        Get max_tokens of a request for a number of questions, as computed by the generation function.
+
+        Args:
+            questions (int): The number of questions of the request.
+
+        Returns:
+            int: The max_tokens of the request.
+        """
+        return min(self.max_tokens_limit, math.ceil(64 + questions * self.tokens_per_question * 1.25))
+
+    def output_tokens(self, round_: Round) -> int:
+        """
+        Get the expected output tokens of the generation of a round.
+
+        Args:
+            round_ (Round): The round.
+
+        Returns:
+            int: The expected output tokens.
+        """
+        return math.ceil(self.questions_to_generate(round_) * self.tokens_per_question)
+
+    def game_seconds(self) -> float:
+        """
+        Get the expected length of a game, from the home page to the final score.
+
+        Returns:
+            float: The length in seconds.
+        """
+        return len(self.rounds) * (TRANSITION_SECONDS + ROUND_SECONDS)
+
+
+def load_game(data_path: str = DATA_PATH, config_path: str = CONFIG_PATH) -> GameDefinition:
+    """
+    Load the game definition from the web application data and the deploy config.
+
+    Args:
+        data_path (str, optional): Path of www/src/data.json.
+        config_path (str, optional): Path of configs/deploy-config.yaml.
+
+    Returns:
+        GameDefinition: The game definition.
+    """
+    with open(data_path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    with open(config_path, "r", encoding="utf-8") as file:
+        config = yaml.safe_load(file)
+
+    app = config["appInfrastructure"]
+    generation = app.get("questionGeneration", {})
+    leaderboard = app.get("leaderboard", {})
+    return GameDefinition(
+        topics=data["topics"],
+        rounds=[Round(item["difficulty"], item["numberOfQuestions"]) for item in data["rounds"]],
+        oversample_ratio=generation.get("oversampleRatio", 0.2),
+        tokens_per_question=generation.get("tokensPerQuestion", 100),
+        max_tokens_limit=generation.get("maxTokensLimit", 4096),
+        leaderboard_cache_seconds=leaderboard.get("sMaxAgeSeconds", 5),
+        number_of_high_scores=leaderboard.get("numberOfHighScores", 10),
+        ingestion=app.get("scoreIngestion", {}),
+        capacity=app["dynamoDb"].get("capacity", {}),
+        table_name=app["dynamoDb"]["tableName"]
+    )
+
+
+def arrival_share(curve: str, progress: float, waves: int = 4) -> float:
+    """
+    Get the share of the players that has arrived at a point of the arrival window.
+
+    Args:
+        curve (str): The arrival curve, one of ARRIVAL_CURVES:
+            - linear: players arrive at a constant rate
+            - burst: all players arrive at the start
+            - front: most players arrive early, the rate falls off linearly
+            - waves: players arrive in equal groups, for example after announcements
+        progress (float): The point of the arrival window, from 0 to 1.
+        waves (int, optional): The number of groups of the waves curve. Defaults to 4.
+
+    Returns:
+        float: The share of the players that has arrived, from 0 to 1.
+
+    Raises:
+        ValueError: If the curve is unknown.
+    """
+    progress = min(max(progress, 0.0), 1.0)
+    if curve == "linear":
+        return progress
+    if curve == "burst":
+        return 1.0
+    if curve == "front":
+        return 1 - (1 - progress) ** 2
+    if curve == "waves":
+        return min(1.0, (math.floor(progress * waves) + 1) / waves)
+    raise ValueError(f"Unknown arrival curve '{curve}', expected one of {', '.join(ARRIVAL_CURVES)}")
+
+
+def arrival_times(curve: str, players: int, window_seconds: float) -> list:
+    """
+    Get the arrival time of every player.
+
+    Args:
+        curve (str): The arrival curve, one of ARRIVAL_CURVES.
+        players (int): The number of players.
+        window_seconds (float): The length of the arrival window.
+
+    Returns:
+        list: The arrival times in seconds from the start of the event, in ascending order.
+    """
+    times = []
+    for player in range(players):
+        target = (player + 0.5) / players
+        low, high = 0.0, 1.0
+        # The smallest point of the window where the share of arrived players reaches the target
+        for _ in range(30):
+            middle = (low + high) / 2
+            if arrival_share(curve, middle) >= target:
+                high = middle
+            else:
+                low = middle
+        times.append(high * window_seconds if arrival_share(curve, 0.0) < target else 0.0)
+    return times
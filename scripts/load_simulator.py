@@ -0,0 +1,545 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import argparse
+import asyncio
+import bisect
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from event_model import (
+    ANSWER_SECONDS_MEDIAN,
+    ARRIVAL_CURVES,
+    FEEDBACK_SECONDS,
+    PROMPT_INPUT_TOKENS,
+    ROUND_SECONDS,
+    TRANSITION_SECONDS,
+    arrival_times,
+    load_game
+)
+
+# Throughput a single partition, and so a single partition key, can serve per second
+PARTITION_READ_UNITS = 3000
+PARTITION_WRITE_UNITS = 1000
+# Throughput a new on-demand table can serve right away, before it scales
+ON_DEMAND_READ_UNITS = 12000
+ON_DEMAND_WRITE_UNITS = 4000
+# The AWS SDK retries throttled requests this many times with exponential backoff
+SDK_MAX_ATTEMPTS = 3
+SDK_BASE_BACKOFF_SECONDS = 0.05
+BATCH_WRITE_SIZE = 25
+SCORE_INDEX_KEY = "sortID=1"
+
+
+class Throttled(Exception):
+    """Raised by a stand-in when a request exceeds a capacity limit."""
+
+    def __init__(self, resource: str):
+        super().__init__(f"{resource} throttled")
+        self.resource = resource
+
+
+class SimClock:
+    """
+    Simulated time running faster than real time.
+
+    Attributes:
+        scale (float): Real seconds per simulated second, 0.05 runs the event 20 times faster.
+    """
+
+    def __init__(self, scale: float):
+        self.scale = scale
+        self.started = time.monotonic()
+
+    def now(self) -> float:
+        """Simulated seconds since the start of the event."""
+        return (time.monotonic() - self.started) / self.scale
+
+    async def sleep(self, seconds: float) -> None:
+        """Sleep for a number of simulated seconds."""
+        await asyncio.sleep(max(seconds, 0) * self.scale)
+
+
+class TokenBucket:
+    """A capacity limit that refills continuously up to one second of throughput."""
+
+    def __init__(self, clock: SimClock, rate: float, burst: float = None):
+        self.clock = clock
+        self.rate = rate
+        self.capacity = burst if burst is not None else rate
+        self.tokens = self.capacity
+        self.updated = clock.now()
+
+    def try_consume(self, units: float) -> bool:
+        """Take units from the bucket, returns False without taking any when they are not available."""
+        now = self.clock.now()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < units:
+            return False
+        self.tokens -= units
+        return True
+
+
+class Metrics:
+    """Latencies per stage, throttles per resource and accesses per partition key and second."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.throttles = Counter()
+        self.errors = Counter()
+        self.key_accesses = Counter()
+        self.gauges = Counter()
+        self.peaks = Counter()
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.latencies[stage].append(seconds * 1000)
+
+    def access(self, key: str, second: float, units: float) -> None:
+        self.key_accesses[(key, int(second))] += units
+
+    def change(self, gauge: str, delta: int) -> None:
+        self.gauges[gauge] += delta
+        self.peaks[gauge] = max(self.peaks[gauge], self.gauges[gauge])
+
+
+async def with_retries(clock: SimClock, metrics: Metrics, operation, rng: random.Random):
+    """
+    Run an operation, retrying throttles like the AWS SDK does.
+
+    Args:
+        clock (SimClock): The simulated clock.
+        metrics (Metrics): Collects the throttles.
+        operation (Callable): Coroutine function running the request.
+        rng (random.Random): Random numbers for the backoff jitter.
+
+    Returns:
+        The result of the operation.
+
+    Raises:
+        Throttled: If the last attempt is throttled as well.
+    """
+    for attempt in range(SDK_MAX_ATTEMPTS):
+        try:
+            return await operation()
+        except Throttled as error:
+            metrics.throttles[error.resource] += 1
+            if attempt == SDK_MAX_ATTEMPTS - 1:
+                raise
+            await clock.sleep(rng.uniform(0, SDK_BASE_BACKOFF_SECONDS * 2 ** attempt))
+    return None
+
+
+class LocalHighScoreTable:
+    """
+    In-memory stand-in for the high score table created by create_dynamodb.
+
+    Items are keyed by "id" and "score". Every item also has sortID = 1, so the
+    sortedScores index keeps all scores under one partition key sorted by
+    score. Capacity is modeled per table, per base table partition and per
+    index partition key, with the limits of the configured billing mode.
+    """
+
+    def __init__(self, clock: SimClock, metrics: Metrics, capacity: dict, rng: random.Random):
+        self.clock = clock
+        self.metrics = metrics
+        self.rng = rng
+        self.items = {}
+        self.sorted_scores = []
+
+        def limits(config: dict) -> tuple:
+            if capacity.get("billingMode", "PAY_PER_REQUEST").upper() == "PROVISIONED":
+                return (config.get("read", {}).get("minCapacity", 5), config.get("write", {}).get("minCapacity", 5))
+            warm = config.get("warmThroughput") or {}
+            return (warm.get("readUnitsPerSecond", ON_DEMAND_READ_UNITS),
+                    warm.get("writeUnitsPerSecond", ON_DEMAND_WRITE_UNITS))
+
+        table_read, table_write = limits(capacity.get("table", {}))
+        index_read, index_write = limits(capacity.get("globalSecondaryIndexes", {}).get("sortedScores", {}))
+        self.partitions = max(1, math.ceil(max(table_read / PARTITION_READ_UNITS, table_write / PARTITION_WRITE_UNITS)))
+        self.table_writes = TokenBucket(clock, table_write)
+        self.index_reads = TokenBucket(clock, index_read)
+        self.index_writes = TokenBucket(clock, index_write)
+        self.partition_writes = [TokenBucket(clock, PARTITION_WRITE_UNITS) for _ in range(self.partitions)]
+        self.index_key_reads = TokenBucket(clock, PARTITION_READ_UNITS)
+        self.index_key_writes = TokenBucket(clock, PARTITION_WRITE_UNITS)
+
+    async def _latency(self) -> None:
+        await self.clock.sleep(self.rng.lognormvariate(math.log(0.006), 0.4))
+
+    def _write(self, item: dict) -> None:
+        partition = hash(item["id"]) % self.partitions
+        now = self.clock.now()
+        self.metrics.access(f"table id partition {partition}", now, 1)
+        self.metrics.access(f"sortedScores {SCORE_INDEX_KEY}", now, 1)
+        # A throttled index write throttles the write to the base table as well
+        if not self.index_key_writes.try_consume(1):
+            raise Throttled(f"sortedScores {SCORE_INDEX_KEY} write")
+        if not self.index_writes.try_consume(1):
+            raise Throttled("sortedScores write")
+        if not self.partition_writes[partition].try_consume(1):
+            raise Throttled("table partition write")
+        if not self.table_writes.try_consume(1):
+            raise Throttled("table write")
+        self.items[(item["id"], item["score"])] = item
+        bisect.insort(self.sorted_scores, (-item["score"], item["id"]))
+
+    async def put_item(self, item: dict) -> None:
+        """PutItem of one score."""
+        await self._latency()
+        self._write(item)
+
+    async def batch_write_item(self, items: list) -> list:
+        """BatchWriteItem of up to 25 scores, returns the unprocessed items."""
+        await self._latency()
+        unprocessed = []
+        for item in items:
+            try:
+                self._write(item)
+            except Throttled as error:
+                self.metrics.throttles[error.resource] += 1
+                unprocessed.append(item)
+        return unprocessed
+
+    async def query_top_scores(self, limit: int) -> list:
+        """Query of the sortedScores index for the top scores, eventually consistent."""
+        await self._latency()
+        units = 0.5 * max(1, math.ceil(limit * 200 / 4096))
+        self.metrics.access(f"sortedScores {SCORE_INDEX_KEY}", self.clock.now(), units)
+        if not self.index_key_reads.try_consume(units):
+            raise Throttled(f"sortedScores {SCORE_INDEX_KEY} read")
+        if not self.index_reads.try_consume(units):
+            raise Throttled("sortedScores read")
+        return [self.items[(item_id, -score)] for score, item_id in self.sorted_scores[:limit]]
+
+
+class FakeBedrock:
+    """
+    Stand-in for a streamed Bedrock model response.
+
+    Requests are limited by concurrent streams and tokens per minute. The
+    tokens of a request count against the quota when it starts, input tokens
+    plus max_tokens, as Bedrock reserves them.
+    """
+
+    def __init__(self, clock: SimClock, metrics: Metrics, rng: random.Random, args):
+        self.clock = clock
+        self.metrics = metrics
+        self.rng = rng
+        self.args = args
+        self.tokens_per_minute = TokenBucket(clock, args.bedrock_tpm / 60, args.bedrock_tpm)
+        self.active = 0
+
+    async def stream(self, input_tokens: int, max_tokens: int, output_tokens: int):
+        """Yields the number of output tokens of each chunk of the response."""
+        if self.active >= self.args.bedrock_max_streams:
+            raise Throttled("bedrock concurrent streams")
+        if not self.tokens_per_minute.try_consume(input_tokens + max_tokens):
+            raise Throttled("bedrock tokens per minute")
+        self.active += 1
+        self.metrics.change("bedrock streams", 1)
+        remaining = min(output_tokens, max_tokens)
+        try:
+            await self.clock.sleep(self.rng.lognormvariate(math.log(self.args.ttft_median), 0.6))
+            remaining = min(output_tokens, max_tokens)
+            while remaining > 0:
+                chunk = min(remaining, 20)
+                await self.clock.sleep(chunk / self.args.output_tokens_per_second)
+                remaining -= chunk
+                yield chunk
+        finally:
+            # The reserved max_tokens that were not generated return to the quota
+            self.tokens_per_minute.tokens = min(self.tokens_per_minute.capacity,
+                                                self.tokens_per_minute.tokens + max_tokens - min(output_tokens, max_tokens) + remaining)
+            self.active -= 1
+            self.metrics.change("bedrock streams", -1)
+
+
+class Simulation:
+    """
+    One event: players arrive along the arrival curve and each plays a full game.
+
+    A game authenticates, plays every round of www/src/data.json with its
+    questions streamed from the fake Bedrock, then submits the score and loads
+    the leaderboard. Scores go through the queue and the batch writer, or
+    directly to the table with --direct-writes.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.game = load_game(args.data, args.config)
+        self.clock = SimClock(args.time_scale)
+        self.metrics = Metrics()
+        self.rng = random.Random(args.seed)
+        self.table = LocalHighScoreTable(self.clock, self.metrics, self.game.capacity, self.rng)
+        self.bedrock = FakeBedrock(self.clock, self.metrics, self.rng, args)
+        self.lambda_active = 0
+        self.score_queue = asyncio.Queue()
+        self.leaderboard_cache = None
+        self.leaderboard_refresh = None
+
+    async def timed(self, stage: str, awaitable):
+        start = self.clock.now()
+        try:
+            return await awaitable
+        finally:
+            self.metrics.record(stage, self.clock.now() - start)
+
+    async def authenticate(self) -> None:
+        # Cognito GetId and GetCredentialsForIdentity
+        for _ in range(2):
+            await self.clock.sleep(self.rng.lognormvariate(math.log(0.12), 0.3))
+
+    async def generate(self, round_, questions: list, question_added: asyncio.Event) -> None:
+        """Streams the questions of a round into the list, like the generation function."""
+        async def invoke():
+            if self.lambda_active >= self.args.lambda_concurrency:
+                raise Throttled("lambda concurrency")
+            self.lambda_active += 1
+            self.metrics.change("lambda executions", 1)
+            try:
+                requested = self.game.questions_to_generate(round_)
+                max_tokens = self.game.token_budget(requested)
+                generated = 0
+                async for chunk in self.bedrock.stream(PROMPT_INPUT_TOKENS, max_tokens, self.game.output_tokens(round_)):
+                    generated += chunk
+                    while (len(questions) + 1) * self.game.tokens_per_question <= generated and len(questions) < requested:
+                        questions.append(self.clock.now())
+                        question_added.set()
+                    if len(questions) >= round_.questions:
+                        break
+            finally:
+                self.lambda_active -= 1
+                self.metrics.change("lambda executions", -1)
+
+        await with_retries(self.clock, self.metrics, invoke, self.rng)
+
+    async def wait_for_question(self, generation: asyncio.Task, question_added: asyncio.Event, timeout: float = None):
+        """Waits until the generation adds a question or ends, timeout in simulated seconds."""
+        waiter = asyncio.create_task(question_added.wait())
+        try:
+            await asyncio.wait([generation, waiter], return_when=asyncio.FIRST_COMPLETED,
+                               timeout=None if timeout is None else max(timeout, 0) * self.args.time_scale)
+        finally:
+            waiter.cancel()
+            question_added.clear()
+
+    async def play_round(self, round_) -> int:
+        await self.clock.sleep(TRANSITION_SECONDS)
+        start = self.clock.now()
+        questions = []
+        question_added = asyncio.Event()
+        generation = asyncio.create_task(self.timed("round_loaded", self.generate(round_, questions, question_added)))
+        # A generation that fails after the first question only shortens the round
+        generation.add_done_callback(lambda task: task.cancelled() or task.exception())
+        try:
+            while not questions:
+                if generation.done():
+                    generation.result()
+                    return 0
+                await self.wait_for_question(generation, question_added)
+            self.metrics.record("first_question", self.clock.now() - start)
+
+            # The timer of a round starts with its first question
+            deadline = self.clock.now() + ROUND_SECONDS
+            answered = 0
+            points = 0
+            while answered < round_.questions and self.clock.now() < deadline:
+                if answered >= len(questions):
+                    if generation.done():
+                        break
+                    wait_start = self.clock.now()
+                    await self.wait_for_question(generation, question_added, deadline - self.clock.now())
+                    self.metrics.record("question_wait", self.clock.now() - wait_start)
+                    continue
+                think = self.rng.lognormvariate(math.log(ANSWER_SECONDS_MEDIAN), 0.5)
+                await self.clock.sleep(min(think, deadline - self.clock.now()) + FEEDBACK_SECONDS)
+                answered += 1
+                points += 300 if think <= 2 else 200 if think <= 3 else 100
+            self.metrics.record("round", self.clock.now() - start)
+            return points
+        finally:
+            # The browser stops reading the stream once the round has enough questions
+            generation.cancel()
+
+    async def submit_score(self, item: dict) -> None:
+        if self.args.direct_writes:
+            await with_retries(self.clock, self.metrics, lambda: self.table.put_item(item), self.rng)
+            return
+        written = asyncio.get_running_loop().create_future()
+        # The submit function validates the score and sends it to the queue
+        await self.timed("score_submit", self.clock.sleep(self.rng.lognormvariate(math.log(0.03), 0.3)))
+        self.score_queue.put_nowait((item, written))
+        await self.timed("score_visible", written)
+
+    async def score_writer(self) -> None:
+        """The batch writer: up to batchSize scores per invocation, written 25 at a time."""
+        ingestion = self.game.ingestion
+        batch_size = ingestion.get("batchSize", 100)
+        window = ingestion.get("maxBatchingWindowSeconds", 5)
+        while True:
+            batch = [await self.score_queue.get()]
+            window_end = self.clock.now() + window
+            while len(batch) < batch_size and self.clock.now() < window_end:
+                try:
+                    batch.append(await asyncio.wait_for(self.score_queue.get(),
+                                                        (window_end - self.clock.now()) * self.args.time_scale))
+                except asyncio.TimeoutError:
+                    break
+            for offset in range(0, len(batch), BATCH_WRITE_SIZE):
+                pending = batch[offset:offset + BATCH_WRITE_SIZE]
+                for attempt in range(8):
+                    unprocessed = await self.table.batch_write_item([item for item, _ in pending])
+                    pending = [entry for entry in pending if entry[0] in unprocessed]
+                    if not pending:
+                        break
+                    await self.clock.sleep(self.rng.uniform(0, SDK_BASE_BACKOFF_SECONDS * 2 ** attempt))
+                for _, written in batch[offset:offset + BATCH_WRITE_SIZE]:
+                    if not written.done():
+                        if pending and any(written is entry[1] for entry in pending):
+                            written.set_exception(Throttled("score batch write"))
+                        else:
+                            written.set_result(None)
+
+    async def load_leaderboard(self) -> list:
+        """The CloudFront cached leaderboard, one index query per cache period."""
+        await self.clock.sleep(self.rng.lognormvariate(math.log(0.02), 0.3))
+        if self.leaderboard_cache and self.leaderboard_cache[0] > self.clock.now():
+            return self.leaderboard_cache[1]
+        if self.leaderboard_refresh is None:
+            async def refresh():
+                try:
+                    items = await with_retries(self.clock, self.metrics,
+                                               lambda: self.table.query_top_scores(self.game.number_of_high_scores),
+                                               self.rng)
+                    self.leaderboard_cache = (self.clock.now() + self.game.leaderboard_cache_seconds, items)
+                    return items
+                finally:
+                    self.leaderboard_refresh = None
+            self.leaderboard_refresh = asyncio.create_task(refresh())
+        return await asyncio.shield(self.leaderboard_refresh)
+
+    async def play(self, arrival: float) -> None:
+        await self.clock.sleep(arrival - self.clock.now())
+        self.metrics.change("players", 1)
+        start = self.clock.now()
+        try:
+            await self.timed("auth", self.authenticate())
+            score = 0
+            for round_ in self.game.rounds:
+                score += await self.play_round(round_)
+            item = {"id": str(uuid.uuid4()), "score": score, "sortID": 1,
+                    "category": self.rng.choice(self.game.topics)}
+            await self.submit_score(item)
+            await self.timed("leaderboard", self.load_leaderboard())
+            self.metrics.record("game", self.clock.now() - start)
+        except Throttled as error:
+            self.metrics.errors[error.resource] += 1
+        finally:
+            self.metrics.change("players", -1)
+
+    async def run(self) -> dict:
+        arrivals = arrival_times(self.args.arrival_curve, self.args.players, self.args.arrival_seconds)
+        writers = [] if self.args.direct_writes else [
+            asyncio.create_task(self.score_writer())
+            for _ in range(self.game.ingestion.get("maxConcurrency", 2))
+        ]
+        await asyncio.gather(*(self.play(arrival) for arrival in arrivals))
+        for writer in writers:
+            writer.cancel()
+        return self.report()
+
+    def report(self) -> dict:
+        def percentiles(values: list) -> dict:
+            values = sorted(values)
+            pick = lambda share: round(values[min(len(values) - 1, int(len(values) * share))], 1)
+            return {"count": len(values), "p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99),
+                    "max": round(values[-1], 1)}
+
+        peak_per_key = defaultdict(float)
+        for (key, _), units in self.metrics.key_accesses.items():
+            peak_per_key[key] = max(peak_per_key[key], units)
+        return {
+            "players": self.args.players,
+            "failedGames": sum(self.metrics.errors.values()),
+            "failures": dict(self.metrics.errors),
+            "stagesMs": {stage: percentiles(values) for stage, values in sorted(self.metrics.latencies.items())},
+            "throttles": dict(self.metrics.throttles.most_common()),
+            "hotKeys": dict(sorted(peak_per_key.items(), key=lambda entry: -entry[1])[:5]),
+            "peaks": dict(self.metrics.peaks)
+        }
+
+
+def print_report(report: dict) -> None:
+    """
+    Print a simulation report.
+
+    Args:
+        report (dict): The report of Simulation.run.
+
+    Returns:
+        None
+    """
+    print(f"\n{report['players']} players, {report['failedGames']} games failed {report['failures'] or ''}")
+    print(f"\n{'stage (simulated ms)':<20} {'count':>7} {'p50':>10} {'p90':>10} {'p99':>10} {'max':>10}")
+    for stage, values in report["stagesMs"].items():
+        print(f"{stage:<20} {values['count']:>7} {values['p50']:>10} {values['p90']:>10} {values['p99']:>10} {values['max']:>10}")
+    print("\nthrottles:" + ("" if report["throttles"] else " none"))
+    for resource, count in report["throttles"].items():
+        print(f"  {resource:<40} {count:>8}")
+    print("\nhot keys (peak units per second):")
+    for key, units in report["hotKeys"].items():
+        print(f"  {key:<40} {units:>8.1f}")
+    print("\npeaks: " + ", ".join(f"{name} {value}" for name, value in report["peaks"].items()))
+
+
+def main() -> None:
+    """
+    Simulate a full event against local stand-ins before running it for real.
+
+    Players arrive along an arrival curve and play complete games: auth, the
+    rounds of www/src/data.json with streamed questions, the score submission
+    and the leaderboard. DynamoDB and Bedrock are replaced by in-process
+    stand-ins with the capacity limits of the deploy config and the quotas
+    passed as arguments, so no AWS resources are used. Time runs faster than
+    real time, set by --time-scale. For example:
+
+        python scripts/load_simulator.py --players 2000 --arrival-seconds 120
+        python scripts/load_simulator.py --players 5000 --arrival-curve burst --direct-writes
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Simulate an event against local DynamoDB and Bedrock stand-ins.")
+    parser.add_argument("--players", type=int, default=1000, help="Players of the event, each plays one game")
+    parser.add_argument("--arrival-seconds", type=float, default=300, help="Length of the arrival window")
+    parser.add_argument("--arrival-curve", choices=ARRIVAL_CURVES, default="linear")
+    parser.add_argument("--time-scale", type=float, default=0.05,
+                        help="Real seconds per simulated second, lower runs faster but less precisely")
+    parser.add_argument("--bedrock-tpm", type=int, default=400000, help="Bedrock tokens per minute quota")
+    parser.add_argument("--bedrock-max-streams", type=int, default=500, help="Concurrent Bedrock streams allowed")
+    parser.add_argument("--ttft-median", type=float, default=0.8, help="Median time to first token in seconds")
+    parser.add_argument("--output-tokens-per-second", type=float, default=60, help="Output speed of one stream")
+    parser.add_argument("--lambda-concurrency", type=int, default=1000, help="Unreserved Lambda concurrency")
+    parser.add_argument("--direct-writes", action="store_true",
+                        help="Write scores with PutItem instead of through the queue and batch writer")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--data", default="www/src/data.json")
+    parser.add_argument("--config", default="configs/deploy-config.yaml")
+    parser.add_argument("--output", help="Also save the report as JSON to this file")
+    args = parser.parse_args()
+    if args.players < 1 or args.time_scale <= 0:
+        parser.error("--players must be at least 1 and --time-scale above 0")
+
+    report = asyncio.run(Simulation(args).run())
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import argparse
+import datetime
+import json
+import sys
+import boto3
+from query_scores import print_rows, run_query
+
+# Names created by app/cdn_log_analytics.py
+DATABASE = "gen_ai_trivia_cdn_logs"
+WORKGROUP = "gen-ai-trivia-cdn-logs"
+STATE_MACHINE_NAME = "gen-ai-trivia-cdn-log-compaction"
+
+# Requests CloudFront answered from its cache
+HIT = "result_type IN ('Hit', 'RefreshHit')"
+MEASURES = f"""
+    count(*) AS requests,
+    round(100.0 * count_if({HIT}) / count(*), 1) AS hit_ratio,
+    round(approx_percentile(time_taken, 0.5) * 1000) AS p50_ms,
+    round(approx_percentile(time_taken, 0.9) * 1000) AS p90_ms,
+    round(approx_percentile(time_taken, 0.99) * 1000) AS p99_ms,
+    round(approx_percentile(time_to_first_byte, 0.9) * 1000) AS ttfb_p90_ms,
+    sum(sc_bytes) AS bytes
+"""
+
+# Reports over the compacted logs, {where} is replaced by the date and path filter
+REPORTS = {
+    "paths": f"""
+        SELECT path, {MEASURES}
+        FROM cloudfront_logs WHERE {{where}}
+        GROUP BY path ORDER BY requests DESC LIMIT {{limit}}
+    """,
+    "daily": f"""
+        SELECT log_date, {MEASURES}
+        FROM cloudfront_logs WHERE {{where}}
+        GROUP BY log_date ORDER BY log_date
+    """,
+    "edges": f"""
+        SELECT edge_location, {MEASURES}
+        FROM cloudfront_logs WHERE {{where}}
+        GROUP BY edge_location ORDER BY requests DESC LIMIT {{limit}}
+    """,
+    "results": """
+        SELECT path, detailed_result_type, count(*) AS requests, sum(sc_bytes) AS bytes
+        FROM cloudfront_logs WHERE {where}
+        GROUP BY path, detailed_result_type ORDER BY requests DESC LIMIT {limit}
+    """
+}
+
+
+def build_filter(start: str, end: str, path: str = None) -> str:
+    """
+    Build the WHERE clause of a report.
+
+    Args:
+        start (str): The first log date (YYYY-MM-DD).
+        end (str): The last log date (YYYY-MM-DD).
+        path (str, optional): Only requests whose path starts with this prefix. Defaults to all paths.
+
+    Returns:
+        str: The condition, log_date is the partition so only these days are read.
+    """
+    for value in (start, end):
+        datetime.date.fromisoformat(value)
+    condition = f"log_date BETWEEN '{start}' AND '{end}'"
+    if path:
+        condition += " AND starts_with(path, '{}')".format(path.replace("'", "''"))
+    return condition
+
+
+def main() -> None:
+    """
+    Report edge caching and latency from the compacted CloudFront logs.
+
+    Commands:
+    - report: run one of the built-in reports over a range of log dates
+    - query: run SQL against the "cloudfront_logs" table
+    - compact: compact the raw logs of a day now instead of waiting for the schedule
+
+    The reports list the requests, the cache hit ratio, the time-taken
+    percentiles and the bytes sent, by path, day or edge location. Run the
+    daily report over the days before and after a cache policy change to
+    compare them:
+
+        python scripts/query_cdn_logs.py report daily --start 2024-10-01 --end 2024-10-14
+        python scripts/query_cdn_logs.py report paths --path /api/ --days 1
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Query the compacted CloudFront logs.")
+    parser.add_argument("--profile", help="AWS profile to use")
+    parser.add_argument("--region", help="AWS region of the edge stack")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report_parser = commands.add_parser("report", help="Run a built-in report")
+    report_parser.add_argument("name", choices=sorted(REPORTS))
+    report_parser.add_argument("--start", help="First log date (YYYY-MM-DD), defaults to --days before yesterday")
+    report_parser.add_argument("--end", help="Last log date (YYYY-MM-DD), defaults to yesterday")
+    report_parser.add_argument("--days", type=int, default=7, help="Number of days when --start is not given")
+    report_parser.add_argument("--path", help="Only paths starting with this prefix, for example /api/")
+    report_parser.add_argument("--limit", type=int, default=25, help="Rows of the path, edge and result reports")
+
+    query_parser = commands.add_parser("query", help="Run a SQL query with Athena")
+    query_parser.add_argument("sql", help="The query, for example \"SELECT * FROM cloudfront_logs LIMIT 10\"")
+
+    compact_parser = commands.add_parser("compact", help="Compact the raw logs of a day now")
+    compact_parser.add_argument("--date", help="Log date (YYYY-MM-DD), defaults to yesterday")
+    args = parser.parse_args()
+
+    session = boto3.Session(profile_name=args.profile, region_name=args.region)
+    if args.command == "compact":
+        account = session.client("sts").get_caller_identity()["Account"]
+        arn = f"arn:{session.get_partition_for_region(session.region_name)}:states:{session.region_name}:" \
+              f"{account}:stateMachine:{STATE_MACHINE_NAME}"
+        execution_input = json.dumps({"date": args.date} if args.date else {})
+        execution = session.client("stepfunctions").start_execution(stateMachineArn=arn, input=execution_input)
+        print(f"Started {execution['executionArn']}")
+        return
+
+    if args.command == "report":
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        end = args.end or yesterday.isoformat()
+        try:
+            start = args.start or (datetime.date.fromisoformat(end) - datetime.timedelta(days=args.days - 1)).isoformat()
+            where = build_filter(start, end, args.path)
+        except ValueError as error:
+            parser.error(str(error))
+        query = REPORTS[args.name].format(where=where, limit=args.limit)
+    else:
+        query = args.sql
+
+    try:
+        print_rows(run_query(session.client("athena"), query, database=DATABASE, workgroup=WORKGROUP))
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
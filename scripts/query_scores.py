@@ -0,0 +1,173 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import argparse
+import sys
+import time
+from pathlib import Path
+import boto3
+
+# Names created by app/score_analytics.py
+DATABASE = "gen_ai_trivia_analytics"
+WORKGROUP = "gen-ai-trivia-analytics"
+STATE_MACHINE_NAME = "gen-ai-trivia-score-export"
+SCORES_PREFIX = "scores/"
+
+# Reports over the latest export, {latest} is replaced by its partition filter
+REPORTS = {
+    "categories": """
+        SELECT category, count(*) AS games, round(avg(score), 1) AS avg_score,
+               round(avg(accuracy), 1) AS avg_accuracy, max(score) AS best_score
+        FROM scores WHERE {latest}
+        GROUP BY category ORDER BY games DESC
+    """,
+    "accuracy": """
+        SELECT width_bucket(accuracy, 0, 100, 10) * 10 AS accuracy_up_to, count(*) AS games,
+               round(avg(initial_score), 1) AS avg_initial_score
+        FROM scores WHERE {latest}
+        GROUP BY 1 ORDER BY 1
+    """,
+    "top": """
+        SELECT name, category, score, accuracy, submitted_at
+        FROM scores WHERE {latest}
+        ORDER BY score DESC LIMIT 25
+    """
+}
+LATEST_EXPORT = "export_date = (SELECT max(export_date) FROM scores)"
+
+
+def run_query(athena, query: str, poll_seconds: float = 1.0, database: str = DATABASE,
+              workgroup: str = WORKGROUP) -> list[list[str]]:
+    """
+    Run a query in the analytics workgroup and wait for its rows.
+
+    Args:
+        athena (boto3.client): The Athena client.
+        query (str): The SQL query.
+        poll_seconds (float, optional): Time between status checks. Defaults to 1.0.
+        database (str, optional): The Glue database of the query. Defaults to the analytics database.
+        workgroup (str, optional): The Athena workgroup of the query. Defaults to the analytics workgroup.
+
+    Returns:
+        list[list[str]]: The rows of the result, the first row holds the column names.
+    """
+    execution_id = athena.start_query_execution(
+        QueryString=query,
+        QueryExecutionContext={"Database": database},
+        WorkGroup=workgroup
+    )["QueryExecutionId"]
+
+    while True:
+        status = athena.get_query_execution(QueryExecutionId=execution_id)["QueryExecution"]["Status"]
+        if status["State"] in ("SUCCEEDED", "FAILED", "CANCELLED"):
+            break
+        time.sleep(poll_seconds)
+    if status["State"] != "SUCCEEDED":
+        raise RuntimeError(f"Query {status['State'].lower()}: {status.get('StateChangeReason', '')}")
+
+    rows = []
+    for page in athena.get_paginator("get_query_results").paginate(QueryExecutionId=execution_id):
+        for row in page["ResultSet"]["Rows"]:
+            rows.append([column.get("VarCharValue", "") for column in row["Data"]])
+    return rows
+
+
+def print_rows(rows: list[list[str]]) -> None:
+    """
+    Print query rows as an aligned table.
+
+    Args:
+        rows (list[list[str]]): The rows, the first row holds the column names.
+
+    Returns:
+        None
+    """
+    if not rows:
+        return
+    widths = [max(len(row[index]) for row in rows) for index in range(len(rows[0]))]
+    for number, row in enumerate(rows):
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+        if number == 0:
+            print("  ".join("-" * width for width in widths))
+
+
+def download(s3, bucket: str, output: Path, export_date: str = None) -> int:
+    """
+    Download the Parquet files of the scores table for local tools such as DuckDB or pandas.
+
+    Args:
+        s3 (boto3.client): The S3 client.
+        bucket (str): The analytics bucket.
+        output (Path): The local directory, the partition folders are kept.
+        export_date (str, optional): Only download this export date (YYYY-MM-DD). Defaults to all dates.
+
+    Returns:
+        int: The number of files downloaded.
+    """
+    prefix = SCORES_PREFIX + (f"export_date={export_date}/" if export_date else "")
+    count = 0
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        for item in page.get("Contents", []):
+            target = output / item["Key"]
+            if target.exists() and target.stat().st_size == item["Size"]:
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            s3.download_file(bucket, item["Key"], str(target))
+            count += 1
+    return count
+
+
+def main() -> None:
+    """
+    Query the exported high scores without reading the high score table.
+
+    Commands:
+    - query: run SQL against the "scores" table of the analytics database
+    - report: run one of the built-in reports over the latest export
+    - download: copy the Parquet files to a local directory
+    - export: start an export now instead of waiting for the schedule
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Query the high score exports in S3.")
+    parser.add_argument("--profile", help="AWS profile to use")
+    parser.add_argument("--region", help="AWS region of the application")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    query_parser = commands.add_parser("query", help="Run a SQL query with Athena")
+    query_parser.add_argument("sql", help="The query, for example \"SELECT * FROM scores LIMIT 10\"")
+
+    report_parser = commands.add_parser("report", help="Run a built-in report over the latest export")
+    report_parser.add_argument("name", choices=sorted(REPORTS))
+
+    download_parser = commands.add_parser("download", help="Download the Parquet files")
+    download_parser.add_argument("--date", help="Export date to download (YYYY-MM-DD), defaults to all")
+    download_parser.add_argument("--output", default="analytics", type=Path, help="Local directory")
+
+    commands.add_parser("export", help="Start an export of the high score table now")
+    args = parser.parse_args()
+
+    session = boto3.Session(profile_name=args.profile, region_name=args.region)
+    if args.command in ("query", "report"):
+        query = args.sql if args.command == "query" else REPORTS[args.name].format(latest=LATEST_EXPORT)
+        try:
+            print_rows(run_query(session.client("athena"), query))
+        except RuntimeError as error:
+            print(error, file=sys.stderr)
+            sys.exit(1)
+    elif args.command == "download":
+        account = session.client("sts").get_caller_identity()["Account"]
+        bucket = f"gen-ai-trivia-analytics-{session.region_name}-{account}"
+        count = download(session.client("s3"), bucket, args.output, args.date)
+        print(f"Downloaded {count} file(s) to {args.output / SCORES_PREFIX}")
+    else:
+        account = session.client("sts").get_caller_identity()["Account"]
+        arn = f"arn:{session.get_partition_for_region(session.region_name)}:states:{session.region_name}:" \
+              f"{account}:stateMachine:{STATE_MACHINE_NAME}"
+        execution = session.client("stepfunctions").start_execution(stateMachineArn=arn)
+        print(f"Started {execution['executionArn']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import argparse
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parse_step(step: str) -> tuple[str, str]:
+    """
+    Split a step argument into its label and shell command.
+
+    Args:
+        step (str): A step in the format "label=command".
+
+    Returns:
+        tuple[str, str]: The label and the shell command.
+    """
+    label, separator, command = step.partition("=")
+    if not separator or not label or not command:
+        raise argparse.ArgumentTypeError(f"Step '{step}' must be in the format label=command")
+    return label, command
+
+
+def run_step(label: str, command: str) -> tuple[str, int, float]:
+    """
+    Run a shell command, prefixing each output line with the step label.
+
+    Args:
+        label (str): The step label.
+        command (str): The shell command to run.
+
+    Returns:
+        tuple[str, int, float]: The label, the exit code and the duration in seconds.
+    """
+    start = time.monotonic()
+    with subprocess.Popen(
+        command,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1
+    ) as process:
+        for line in process.stdout:
+            print(f"[{label}] {line}", end="", flush=True)
+    duration = time.monotonic() - start
+    print(f"[timing] {label}: {duration:.1f}s (exit {process.returncode})", flush=True)
+    return label, process.returncode, duration
+
+
+def main() -> None:
+    """
+    Run labeled build steps and report how long each one took.
+
+    Steps run one after another, or all at once with --parallel. A summary
+    table of the step durations is printed at the end and the script exits
+    with a non-zero code if any step failed.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Run labeled build steps and report their duration.")
+    parser.add_argument("steps", nargs="+", type=parse_step, help="Steps in the format label=command")
+    parser.add_argument("--parallel", action="store_true", help="Run all steps concurrently")
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    results = []
+    if args.parallel:
+        with ThreadPoolExecutor(max_workers=len(args.steps)) as executor:
+            results = list(executor.map(lambda step: run_step(*step), args.steps))
+    else:
+        for label, command in args.steps:
+            results.append(run_step(label, command))
+            if results[-1][1] != 0:
+                break
+    total = time.monotonic() - start
+
+    print("[timing] ---- summary ----")
+    for label, returncode, duration in results:
+        status = "ok" if returncode == 0 else f"failed ({returncode})"
+        print(f"[timing] {label:<24} {duration:>8.1f}s  {status}")
+    print(f"[timing] {'total':<24} {total:>8.1f}s")
+
+    if any(returncode != 0 for _, returncode, _ in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,10 @@ def main() -> None:
     Write the Cognito user pool ID, user pool client ID, and
     identity pool ID to the Amplify configuration file.
 
+    Deployed sites read these values from the config.json published by the
+    edge stack. The Amplify configuration file is the fallback used when the
+    frontend runs locally with npm run dev.
+
     Returns:
         None
     """
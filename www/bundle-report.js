@@ -0,0 +1,59 @@
+// Bundle size report of the production build. Lists every JavaScript and CSS
+// file with its minified and gzip size, and whether the browser loads it on
+// the first page (the entry and everything it imports statically) or later,
+// when a route or an SDK client is imported on demand.
+import { gzipSync } from 'node:zlib'
+
+function kilobytes(bytes) {
+    return (bytes / 1024).toFixed(1).padStart(8)
+}
+
+// budgetKb: warns when the gzip size of the first load JavaScript exceeds it
+export default function bundleReport({ budgetKb } = {}) {
+    return {
+        name: 'bundle-report',
+        apply: 'build',
+        generateBundle(_options, bundle) {
+            const initial = new Set()
+            const visit = (fileName) => {
+                const chunk = bundle[fileName]
+                if (!chunk || initial.has(fileName)) {
+                    return
+                }
+                initial.add(fileName)
+                for (const imported of chunk.imports || []) {
+                    visit(imported)
+                }
+                for (const css of chunk.viteMetadata?.importedCss || []) {
+                    initial.add(css)
+                }
+            }
+            Object.values(bundle).filter((file) => file.type === 'chunk' && file.isEntry).forEach((chunk) => visit(chunk.fileName))
+
+            const rows = Object.values(bundle)
+                .filter((file) => /\.(js|css)$/.test(file.fileName))
+                .map((file) => {
+                    const content = file.type === 'chunk' ? file.code : file.source
+                    return {
+                        fileName: file.fileName,
+                        size: Buffer.byteLength(content),
+                        gzip: gzipSync(content).length,
+                        initial: initial.has(file.fileName)
+                    }
+                })
+                .sort((left, right) => Number(right.initial) - Number(left.initial) || right.gzip - left.gzip)
+
+            const lines = ['', `${'Bundle size (KB)'.padEnd(40)} minified     gzip  load`]
+            for (const row of rows) {
+                lines.push(`${row.fileName.padEnd(40)} ${kilobytes(row.size)} ${kilobytes(row.gzip)}  ${row.initial ? 'first' : 'lazy'}`)
+            }
+            const total = (filter) => rows.filter(filter).reduce((sum, row) => sum + row.gzip, 0)
+            const firstLoadJs = total((row) => row.initial && row.fileName.endsWith('.js'))
+            lines.push(`First load JavaScript ${kilobytes(firstLoadJs)} KB gzip, lazy ${kilobytes(total((row) => !row.initial && row.fileName.endsWith('.js')))} KB gzip`)
+            console.log(lines.join('\n'))
+            if (budgetKb && firstLoadJs / 1024 > budgetKb) {
+                this.warn(`First load JavaScript is ${(firstLoadJs / 1024).toFixed(1)} KB gzip, over the budget of ${budgetKb} KB`)
+            }
+        }
+    }
+}
@@ -0,0 +1,97 @@
+// SDK clients and credentials shared by the whole game. Every component used
+// to resolve the Cognito credentials and build its own client, so each round
+// paid for a credentials call and new TLS connections. Here the credentials
+// are cached and refreshed in the background before they expire, one client
+// per service is kept for the session, and warmUp() opens the connection of
+// the next round while the round transition is displayed.
+import { fetchAuthSession } from 'aws-amplify/auth';
+import { Hub } from 'aws-amplify/utils';
+import config from './config'
+
+// Credentials are refreshed when they are used within this margin of their expiration
+const REFRESH_MARGIN_MS = 5 * 60 * 1000;
+// Browsers close idle connections after a while, the preconnect is repeated after this
+const PRECONNECT_INTERVAL_MS = 20000;
+
+let cached = null;
+let refreshing = null;
+const clients = new Map();
+const preconnected = new Map();
+
+function refreshCredentials() {
+    refreshing ||= fetchAuthSession({ forceRefresh: cached !== null })
+        .then((session) => {
+            const credentials = session.credentials;
+            cached = credentials ? { credentials, expiresAt: credentials.expiration?.getTime() ?? Infinity } : null;
+            return credentials;
+        })
+        .finally(() => {
+            refreshing = null;
+        });
+    return refreshing;
+}
+
+// Credentials of the signed in player. Credentials close to their expiration
+// are still returned while the new ones are fetched, so no call waits for them.
+export function getCredentials() {
+    const now = Date.now();
+    if (cached && now < cached.expiresAt) {
+        if (now > cached.expiresAt - REFRESH_MARGIN_MS) {
+            refreshCredentials().catch((error) => console.warn('Could not refresh the credentials:', error));
+        }
+        return Promise.resolve(cached.credentials);
+    }
+    return refreshCredentials();
+}
+
+// The next player signing in on this page must not use these credentials
+Hub.listen('auth', ({ payload }) => {
+    if (payload.event === 'signedOut') {
+        cached = null;
+        clients.clear();
+    }
+});
+
+// Returns { client, sdk }: the shared client of the region and the SDK module with its commands
+async function sharedClient(service, load, clientName) {
+    const key = `${service}:${config.region}`;
+    if (!clients.has(key)) {
+        const pending = load().then((sdk) => ({
+            client: new sdk[clientName]({ region: config.region, credentials: getCredentials }),
+            sdk
+        }));
+        pending.catch(() => clients.delete(key));
+        clients.set(key, pending);
+    }
+    return clients.get(key);
+}
+
+export function lambda() {
+    return sharedClient('lambda', () => import('@aws-sdk/client-lambda'), 'LambdaClient');
+}
+
+export function dynamoDB() {
+    return sharedClient('dynamodb', () => import('@aws-sdk/client-dynamodb'), 'DynamoDBClient');
+}
+
+// Opens a connection to the service endpoint. The request carries no
+// credentials, like the SDK requests, so the browser reuses the connection for
+// the next SDK call. The response is opaque and ignored.
+function preconnect(service) {
+    const origin = `https://${service}.${config.region}.amazonaws.com`;
+    const now = Date.now();
+    if (now - (preconnected.get(origin) || 0) < PRECONNECT_INTERVAL_MS) {
+        return;
+    }
+    preconnected.set(origin, now);
+    fetch(`${origin}/`, { mode: 'no-cors', credentials: 'omit', cache: 'no-store' }).catch(() => {});
+}
+
+// Called while the player reads the round transition: resolves the
+// credentials, loads the Lambda client and opens its connection, so the
+// question generation of the next round starts right away.
+export function warmUp() {
+    preconnect('lambda');
+    Promise.all([getCredentials(), lambda()])
+        .catch((error) => console.warn('Could not warm up the Lambda client:', error));
+}
@@ -0,0 +1,36 @@
+import amplifyConfig from './amplifyconfiguration.json'
+import data from './data.json'
+
+// Deployment specific values. The bundled defaults are replaced by the
+// config.json the edge stack publishes next to the bundle, so one build can
+// be promoted to any deployment. The defaults are used with npm run dev.
+const config = {
+    Auth: amplifyConfig.Auth,
+    region: data.region,
+    // Regions the game can use, the closest one replaces region at startup
+    regions: [data.region],
+    bedrockFunctionName: data.bedrockFunctionName,
+    highscores: { ...data.highscores },
+    // The shared-room mode is only available when a WebSocket API is deployed
+    rooms: { webSocketUrl: '' },
+    // Timings are only sent when a collector is deployed
+    telemetry: { path: '' }
+}
+
+export async function loadConfig() {
+    try {
+        const response = await fetch('/config.json', { cache: 'no-cache' });
+        if (!response.ok) {
+            throw new Error(`Config request failed with status ${response.status}`);
+        }
+        const runtimeConfig = await response.json();
+        Object.assign(config, runtimeConfig, {
+            highscores: { ...config.highscores, ...runtimeConfig.highscores }
+        });
+    } catch (error) {
+        console.warn('No runtime config.json, using the bundled configuration:', error);
+    }
+    return config;
+}
+
+export default config
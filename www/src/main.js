@@ -1,11 +1,19 @@
 import { createApp } from 'vue'
+import { Amplify } from 'aws-amplify'
 import './style.css'
 import App from './App.vue'
 import router from './router'
+import config, { loadConfig } from './config'
+import { selectRegion } from './region'
+// Only the Bootstrap styles are used, its JavaScript plugins are not loaded
 import "bootstrap/dist/css/bootstrap.min.css"
-import "bootstrap"
 
 
-createApp(App)
-    .use(router)
-    .mount('#app')
+loadConfig().then(async () => {
+    // Cognito stays in the primary region, the game uses the closest region
+    config.region = await selectRegion(config);
+    Amplify.configure({ Auth: config.Auth });
+    createApp(App)
+        .use(router)
+        .mount('#app')
+})
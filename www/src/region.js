@@ -0,0 +1,49 @@
+// Picks the deployment region the browser reaches fastest. Every region in
+// config.regions runs question generation and score ingestion next to a
+// replica of the high score table, so the game talks to the closest one.
+
+const PROBES_PER_REGION = 3;
+const PROBE_TIMEOUT_MS = 1500;
+const STORAGE_KEY = 'genAiTriviaRegion';
+
+// Round trip to the DynamoDB health check endpoint of the region. The first
+// probe pays for DNS and TLS, so the fastest of the following probes is used.
+async function measureLatency(region) {
+    const url = `https://dynamodb.${region}.amazonaws.com/ping`;
+    let fastest = Infinity;
+    for (let probe = 0; probe < PROBES_PER_REGION; probe++) {
+        const controller = new AbortController();
+        const timer = setTimeout(() => controller.abort(), PROBE_TIMEOUT_MS);
+        const start = performance.now();
+        try {
+            await fetch(`${url}?probe=${Date.now()}`, { mode: 'no-cors', cache: 'no-store', signal: controller.signal });
+            if (probe > 0) {
+                fastest = Math.min(fastest, performance.now() - start);
+            }
+        } catch (error) {
+            return Infinity;
+        } finally {
+            clearTimeout(timer);
+        }
+    }
+    return fastest;
+}
+
+// Returns the region with the lowest latency, remembered for the browser session
+export async function selectRegion(config) {
+    const regions = config.regions || [];
+    if (regions.length <= 1) {
+        return config.region;
+    }
+    const remembered = sessionStorage.getItem(STORAGE_KEY);
+    if (regions.includes(remembered)) {
+        return remembered;
+    }
+
+    const latencies = await Promise.all(regions.map(measureLatency));
+    console.log('Region latencies (ms):', Object.fromEntries(regions.map((region, index) => [region, latencies[index]])));
+    const best = latencies.indexOf(Math.min(...latencies));
+    const region = Number.isFinite(latencies[best]) ? regions[best] : config.region;
+    sessionStorage.setItem(STORAGE_KEY, region);
+    return region;
+}
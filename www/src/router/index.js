@@ -1,7 +1,8 @@
 import { createRouter, createWebHistory } from 'vue-router'
 import Home from '../views/Home.vue'
-import TriviaGame from '../views/TriviaGame.vue'
 
+// The game and the rooms are loaded when they are first opened, so the home
+// page does not download them or the SDK clients they use
 
 const routes = [
     {
@@ -12,7 +13,13 @@ const routes = [
     {
         path: '/trivia-game/:topic',
         name: 'Trivia Game',
-        component: TriviaGame,
+        component: () => import('../views/TriviaGame.vue'),
+        props: true
+    },
+    {
+        path: '/room/:roomId?',
+        name: 'Room',
+        component: () => import('../views/Room.vue'),
         props: true
     }
 ]
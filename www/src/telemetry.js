@@ -0,0 +1,65 @@
+// Game timings measured in the browser. Samples are buffered and sent in
+// batches with navigator.sendBeacon, which also delivers the last batch while
+// the page unloads. The collector turns them into percentile metrics by
+// topic, difficulty and region.
+import config from './config'
+
+const BATCH_SIZE = 20;
+const FLUSH_INTERVAL_MS = 30000;
+
+let buffer = [];
+let flushTimer = null;
+
+export function flush() {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+    if (buffer.length === 0 || !config.telemetry?.path) {
+        buffer = [];
+        return;
+    }
+    const body = JSON.stringify({ samples: buffer });
+    buffer = [];
+    if (!navigator.sendBeacon?.(config.telemetry.path, body)) {
+        fetch(config.telemetry.path, { method: 'POST', body, keepalive: true }).catch(() => {});
+    }
+}
+
+// Records one timing in milliseconds, dimensions are topic and difficulty
+export function record(metric, value, dimensions = {}) {
+    if (!config.telemetry?.path) {
+        return;
+    }
+    buffer.push({ metric, value: Math.round(value), region: config.region, ...dimensions });
+    if (buffer.length >= BATCH_SIZE) {
+        flush();
+    } else if (!flushTimer) {
+        flushTimer = setTimeout(flush, FLUSH_INTERVAL_MS);
+    }
+}
+
+// An ID in the X-Ray trace ID format, 1-<epoch seconds in hex>-<96 random bits in hex>
+export function newTraceId() {
+    const random = Array.from(crypto.getRandomValues(new Uint8Array(12)), (byte) => byte.toString(16).padStart(2, '0')).join('');
+    return `1-${Math.floor(Date.now() / 1000).toString(16)}-${random}`;
+}
+
+// Starts a stopwatch, mark(metric) records the time since the start
+export function startTimer(dimensions = {}) {
+    const start = performance.now();
+    const marked = new Set();
+    return {
+        mark(metric) {
+            if (!marked.has(metric)) {
+                marked.add(metric);
+                record(metric, performance.now() - start, dimensions);
+            }
+        }
+    };
+}
+
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') {
+        flush();
+    }
+});
+window.addEventListener('pagehide', flush);
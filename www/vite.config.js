@@ -1,7 +1,41 @@
 import { defineConfig } from 'vite'
 import vue from '@vitejs/plugin-vue'
+import bundleReport from './bundle-report'
+
+// Dependencies of the first page get named vendor chunks. Their file names only
+// change when those dependencies change, so browsers and CloudFront keep them
+// across deploys of the application code. The SDK clients are imported on
+// demand and split by Rollup into chunks of their own.
+const VENDOR_CHUNKS = {
+    'vendor-vue': ['vue', '@vue', 'vue-router'],
+    'vendor-amplify': ['aws-amplify', '@aws-amplify']
+}
+
+function packageName(id) {
+    const path = id.split('node_modules/').pop()
+    const parts = path.split('/')
+    return path.startsWith('@') ? `${parts[0]}/${parts[1]}` : parts[0]
+}
+
+function manualChunks(id) {
+    if (!id.includes('node_modules/')) {
+        return undefined
+    }
+    const name = packageName(id)
+    for (const [chunk, packages] of Object.entries(VENDOR_CHUNKS)) {
+        if (packages.some((prefix) => name === prefix || name.startsWith(`${prefix}/`))) {
+            return chunk
+        }
+    }
+    return undefined
+}
 
 // https://vitejs.dev/config/
 export default defineConfig({
-  plugins: [vue()],
+  plugins: [vue(), bundleReport({ budgetKb: 250 })],
+  build: {
+    rollupOptions: {
+      output: { manualChunks }
+    }
+  }
 })